@@ -0,0 +1 @@
+"""Performance benchmarks for the search pipeline (run with `make bench`)."""
@@ -0,0 +1,80 @@
+"""
+Benchmarks for the Streamlit app's per-rerun overhead.
+
+Every interaction reruns streamlit_app.py. Before the app cached its
+resources, each rerun built a new OpenAI client and UserManager and the
+next chat request opened a fresh connection. Each benchmark runs RERUNS
+reruns against the local fake server, each doing what the script does at
+the top plus one chat completion:
+
+    fresh   client and manager built on every rerun (the old module level)
+    cached  one pooled client and manager shared by every rerun
+
+The fake server speaks plain HTTP, so the saved connection setup is only
+the TCP handshake; against the real API each fresh client also pays TLS.
+
+Usage (from therapy_app/):
+    python -m benchmarks.bench_app_resources                  # compare
+    python -m benchmarks.bench_app_resources --save-baseline  # re-record
+"""
+
+import atexit
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from src.app_resources import create_chat_client, create_user_manager
+from src.benchmarking import BenchmarkSuite, main
+from src.fake_server import FakeOpenAIServer
+
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+RERUNS = 50
+MESSAGES = [{"role": "user", "content": "I feel a bit stale today."}]
+
+suite = BenchmarkSuite("app resources")
+_root = Path(tempfile.mkdtemp(prefix="bench_app_resources_"))
+atexit.register(shutil.rmtree, _root, ignore_errors=True)
+_server = FakeOpenAIServer().start()
+atexit.register(_server.stop)
+
+
+def rerun(client, user_manager) -> None:
+    """The work one rerun does with its resources."""
+    user_manager.get_user_profile("bench")
+    client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES)
+
+
+def new_client():
+    """A chat client pointed at the fake server."""
+    return create_chat_client(api_key="bench-key", base_url=_server.base_url)
+
+
+def new_manager():
+    """A user manager over the benchmark's data directory."""
+    return create_user_manager(str(_root / "user_data"))
+
+
+new_manager().create_user("bench", "bench-password")
+
+
+@suite.benchmark("app_resources.rerun[fresh]", setup=lambda: RERUNS, rounds=5)
+def bench_fresh(reruns):
+    for _ in range(reruns):
+        client = new_client()
+        rerun(client, new_manager())
+        client.close()
+
+
+@suite.benchmark("app_resources.rerun[cached]",
+                 setup=lambda: (new_client(), new_manager()), rounds=5)
+def bench_cached(resources):
+    client, user_manager = resources
+    for _ in range(RERUNS):
+        rerun(client, user_manager)
+
+
+if __name__ == "__main__":
+    sys.exit(main(suite, BASELINES))
@@ -0,0 +1,101 @@
+"""
+Benchmarks for per-turn prompt size in long chat sessions.
+
+Replays a TURNS-turn session (each turn a user message and a reply of
+typical length) and builds every turn's prompt two ways: the whole history,
+as the chat used to send it, and through ContextWindow with the app's
+default limits. The prompt tokens of selected turns and of the session in
+total are printed before the timings; the timings cover building all
+TURNS prompts, i.e. the local counting overhead per session.
+
+Summaries are produced locally (the last SUMMARY_CHARS characters of the
+folded text) so no model is called; a real summary is of similar size.
+Counts use tiktoken when its encoding is available, else the estimate.
+
+Usage (from therapy_app/):
+    python -m benchmarks.bench_context_window                  # compare
+    python -m benchmarks.bench_context_window --save-baseline  # re-record
+"""
+
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from src.benchmarking import BenchmarkSuite, main
+from src.context_window import ContextWindow, TokenCounter
+
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+TURNS = 200
+SUMMARY_CHARS = 1500
+REPORT_TURNS = (10, 25, 50, 100, 200)
+SYSTEM_MESSAGE = "You are Dr. Sourdough, a CBT therapist who is a wise piece of bread. " * 20
+
+suite = BenchmarkSuite("context window")
+counter = TokenCounter()
+
+
+def make_session(turns: int = TURNS) -> List[Dict[str, str]]:
+    """User messages of 20-80 words, replies of 80-200 words."""
+    rng = random.Random(0)
+    words = "feel stale rise crust knead proof oven warm dough bread loaf crumb".split()
+    history = []
+    for _ in range(turns):
+        history.append({"role": "user", "content": " ".join(rng.choices(words, k=rng.randint(20, 80)))})
+        history.append({"role": "assistant",
+                        "content": " ".join(rng.choices(words, k=rng.randint(80, 200)))})
+    return history
+
+
+SESSION = make_session()
+
+
+def summarize(previous: str, messages: Sequence[Dict[str, str]]) -> str:
+    """Keep the tail of the text, about as long as a real summary."""
+    text = " ".join([previous, *(m["content"] for m in messages)])
+    return text[-SUMMARY_CHARS:]
+
+
+def turn_prompts(windowed: bool) -> List[int]:
+    """Prompt tokens of every turn of SESSION."""
+    window = ContextWindow(counter, summarize)
+    system = {"role": "system", "content": SYSTEM_MESSAGE}
+    tokens = []
+    for turn in range(1, TURNS + 1):
+        history = SESSION[:2 * turn - 1]
+        if windowed:
+            window.build(SYSTEM_MESSAGE, history)
+            tokens.append(window.last_stats.prompt_tokens)
+        else:
+            tokens.append(counter.count_messages([system, *history]))
+    return tokens
+
+
+def report() -> str:
+    """Prompt tokens per turn, full history against the window."""
+    full, windowed = turn_prompts(False), turn_prompts(True)
+    counting = "tiktoken" if counter.exact else "estimated"
+    lines = [f"{'turn':>6} {'full':>10} {'windowed':>10} {'saved':>7}   ({counting} tokens)"]
+    for turn in REPORT_TURNS:
+        lines.append(f"{turn:>6} {full[turn - 1]:>10} {windowed[turn - 1]:>10} "
+                     f"{1 - windowed[turn - 1] / full[turn - 1]:>7.0%}")
+    lines.append(f"{'total':>6} {sum(full):>10} {sum(windowed):>10} "
+                 f"{1 - sum(windowed) / sum(full):>7.0%}")
+    return "\n".join(lines)
+
+
+@suite.benchmark("context.session[full]", setup=lambda: False, rounds=5)
+def bench_full(windowed):
+    turn_prompts(windowed)
+
+
+@suite.benchmark("context.session[windowed]", setup=lambda: True, rounds=5)
+def bench_windowed(windowed):
+    turn_prompts(windowed)
+
+
+if __name__ == "__main__":
+    print(report() + "\n")
+    sys.exit(main(suite, BASELINES))
@@ -0,0 +1,94 @@
+"""
+Benchmarks for drawing the chat history on a rerun.
+
+Every Streamlit rerun draws the conversation again. Each benchmark times
+RERUNS reruns of a session of a given length, drawing the whole history (as
+the chat used to) or the newest page through HistoryView. A drawn message stands in for st.chat_message + st.markdown:
+the text is dedented and encoded, as Streamlit does before sending it.
+
+Usage (from therapy_app/):
+    python -m benchmarks.bench_history_render                  # compare
+    python -m benchmarks.bench_history_render --save-baseline  # re-record
+"""
+
+import random
+import sys
+import textwrap
+from pathlib import Path
+from typing import Dict, List
+
+from src.benchmarking import BenchmarkSuite, main
+from src.history_view import HistoryView
+
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+SESSION_LENGTHS = (50, 300, 1000)
+RERUNS = 20
+
+suite = BenchmarkSuite("history render")
+
+
+def make_session(length: int) -> List[Dict[str, str]]:
+    """Alternating messages of 20-200 words."""
+    rng = random.Random(length)
+    words = "feel stale rise crust knead proof oven warm dough bread loaf".split()
+    return [{"role": "user" if i % 2 == 0 else "assistant",
+             "content": " ".join(rng.choices(words, k=rng.randint(20, 200)))}
+            for i in range(length)]
+
+
+def draw(role: str, markdown: str) -> None:
+    """Cost of drawing one message element."""
+    textwrap.dedent(markdown).encode()
+
+
+def rerun_all(messages: List[Dict[str, str]]) -> int:
+    """What the chat used to do: draw every message."""
+    for message in messages:
+        draw(message["role"], message["content"])
+    return len(messages)
+
+
+def rerun_windowed(view: HistoryView, messages: List[Dict[str, str]]) -> int:
+    """Draw the visible page through the view."""
+    _, visible = view.visible(messages)
+    for role, markdown in visible:
+        draw(role, markdown)
+    return len(visible)
+
+
+def register(length: int) -> None:
+    """Add the full and windowed benchmarks for one session length."""
+    session = make_session(length)
+
+    @suite.benchmark(f"history.rerun[all,{length}]", setup=lambda: session, rounds=5)
+    def bench_all(messages):
+        for _ in range(RERUNS):
+            rerun_all(messages)
+
+    @suite.benchmark(f"history.rerun[windowed,{length}]",
+                     setup=lambda: (HistoryView(), session), rounds=5)
+    def bench_windowed(args):
+        view, messages = args
+        for _ in range(RERUNS):
+            rerun_windowed(view, messages)
+
+
+for _length in SESSION_LENGTHS:
+    register(_length)
+
+
+def elements() -> str:
+    """Messages drawn per rerun for each session length."""
+    lines = [f"{'messages':>8} {'all':>6} {'windowed':>9}"]
+    for length in SESSION_LENGTHS:
+        session = make_session(length)
+        lines.append(f"{length:>8} {rerun_all(session):>6} "
+                     f"{rerun_windowed(HistoryView(), session):>9}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(elements() + "\n")
+    sys.exit(main(suite, BASELINES))
@@ -0,0 +1,95 @@
+"""
+Benchmarks for intake scoring.
+
+Scores a batch of random answer sets several ways: by walking the nested
+QUESTIONS dicts (how analyze_responses used to work, kept here as the
+reference) and through the compiled WeightMatrix that analyze_responses
+uses now, with and without its per-selection result cache - and as one
+(respondents x questions) array through analyze_batch().
+
+Usage (from therapy_app/):
+    python -m benchmarks.bench_intake                  # compare
+    python -m benchmarks.bench_intake --save-baseline  # re-record
+"""
+
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from src.benchmarking import BenchmarkSuite, main
+from src.therapy_intake import TherapyIntake
+
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+ANSWER_SETS = 10000
+
+suite = BenchmarkSuite("intake")
+
+
+def make_responses(count: int = ANSWER_SETS) -> List[Dict]:
+    """Random complete answer sets, as the intake form submits them."""
+    rng = random.Random(0)
+    return [
+        {q["id"]: rng.randrange(len(q["options"])) if q["type"] == "multiple_choice" else "goals"
+         for q in TherapyIntake.QUESTIONS}
+        for _ in range(count)
+    ]
+
+
+RESPONSES = make_responses()
+
+
+def analyze_nested(questions: Sequence[Mapping], responses: Dict) -> Tuple[str, Dict[str, int]]:
+    """The dict-walking implementation the matrix replaced."""
+    scores: Dict[str, int] = {}
+    for question in questions:
+        if question["type"] == "multiple_choice":
+            question_id = question["id"]
+            if question_id in responses:
+                selected_index = responses[question_id]
+                if 0 <= selected_index < len(question["options"]):
+                    weights = question["options"][selected_index]["weights"]
+                    for therapist, weight in weights.items():
+                        scores[therapist] = scores.get(therapist, 0) + weight
+    if not scores:
+        return "Ciabatta (Person-Centered Therapy)", scores
+    return max(scores, key=scores.get), scores
+
+
+@suite.benchmark("intake.analyze[nested]", setup=lambda: RESPONSES, rounds=10)
+def bench_nested(batch):
+    questions = TherapyIntake.QUESTIONS
+    for responses in batch:
+        analyze_nested(questions, responses)
+
+
+@suite.benchmark("intake.analyze[matrix]", setup=lambda: RESPONSES, rounds=10)
+def bench_matrix(batch):
+    for responses in batch:
+        TherapyIntake.analyze_responses(responses)
+
+
+@suite.benchmark("intake.score[matrix,uncached]", setup=lambda: RESPONSES, rounds=10)
+def bench_matrix_uncached(batch):
+    matrix = TherapyIntake.weight_matrix()
+    for responses in batch:
+        matrix.score(matrix.selection(responses))
+
+
+@suite.benchmark("intake.analyze_batch[numpy]",
+                 setup=lambda: TherapyIntake.weight_matrix().responses_array(RESPONSES), rounds=10)
+def bench_batch(answers):
+    TherapyIntake.analyze_batch(answers)
+
+
+@suite.benchmark("intake.explanation", setup=lambda: [TherapyIntake.analyze_responses(r)
+                                                       for r in RESPONSES], rounds=10)
+def bench_explanation(results):
+    for therapist, scores in results:
+        TherapyIntake.get_recommendation_explanation(therapist, scores)
+
+
+if __name__ == "__main__":
+    sys.exit(main(suite, BASELINES))
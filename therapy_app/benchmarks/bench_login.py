@@ -0,0 +1,88 @@
+"""
+Benchmarks for login throughput under concurrent users.
+
+Client threads log a pool of users in at the same time, as a busy Streamlit
+server would. Each benchmark times one burst of LOGINS logins:
+
+    cold          every password goes through the KDF on a fresh hasher's pool,
+                  last_login batched (login_flush_interval=30)
+    write_through last_login written on every login (the default)
+
+PBKDF2 runs with BENCH_PBKDF2_ITERATIONS rounds (default 20000, well below
+the production default) so a burst takes a fraction of a second.
+
+Usage (from therapy_app/):
+    python -m benchmarks.bench_login                  # compare
+    python -m benchmarks.bench_login --save-baseline  # re-record
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.benchmarking import BenchmarkSuite, main
+from src.passwords import PasswordHasher
+from src.storage import JsonUserStore
+from src.user_manager import UserManager
+
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+USERS = 32
+CLIENTS = 16
+LOGINS = 64
+ITERATIONS = int(os.getenv("BENCH_PBKDF2_ITERATIONS", "20000"))
+
+suite = BenchmarkSuite("login")
+_root = Path(tempfile.mkdtemp(prefix="bench_login_"))
+atexit.register(shutil.rmtree, _root, ignore_errors=True)
+
+
+def make_manager(scheme: str, login_flush_interval: float = 30.0) -> UserManager:
+    """A manager with USERS accounts whose hashes are in `scheme`."""
+    hasher = PasswordHasher(scheme, iterations=ITERATIONS)
+    manager = UserManager(storage=JsonUserStore(_root / f"{scheme}-{login_flush_interval}"),
+                          hasher=hasher, login_flush_interval=login_flush_interval)
+    for i in range(USERS):
+        manager.create_user(f"user{i}", f"password{i}")
+    return manager
+
+
+def login_burst(manager: UserManager) -> None:
+    """Log LOGINS users in from CLIENTS threads."""
+    def login(i: int) -> None:
+        user = i % USERS
+        assert manager.authenticate(f"user{user}", f"password{user}")
+
+    with ThreadPoolExecutor(max_workers=CLIENTS) as clients:
+        list(clients.map(login, range(LOGINS)))
+
+
+def register(scheme: str) -> None:
+    """Add the cold and write-through bursts for one scheme."""
+    manager = make_manager(scheme)
+    write_through = make_manager(scheme, login_flush_interval=0)
+
+    def cold() -> UserManager:
+        manager.hasher = PasswordHasher(scheme, iterations=ITERATIONS)
+        return manager
+
+    @suite.benchmark(f"login.cold[{scheme}]", setup=cold, rounds=5)
+    def bench_cold(manager):
+        login_burst(manager)
+
+    @suite.benchmark(f"login.write_through[{scheme}]", setup=lambda: write_through, rounds=5)
+    def bench_write_through(manager):
+        login_burst(manager)
+
+
+for _scheme in ("sha256", "pbkdf2_sha256"):
+    register(_scheme)
+
+
+if __name__ == "__main__":
+    sys.exit(main(suite, BASELINES))
@@ -0,0 +1,102 @@
+"""
+Benchmarks for profile serialization formats.
+
+A long-time user's profile (thousands of session_history entries and
+progress notes) is saved and loaded through JsonUserStore in every
+installed format, and the bytes each format puts on disk are printed
+before the timings. The stores' window is set high enough that nothing is
+rolled over into the archive.
+
+Usage (from therapy_app/):
+    python -m benchmarks.bench_profile_formats                  # compare
+    python -m benchmarks.bench_profile_formats --save-baseline  # re-record
+"""
+
+import atexit
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+from src.benchmarking import BenchmarkSuite, main
+from src.serializers import available_formats
+from src.storage import JsonUserStore
+
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+SESSIONS = 2000
+NOTES = 2000
+
+suite = BenchmarkSuite("profile formats")
+_root = Path(tempfile.mkdtemp(prefix="bench_profile_formats_"))
+atexit.register(shutil.rmtree, _root, ignore_errors=True)
+
+
+def make_profile(sessions: int = SESSIONS, notes: int = NOTES) -> Dict[str, Any]:
+    """A profile shaped like UserManager's, with years of history."""
+    return {
+        "username": "longtime",
+        "password_hash": "0" * 64,
+        "created_at": "2021-01-01T09:00:00",
+        "last_login": "2025-01-01T09:00:00",
+        "assigned_therapist": "sourdough",
+        "recommended_therapist": "sourdough",
+        "intake_completed": True,
+        "intake_responses": {str(q): q % 4 for q in range(1, 13)},
+        "therapy_goals": ["Reduce anxiety", "Improve sleep"],
+        "progress_notes": [
+            {"date": f"2024-01-01T09:{i % 60:02d}:00",
+             "note": f"Practised the breathing exercise {i % 7} times this week.",
+             "therapist": "sourdough"}
+            for i in range(notes)
+        ],
+        "total_sessions": sessions,
+        "session_history": [
+            {"session_id": f"2024{i:06d}_090000", "therapist": "sourdough",
+             "date": f"2024-01-01T09:{i % 60:02d}:00", "message_count": i % 40}
+            for i in range(sessions)
+        ],
+    }
+
+
+PROFILE = make_profile()
+STORES = {
+    name: JsonUserStore(_root / name.replace("+", "_"), cache_size=0, profile_format=name,
+                        window=max(SESSIONS, NOTES))
+    for name in available_formats()
+}
+for _store in STORES.values():
+    _store._write_profile("longtime", PROFILE)
+
+
+def format_sizes() -> str:
+    """Bytes on disk per format."""
+    lines = [f"{'format':<16} {'bytes':>10} {'vs json':>8}"]
+    base = STORES["json"]._get_profile_path("longtime").stat().st_size
+    for name, store in STORES.items():
+        size = store._get_profile_path("longtime").stat().st_size
+        lines.append(f"{name:<16} {size:>10} {size / base:>7.2f}x")
+    return "\n".join(lines)
+
+
+def register(name: str, store: JsonUserStore) -> None:
+    """Add save and load benchmarks for one format."""
+
+    @suite.benchmark(f"profile_format.save[{name}]")
+    def bench_save(_):
+        store._write_profile("longtime", PROFILE)
+
+    @suite.benchmark(f"profile_format.load[{name}]")
+    def bench_load(_):
+        store.get_profile("longtime")
+
+
+for _name, _store in STORES.items():
+    register(_name, _store)
+
+
+if __name__ == "__main__":
+    print(format_sizes() + "\n")
+    sys.exit(main(suite, BASELINES))
@@ -0,0 +1,127 @@
+"""
+Benchmarks for the search pipeline hot path.
+
+Every stage between the SDK response object and the text shown to the user
+is timed against large synthetic responses (thousands of annotations and
+sources), and compared with baselines.json.
+
+Usage (from therapy_app/):
+    python -m benchmarks.bench_search_pipeline                  # compare
+    python -m benchmarks.bench_search_pipeline --save-baseline  # re-record
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from src.benchmarking import BenchmarkSuite, main
+from src.client import WebSearchClient
+from src.parser import ResponseParser
+
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+ANNOTATIONS = 5000
+SOURCES = 2000
+
+suite = BenchmarkSuite("search pipeline")
+parser = ResponseParser()
+
+
+def make_response(annotations: int = ANNOTATIONS, sources: int = SOURCES) -> Dict[str, Any]:
+    """A response dictionary shaped like the API's, scaled up."""
+    sentence = "Researchers announced a notable result in the field today. "
+    text = sentence * annotations
+    return {
+        "id": "resp_bench",
+        "model": "gpt-4o-mini",
+        "created": 1728576000,
+        "output": [
+            {
+                "type": "web_search_call",
+                "id": "ws_bench",
+                "status": "completed",
+                "action": {
+                    "type": "search",
+                    "query": "benchmark",
+                    "domains": None,
+                    "sources": [
+                        {"url": f"https://example{i}.com/article/{i}", "type": "web"}
+                        for i in range(sources)
+                    ],
+                },
+            },
+            {
+                "type": "message",
+                "id": "msg_bench",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{
+                    "type": "output_text",
+                    "text": text,
+                    "annotations": [
+                        {
+                            "type": "url_citation",
+                            "url": f"https://example{i % sources}.com/article/{i}",
+                            "title": f"Article {i}",
+                            "start_index": i * len(sentence),
+                            "end_index": (i + 1) * len(sentence) - 1,
+                        }
+                        for i in range(annotations)
+                    ],
+                }],
+            },
+        ],
+    }
+
+
+def to_sdk_object(value: Any) -> Any:
+    """Mimic the SDK's attribute-style response objects."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: to_sdk_object(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_sdk_object(v) for v in value]
+    return value
+
+
+RESPONSE = make_response()
+SDK_RESPONSE = to_sdk_object(RESPONSE)
+ANNOTATION_LIST = RESPONSE["output"][1]["content"][0]["annotations"]
+ACTION = RESPONSE["output"][0]["action"]
+RESULT = parser.parse(RESPONSE, "benchmark")
+CLIENT = WebSearchClient.__new__(WebSearchClient)  # no API key or network needed
+
+
+@suite.benchmark("client._response_to_dict")
+def bench_response_to_dict(_):
+    CLIENT._response_to_dict(SDK_RESPONSE)
+
+
+@suite.benchmark("parser.parse")
+def bench_parse(_):
+    parser.parse(RESPONSE, "benchmark")
+
+
+@suite.benchmark("parser._extract_citations")
+def bench_extract_citations(_):
+    parser._extract_citations(ANNOTATION_LIST)
+
+
+@suite.benchmark("parser._extract_sources")
+def bench_extract_sources(_):
+    parser._extract_sources(ACTION)
+
+
+@suite.benchmark("parser.format_for_display")
+def bench_format_for_display(_):
+    parser.format_for_display(RESULT)
+
+
+@suite.benchmark("pipeline.end_to_end")
+def bench_end_to_end(_):
+    parser.format_for_display(parser.parse(CLIENT._response_to_dict(SDK_RESPONSE), "benchmark"))
+
+
+if __name__ == "__main__":
+    sys.exit(main(suite, BASELINES))
@@ -0,0 +1,88 @@
+"""
+Benchmarks for saving chat sessions from the request thread.
+
+Each benchmark plays EXCHANGES exchanges (a user message and a reply) of a
+new session and times only what the chat's request thread waits for:
+
+    sync        log_session() on every 4th message, as the chat used to
+    background  SessionWriter.save() after every exchange; the writer's
+                thread does the disk work (flushed between rounds)
+
+The writer's counters - writes, coalesced saves, flush latency - are
+printed after the timings.
+
+Usage (from therapy_app/):
+    python -m benchmarks.bench_session_save                  # compare
+    python -m benchmarks.bench_session_save --save-baseline  # re-record
+"""
+
+import atexit
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from src.benchmarking import BenchmarkSuite, main
+from src.session_writer import SessionWriter
+from src.storage import JsonUserStore
+from src.user_manager import UserManager
+
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+EXCHANGES = 40
+REPLY = "Like dough, feelings need time to rise. " * 20
+
+suite = BenchmarkSuite("session save")
+_root = Path(tempfile.mkdtemp(prefix="bench_session_save_"))
+atexit.register(shutil.rmtree, _root, ignore_errors=True)
+
+manager = UserManager(storage=JsonUserStore(_root))
+manager.create_user("bench", "bench-password")
+writer = SessionWriter(manager)
+
+
+def exchanges() -> List[List[Dict[str, str]]]:
+    """The transcript after each exchange."""
+    messages: List[Dict[str, str]] = []
+    transcripts = []
+    for i in range(EXCHANGES):
+        messages.extend([{"role": "user", "content": f"How do I stop feeling stale? ({i})"},
+                         {"role": "assistant", "content": REPLY}])
+        transcripts.append(list(messages))
+    return transcripts
+
+
+TRANSCRIPTS = exchanges()
+
+
+@suite.benchmark("session_save.sync", setup=lambda: TRANSCRIPTS, rounds=10)
+def bench_sync(transcripts):
+    session_id = None
+    for messages in transcripts:
+        if len(messages) % 4 == 0:
+            session_id = manager.log_session("bench", "Dr. Rye", messages, session_id=session_id)
+
+
+@suite.benchmark("session_save.background",
+                 setup=lambda: writer.flush() and TRANSCRIPTS, rounds=10)
+def bench_background(transcripts):
+    session_id = None
+    for messages in transcripts:
+        session_id = writer.save("bench", "Dr. Rye", messages, session_id=session_id)
+
+
+def writer_report() -> str:
+    """Counters of the writer after the background rounds."""
+    writer.flush()
+    stats = writer.stats
+    return (f"background: {stats.saves} saves, {stats.coalesced} coalesced, "
+            f"{stats.writes} writes, max depth {stats.max_depth}, "
+            f"mean flush latency {stats.mean_latency * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    status = main(suite, BASELINES)
+    print("\n" + writer_report())
+    sys.exit(status)
@@ -0,0 +1,82 @@
+"""
+Benchmarks for rendering a streamed chat reply.
+
+A long reply arrives as thousands of small deltas. Each frame is "drawn" by
+encoding the whole text so far, standing in for Streamlit re-rendering the
+markdown and sending it over the websocket. Redrawing on every delta is
+compared with StreamRenderer's throttled frames; the frames and bytes each
+approach pushes are printed before the timings.
+
+Usage (from therapy_app/):
+    python -m benchmarks.bench_stream_render                  # compare
+    python -m benchmarks.bench_stream_render --save-baseline  # re-record
+"""
+
+import sys
+from pathlib import Path
+from typing import List
+
+from src.benchmarking import BenchmarkSuite, main
+from src.stream_renderer import CURSOR, RenderStats, StreamRenderer
+
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+DELTAS = 4000
+
+suite = BenchmarkSuite("stream render")
+REPLY: List[str] = [f"word{i % 10} " for i in range(DELTAS)]
+
+
+def draw(text: str) -> None:
+    """Cost of pushing one frame: proportional to the text so far."""
+    text.encode()
+
+
+def render_every_delta(deltas: List[str]) -> RenderStats:
+    """What the chat loop used to do: concatenate and redraw per delta."""
+    stats = RenderStats()
+    full_response = ""
+    for delta in deltas:
+        full_response += delta
+        frame = full_response + CURSOR
+        draw(frame)
+        stats.frames += 1
+        stats.bytes_pushed += len(frame.encode())
+    draw(full_response)
+    stats.frames += 1
+    stats.bytes_pushed += len(full_response.encode())
+    return stats
+
+
+def render_throttled(deltas: List[str]) -> RenderStats:
+    """StreamRenderer with its default 50 ms / 200 character budget."""
+    renderer = StreamRenderer(draw)
+    for delta in deltas:
+        renderer.feed(delta)
+    renderer.finish()
+    return renderer.stats
+
+
+def traffic() -> str:
+    """Frames and bytes pushed by each approach."""
+    lines = [f"{'renderer':<16} {'frames':>8} {'bytes':>12}"]
+    for name, fn in (("every delta", render_every_delta), ("throttled", render_throttled)):
+        stats = fn(REPLY)
+        lines.append(f"{name:<16} {stats.frames:>8} {stats.bytes_pushed:>12}")
+    return "\n".join(lines)
+
+
+@suite.benchmark("stream_render.every_delta", setup=lambda: REPLY, rounds=10)
+def bench_every_delta(deltas):
+    render_every_delta(deltas)
+
+
+@suite.benchmark("stream_render.throttled", setup=lambda: REPLY, rounds=10)
+def bench_throttled(deltas):
+    render_throttled(deltas)
+
+
+if __name__ == "__main__":
+    print(traffic() + "\n")
+    sys.exit(main(suite, BASELINES))
@@ -0,0 +1,98 @@
+"""
+Benchmarks for the JSON user store's directory layouts.
+
+Profile lookup, profile creation and a full listing of usernames are timed
+against a flat and a sharded tree of the same size. Trees are generated in
+a temporary directory (outside the timed region) and deleted afterwards.
+
+The default size is 10^5 users; set BENCH_USER_COUNTS to run more sizes,
+e.g. BENCH_USER_COUNTS=100000,1000000 (the 10^6 trees need a few GB of free
+inodes and several minutes to build).
+
+Usage (from therapy_app/):
+    python -m benchmarks.bench_user_store                  # compare
+    python -m benchmarks.bench_user_store --save-baseline  # re-record
+"""
+
+import atexit
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from itertools import count
+from pathlib import Path
+from typing import Dict, List
+
+from src.benchmarking import BenchmarkSuite, main
+from src.storage import JsonUserStore, LAYOUTS
+
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+USER_COUNTS = [int(n) for n in os.getenv("BENCH_USER_COUNTS", "100000").split(",")]
+LOOKUPS = 1000
+CREATES = 200
+
+suite = BenchmarkSuite("user store")
+_root = Path(tempfile.mkdtemp(prefix="bench_user_store_"))
+atexit.register(shutil.rmtree, _root, ignore_errors=True)
+_stores: Dict[str, JsonUserStore] = {}
+_new_names = count()
+
+
+def build_tree(layout: str, users: int) -> JsonUserStore:
+    """Write `users` minimal profiles directly (no locking or fsync)."""
+    key = f"{layout}-{users}"
+    if key not in _stores:
+        store = JsonUserStore(_root / key, cache_size=0, layout=layout)
+        made = set()
+        for i in range(users):
+            path = store._get_profile_path(f"user{i}")
+            if path.parent not in made:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                made.add(path.parent)
+            path.write_text(json.dumps({"username": f"user{i}", "progress_notes": []}))
+        _stores[key] = store
+    return _stores[key]
+
+
+def register(layout: str, users: int) -> None:
+    """Add the lookup, create and list benchmarks for one tree."""
+    rng = random.Random(users)
+
+    def lookup_names() -> List[str]:
+        build_tree(layout, users)
+        return [f"user{rng.randrange(users)}" for _ in range(LOOKUPS)]
+
+    def create_names() -> List[str]:
+        build_tree(layout, users)
+        return [f"new{next(_new_names)}" for _ in range(CREATES)]
+
+    @suite.benchmark(f"user_store.lookup[{layout},{users}]", setup=lookup_names)
+    def bench_lookup(names):
+        store = _stores[f"{layout}-{users}"]
+        for name in names:
+            store.get_profile(name)
+
+    @suite.benchmark(f"user_store.create[{layout},{users}]", setup=create_names, rounds=10)
+    def bench_create(names):
+        store = _stores[f"{layout}-{users}"]
+        for name in names:
+            store.create_profile({"username": name, "progress_notes": []})
+
+    @suite.benchmark(f"user_store.list[{layout},{users}]", setup=lambda: build_tree(layout, users),
+                     rounds=5)
+    def bench_list(store):
+        for _ in store.iter_usernames():
+            pass
+
+
+for _users in USER_COUNTS:
+    for _layout in LAYOUTS:
+        register(_layout, _users)
+
+
+if __name__ == "__main__":
+    sys.exit(main(suite, BASELINES))
@@ -7,10 +7,21 @@ This package provides a CLI tool for performing web searches using OpenAI's API.
 __version__ = "1.0.0"
 __author__ = "Enterprise Development Team"
 
-from src.models import SearchOptions, SearchResult, Citation, Source, SearchError
-from src.client import WebSearchClient
-from src.parser import ResponseParser
+from src.models import (
+    SearchOptions,
+    SearchResult,
+    Citation,
+    Source,
+    SearchError,
+    BatchSearchResult,
+    BatchStats,
+    StreamUpdate,
+)
+from src.client import WebSearchClient, AsyncWebSearchClient
+from src.parser import ResponseParser, StreamingResponseParser
 from src.search_service import SearchService
+from src.cache import SearchCache, MemoryCache, DiskCache
+from src.rate_limit import RateLimiter
 
 __all__ = [
     "SearchOptions",
@@ -18,7 +29,16 @@ __all__ = [
     "Citation",
     "Source",
     "SearchError",
+    "BatchSearchResult",
+    "BatchStats",
+    "StreamUpdate",
     "WebSearchClient",
+    "AsyncWebSearchClient",
     "ResponseParser",
+    "StreamingResponseParser",
     "SearchService",
+    "SearchCache",
+    "MemoryCache",
+    "DiskCache",
+    "RateLimiter",
 ]
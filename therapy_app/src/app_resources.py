@@ -0,0 +1,124 @@
+"""
+Shared resources for the Streamlit app.
+
+Streamlit re-executes streamlit_app.py from the top on every interaction,
+so anything the script builds at module level is rebuilt each time: a new
+OpenAI client (and with it a new connection pool, so a new TCP/TLS
+handshake for the next request) and a new UserManager (directory checks
+and an empty profile cache). The app wraps these factories in
+st.cache_resource so each server process builds them once and every
+session and rerun shares them; both objects are safe to use from several
+threads.
+
+Each conversation also gets its own ContextWindow, which bounds the prompt
+sent per turn. Its limits come from the environment:
+
+    CHAT_RECENT_MESSAGES     messages always sent verbatim (default 12)
+    CHAT_SUMMARY_BATCH       extra messages collected before folding (default 8)
+    CHAT_MAX_PROMPT_TOKENS   prompt token budget (default 6000)
+    CHAT_SUMMARY_MODEL       model that writes the summaries (default gpt-4o-mini)
+
+and a HistoryView, which bounds what each rerun draws:
+
+    CHAT_HISTORY_PAGE_SIZE   messages shown per "load earlier" page (default 20)
+
+Sessions are saved in the background by one shared SessionWriter:
+
+    CHAT_SAVE_DEBOUNCE       quiet seconds before a session is written (default 2)
+    CHAT_SAVE_MAX_DELAY      longest a changed session waits (default 10)
+    CHAT_SAVE_MAX_PENDING    sessions waiting at most (default 256)
+"""
+
+import os
+from typing import Optional
+
+import httpx
+from openai import DefaultHttpxClient, OpenAI
+
+from src.context_window import ContextWindow, TokenCounter, make_summarizer
+from src.history_view import HistoryView
+from src.session_writer import SessionWriter
+from src.user_manager import UserManager
+
+
+def create_chat_client(
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    keepalive_expiry: float = 30.0,
+) -> OpenAI:
+    """
+    Build the OpenAI client the chat uses, on a pooled HTTP transport.
+
+    Args:
+        api_key: OpenAI API key (default: OPENAI_API_KEY)
+        base_url: Alternative API root, e.g. a local fake server
+            (default: OPENAI_BASE_URL or the real OpenAI endpoint)
+        max_connections: Upper bound on concurrent connections
+        max_keepalive_connections: Idle connections kept open for reuse
+        keepalive_expiry: Seconds an idle connection stays in the pool
+
+    Returns:
+        The client
+
+    Raises:
+        ValueError: If the connection limits are not positive
+    """
+    if max_connections < 1 or max_keepalive_connections < 0:
+        raise ValueError("Connection limits must be positive")
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(max_keepalive_connections, max_connections),
+        keepalive_expiry=keepalive_expiry,
+    )
+    return OpenAI(
+        api_key=api_key or os.getenv("OPENAI_API_KEY"),
+        base_url=base_url,
+        http_client=DefaultHttpxClient(limits=limits),
+    )
+
+
+def create_user_manager(data_dir: str = "user_data") -> UserManager:
+    """Build the UserManager every session shares (configured from the environment)."""
+    return UserManager(data_dir=data_dir)
+
+
+def create_session_writer(user_manager: UserManager) -> SessionWriter:
+    """Build the background session writer every session shares (configured from CHAT_SAVE_*)."""
+    return SessionWriter(
+        user_manager,
+        debounce=float(os.getenv("CHAT_SAVE_DEBOUNCE", "2")),
+        max_delay=float(os.getenv("CHAT_SAVE_MAX_DELAY", "10")),
+        max_pending=int(os.getenv("CHAT_SAVE_MAX_PENDING", "256")),
+    )
+
+
+def create_token_counter(model: str) -> TokenCounter:
+    """Build the token counter for one chat model (shared by all sessions)."""
+    return TokenCounter(model)
+
+
+def create_context_window(client: OpenAI, counter: TokenCounter) -> ContextWindow:
+    """
+    Build the context window for one conversation.
+
+    Args:
+        client: Client the summaries are requested through
+        counter: Token counter for the conversation's model
+
+    Returns:
+        The window, configured from the CHAT_* environment variables
+    """
+    return ContextWindow(
+        counter,
+        make_summarizer(client, model=os.getenv("CHAT_SUMMARY_MODEL", "gpt-4o-mini")),
+        recent_messages=int(os.getenv("CHAT_RECENT_MESSAGES", "12")),
+        summary_batch=int(os.getenv("CHAT_SUMMARY_BATCH", "8")),
+        max_prompt_tokens=int(os.getenv("CHAT_MAX_PROMPT_TOKENS", "6000")),
+    )
+
+
+def create_history_view() -> HistoryView:
+    """Build the history view for one conversation (page size from CHAT_HISTORY_PAGE_SIZE)."""
+    return HistoryView(page_size=int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "20")))
@@ -0,0 +1,272 @@
+"""
+Small benchmark harness with checked-in baselines.
+
+This module times registered benchmarks, measures their peak Python memory,
+and compares both against a baselines file so that a change which makes a
+hot path slower or hungrier fails loudly instead of silently.
+
+Benchmarks live in therapy_app/benchmarks/ and are run with `make bench`.
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing and memory figures for one benchmark."""
+
+    name: str
+    rounds: int
+    median_seconds: float
+    min_seconds: float
+    mean_seconds: float
+    peak_memory_bytes: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BenchmarkResult":
+        """Rebuild a result saved with to_dict()."""
+        return cls(**data)
+
+
+@dataclass
+class Regression:
+    """A benchmark metric that got worse than its baseline allows."""
+
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """Current value as a multiple of the baseline."""
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+@dataclass
+class _Benchmark:
+    name: str
+    fn: Callable[[Any], Any]
+    setup: Optional[Callable[[], Any]]
+    rounds: int
+
+
+def measure(fn: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None,
+            rounds: int = 20, warmup: int = 1) -> BenchmarkResult:
+    """
+    Time fn and record its peak memory.
+
+    setup() runs outside the timed region and its return value is passed to
+    fn. Memory is measured in a separate run because tracemalloc slows
+    allocation-heavy code down enough to distort the timings.
+
+    Args:
+        fn: Function under test, called as fn(setup())
+        setup: Builds the input for each call (None passes None)
+        rounds: Timed calls
+        warmup: Untimed calls made first
+
+    Returns:
+        BenchmarkResult named after fn
+
+    Raises:
+        ValueError: If rounds is less than 1
+    """
+    if rounds < 1:
+        raise ValueError("rounds must be at least 1")
+
+    def prepare() -> Any:
+        return setup() if setup is not None else None
+
+    for _ in range(warmup):
+        fn(prepare())
+
+    timings = []
+    for _ in range(rounds):
+        arg = prepare()
+        gc.collect()
+        started = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - started)
+
+    arg = prepare()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        name=getattr(fn, "__name__", "benchmark"),
+        rounds=rounds,
+        median_seconds=statistics.median(timings),
+        min_seconds=min(timings),
+        mean_seconds=statistics.mean(timings),
+        peak_memory_bytes=peak,
+    )
+
+
+class BenchmarkSuite:
+    """
+    A named collection of benchmarks.
+
+    EXAMPLE USAGE:
+    >>> suite = BenchmarkSuite("parser")
+    >>> @suite.benchmark("parse", setup=make_response)
+    ... def bench_parse(response):
+    ...     ResponseParser().parse(response, "q")
+    >>> results = suite.run()
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._benchmarks: List[_Benchmark] = []
+
+    def benchmark(self, name: str, setup: Optional[Callable[[], Any]] = None,
+                  rounds: int = 20) -> Callable[[Callable[[Any], Any]], Callable[[Any], Any]]:
+        """Decorator registering fn as a benchmark."""
+        def register(fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+            self._benchmarks.append(_Benchmark(name, fn, setup, rounds))
+            return fn
+        return register
+
+    @property
+    def names(self) -> List[str]:
+        """Names of the registered benchmarks, in registration order."""
+        return [b.name for b in self._benchmarks]
+
+    def run(self, match: Optional[str] = None, rounds: Optional[int] = None) -> List[BenchmarkResult]:
+        """
+        Run the benchmarks.
+
+        Args:
+            match: Only run benchmarks whose name contains this substring
+            rounds: Override every benchmark's round count
+
+        Returns:
+            One result per benchmark run
+        """
+        results = []
+        for bench in self._benchmarks:
+            if match and match not in bench.name:
+                continue
+            result = measure(bench.fn, bench.setup, rounds or bench.rounds)
+            result.name = bench.name
+            results.append(result)
+        return results
+
+
+def load_baselines(path: Union[str, Path]) -> Dict[str, BenchmarkResult]:
+    """Read a baselines file; a missing file means no baselines."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {name: BenchmarkResult.from_dict(entry) for name, entry in data.items()}
+
+
+def save_baselines(path: Union[str, Path], results: List[BenchmarkResult],
+                   existing: Optional[Dict[str, BenchmarkResult]] = None) -> None:
+    """Write results as baselines, keeping any other entries in existing."""
+    merged = dict(existing or {})
+    merged.update({r.name: r for r in results})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({name: merged[name].to_dict() for name in sorted(merged)}, f, indent=2)
+        f.write("\n")
+
+
+def compare(results: List[BenchmarkResult], baselines: Dict[str, BenchmarkResult],
+            threshold: float = 0.25, memory_threshold: Optional[float] = None) -> List[Regression]:
+    """
+    Find results that are worse than their baselines.
+
+    The fastest round is compared, as timeit recommends: slower rounds
+    measure interference from the rest of the machine, not the code.
+
+    Args:
+        results: Fresh results
+        baselines: Saved results by name (missing names are skipped)
+        threshold: Allowed fractional slowdown, e.g. 0.25 = 25%
+        memory_threshold: Allowed fractional memory growth (defaults to threshold)
+
+    Returns:
+        Every metric that exceeded its allowance
+    """
+    if memory_threshold is None:
+        memory_threshold = threshold
+
+    regressions = []
+    for result in results:
+        baseline = baselines.get(result.name)
+        if baseline is None:
+            continue
+        if result.min_seconds > baseline.min_seconds * (1 + threshold):
+            regressions.append(Regression(result.name, "min_seconds",
+                                          baseline.min_seconds, result.min_seconds))
+        if result.peak_memory_bytes > baseline.peak_memory_bytes * (1 + memory_threshold):
+            regressions.append(Regression(result.name, "peak_memory_bytes",
+                                          baseline.peak_memory_bytes, result.peak_memory_bytes))
+    return regressions
+
+
+def format_report(results: List[BenchmarkResult],
+                  baselines: Optional[Dict[str, BenchmarkResult]] = None) -> str:
+    """Render results (and their change against baselines) as a table."""
+    baselines = baselines or {}
+    lines = [f"{'benchmark':<40} {'median ms':>10} {'min ms':>10} {'peak KiB':>10} {'vs base':>8}"]
+    for r in results:
+        base = baselines.get(r.name)
+        change = f"{r.min_seconds / base.min_seconds:>7.2f}x" if base and base.min_seconds else f"{'-':>8}"
+        lines.append(
+            f"{r.name:<40} {r.median_seconds * 1000:>10.2f} {r.min_seconds * 1000:>10.2f} "
+            f"{r.peak_memory_bytes / 1024:>10.1f} {change}"
+        )
+    return "\n".join(lines)
+
+
+def main(suite: BenchmarkSuite, baseline_path: Union[str, Path],
+         argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point shared by every benchmark script.
+
+    Returns:
+        0 on success, 1 if any benchmark regressed past the threshold
+    """
+    parser = argparse.ArgumentParser(description=f"Run the {suite.name} benchmarks")
+    parser.add_argument("-k", dest="match", help="Only run benchmarks containing this text")
+    parser.add_argument("--rounds", type=int, help="Override the number of timed rounds")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown before failing (default: 0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Record these results as the new baselines")
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines(baseline_path)
+    results = suite.run(args.match, args.rounds)
+    print(format_report(results, baselines))
+
+    if args.save_baseline:
+        save_baselines(baseline_path, results, baselines)
+        print(f"\nSaved {len(results)} baseline(s) to {baseline_path}")
+        return 0
+
+    regressions = compare(results, baselines, args.threshold)
+    for reg in regressions:
+        print(f"REGRESSION {reg.name}: {reg.metric} {reg.baseline:.6g} -> {reg.current:.6g} "
+              f"({reg.ratio:.2f}x)")
+    return 1 if regressions else 0
@@ -0,0 +1,321 @@
+"""
+Result caches for SearchService.
+
+This module provides pluggable TTL + LRU caches for parsed search results,
+keyed on the normalized query plus every SearchOptions field.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Optional, Tuple, Union
+
+from src.models import SearchOptions, SearchResult
+
+
+def make_cache_key(query: str, options: SearchOptions) -> str:
+    """
+    Build a stable cache key for a search.
+
+    The query is whitespace-collapsed and case-folded so trivially different
+    spellings share an entry. Every SearchOptions field is part of the key,
+    so a new option can never be served a result computed without it.
+
+    Args:
+        query: The search query
+        options: Search configuration
+
+    Returns:
+        Hex digest identifying the (query, options) pair
+    """
+    fields = asdict(options)
+    if fields.get("allowed_domains"):
+        fields["allowed_domains"] = sorted(d.lower() for d in fields["allowed_domains"])
+    fields["query"] = " ".join(query.split()).casefold()
+
+    encoded = json.dumps(fields, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class SearchCache(ABC):
+    """
+    Interface for SearchService result caches.
+
+    Entries expire after a per-entry TTL and are evicted least-recently-used
+    first once either max_entries or max_bytes is exceeded.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        default_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the shared cache settings.
+
+        Args:
+            max_entries: Maximum number of cached results
+            max_bytes: Maximum total size of serialized results (None = unbounded)
+            default_ttl: Seconds an entry lives unless set() overrides it
+            clock: Time source, injectable for tests
+
+        Raises:
+            ValueError: If a limit is not positive
+        """
+        if max_entries < 1 or (max_bytes is not None and max_bytes < 1) or default_ttl <= 0:
+            raise ValueError("Cache limits and TTL must be positive")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self._stats = CacheStats()
+        self._lock = threading.RLock()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[SearchResult]:
+        """Return the cached result for key, or None on a miss."""
+
+    @abstractmethod
+    def set(self, key: str, result: SearchResult, ttl: Optional[float] = None) -> None:
+        """Store a result under key for ttl seconds (default_ttl if None)."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry (counters are kept)."""
+
+    @property
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        """Snapshot of hit/miss/eviction counters and current size."""
+
+    def _encode(self, result: SearchResult) -> str:
+        """Serialize a result; the encoded length is the entry's byte cost."""
+        return json.dumps(result.to_dict(), separators=(",", ":"))
+
+    def _decode(self, payload: str) -> SearchResult:
+        """Rebuild a fresh SearchResult so callers can't mutate the cache."""
+        return SearchResult.from_dict(json.loads(payload))
+
+    def _fits(self, size: int) -> bool:
+        """Whether a single entry of this size may be cached at all."""
+        return self.max_bytes is None or size <= self.max_bytes
+
+
+class MemoryCache(SearchCache):
+    """In-process LRU cache backed by an OrderedDict."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # key -> (payload, size, expires_at); order = least recently used first
+        self._entries: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[SearchResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+
+            payload, _, expires_at = entry
+            if expires_at <= self.clock():
+                self._remove(key)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+        return self._decode(payload)
+
+    def set(self, key: str, result: SearchResult, ttl: Optional[float] = None) -> None:
+        payload = self._encode(result)
+        size = len(payload.encode("utf-8"))
+        if not self._fits(size):
+            return
+
+        expires_at = self.clock() + (ttl if ttl is not None else self.default_ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (payload, size, expires_at)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+class DiskCache(SearchCache):
+    """
+    SQLite-backed cache that survives process restarts.
+
+    Expiry uses wall-clock time so entries stay valid across restarts;
+    recency is tracked with a monotonically increasing access counter.
+    """
+
+    def __init__(self, path: Union[str, Path], *args, **kwargs):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file to store entries in
+            *args, **kwargs: Passed through to SearchCache
+        """
+        super().__init__(*args, **kwargs)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)"
+        )
+        self._conn.commit()
+        self._access_seq = self._conn.execute(
+            "SELECT COALESCE(MAX(last_access), 0) FROM entries"
+        ).fetchone()[0]
+
+    def get(self, key: str) -> Optional[SearchResult]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats.misses += 1
+                return None
+
+            payload, expires_at = row
+            if expires_at <= self.clock():
+                with self._conn:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE entries SET last_access = ? WHERE key = ?",
+                    (self._next_access(), key),
+                )
+            self._stats.hits += 1
+        return self._decode(payload)
+
+    def set(self, key: str, result: SearchResult, ttl: Optional[float] = None) -> None:
+        payload = self._encode(result)
+        size = len(payload.encode("utf-8"))
+        if not self._fits(size):
+            return
+
+        expires_at = self.clock() + (ttl if ttl is not None else self.default_ttl)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, payload, size, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, expires_at, self._next_access()),
+            )
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            entries, total_bytes = self._totals()
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                entries=entries,
+                bytes=total_bytes,
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _next_access(self) -> int:
+        self._access_seq += 1
+        return self._access_seq
+
+    def _totals(self) -> Tuple[int, int]:
+        return self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used rows until both limits are satisfied."""
+        entries, total_bytes = self._totals()
+        while entries > self.max_entries or (
+            self.max_bytes is not None and total_bytes > self.max_bytes
+        ):
+            key, size = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            entries -= 1
+            total_bytes -= size
+            self._stats.evictions += 1
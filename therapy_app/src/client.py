@@ -28,11 +28,25 @@ LEARNING OBJECTIVES:
 ✓ Appreciate separation of concerns (Client = communication ONLY)
 """
 
+import asyncio
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Iterator
+
+# HTTP transport used by the OpenAI SDK - lets us tune connection pooling
+import httpx
 
 # OpenAI's official Python library - handles HTTPS, auth, retries
-from openai import OpenAI, AuthenticationError, RateLimitError, APIError
+from openai import (
+    OpenAI,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DEFAULT_MAX_RETRIES,
+    AuthenticationError,
+    RateLimitError,
+    APIConnectionError,
+    InternalServerError,
+    APIError,
+)
 
 # Load environment variables from .env file (keeps secrets out of code)
 from dotenv import load_dotenv
@@ -40,6 +54,9 @@ from dotenv import load_dotenv
 # Our data models from Chapter 1
 from src.models import SearchOptions, SearchError
 
+# Shared client-side throttling (requests/min, tokens/min, 429 backoff)
+from src.rate_limit import RateLimiter
+
 
 # ============================================================================
 # INITIALIZATION: Load secrets before any class code runs
@@ -59,101 +76,76 @@ from src.models import SearchOptions, SearchError
 # If you commit hardcoded keys to git, they're public forever (even if deleted).
 load_dotenv()
 
+#: Failures retried with jittered backoff when a RateLimiter is configured -
+#: the same ones the SDK retries on its own (429, 5xx, timeouts, connections)
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
 
 # ============================================================================
-# THE CLIENT CLASS: Our Messenger to OpenAI
+# ERROR TRANSLATION: One mapping shared by the sync and async clients
 # ============================================================================
 
-class WebSearchClient:
+def _to_search_error(error: Exception) -> SearchError:
     """
-    Client for interacting with OpenAI's web search API.
-    
-    📚 CONCEPT: The Client Pattern
-    -------------------------------
-    A "client" in software is code that talks to a server/service. Think of it
-    like a restaurant:
-    - You → tell the waiter what you want (user code)
-    - Waiter → tells the kitchen (client)
-    - Kitchen → prepares food (OpenAI's servers)
-    - Waiter → brings food back (client returns response)
-    
-    This class ONLY handles communication. It doesn't:
-    - ❌ Validate business logic (that's the service layer)
-    - ❌ Parse responses (that's the parser)
-    - ❌ Present to users (that's the main app)
-    
-    It DOES:
-    - ✓ Manage authentication
-    - ✓ Build HTTP requests  
-    - ✓ Handle network errors
-    - ✓ Translate API errors into our domain errors
-    
-    📝 DESIGN DECISION: Why a Class?
-    ---------------------------------
-    We could have used functions:
-    
-    def search(api_key: str, query: str) -> dict:
-        ...
+    Translate an exception raised by the OpenAI SDK into our domain error.
+
+    📝 PATTERN: Single Source of Truth
+    -----------------------------------
+    Both WebSearchClient and AsyncWebSearchClient call this, so callers see
+    exactly the same error codes no matter which client they picked.
+
+    Args:
+        error: Exception raised while talking to the API
+
+    Returns:
+        SearchError carrying a machine-readable code
+    """
+    if isinstance(error, SearchError):
+        return error
+    if isinstance(error, AuthenticationError):
+        return SearchError(
+            code="AUTHENTICATION_ERROR",
+            message="Invalid API key or authentication failed",
+            details={"original_error": str(error)}
+        )
+    if isinstance(error, RateLimitError):
+        return SearchError(
+            code="RATE_LIMIT_ERROR",
+            message="API rate limit exceeded",
+            details={"original_error": str(error)}
+        )
+    if isinstance(error, APIError):
+        # Fallback for generic API errors (specific ones handled above)
+        return SearchError(
+            code="API_ERROR",
+            message=f"API request failed: {str(error)}",
+            details={"original_error": str(error)}
+        )
+    # Defensive fallback - should not be reached in normal operation
+    return SearchError(
+        code="UNKNOWN_ERROR",
+        message=f"Unexpected error: {str(error)}",
+        details={"original_error": str(error)}
+    )
+
+# ============================================================================
+# SHARED PLUMBING: Everything the sync and async clients have in common
+# ============================================================================
+
+class _SearchClientBase:
+    """
+    Validation, payload construction and response conversion shared by
+    WebSearchClient and AsyncWebSearchClient.
     
-    But a class is better because:
-    1. State management (api_key stored once, not passed everywhere)
-    2. Multiple related methods (search, validate, construct_payload)
-    3. Easy to mock in tests
-    4. Follows industry patterns (easier for others to understand)
+    📝 DESIGN DECISION: Siblings, Not Parent and Child
+    --------------------------------------------------
+    The async client is not a WebSearchClient: its search methods are
+    coroutines. Sharing only the transport-independent helpers means
+    neither client inherits methods that cannot work with its transport.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
-        """
-        Initialize the web search client.
-        
-        📚 CONCEPT: Dependency Injection
-        --------------------------------
-        This pattern is called "dependency injection." You can provide the API
-        key explicitly OR let it load from environment. This makes code:
-        - Flexible: Works in multiple environments (dev, test, prod)
-        - Testable: Can inject a fake key in tests
-        - Secure: Doesn't require hardcoded secrets
-        
-        EXAMPLE USAGE:
-        >>> # Option 1: Explicit key (for testing)
-        >>> client = WebSearchClient(api_key="sk-test-123")
-        >>> 
-        >>> # Option 2: From environment (for production)
-        >>> # Assumes .env has OPENAI_API_KEY=sk-abc...
-        >>> client = WebSearchClient()
-        
-        💡 PATTERN: The "or" Operator
-        ------------------------------
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        
-        How this works:
-        - If api_key is provided and truthy → use it
-        - If api_key is None or empty → check os.getenv()
-        - If both fail → self.api_key = None (caught below)
-        
-        Args:
-            api_key: OpenAI API key. If None, will load from OPENAI_API_KEY
-                    environment variable.
-            
-        Raises:
-            ValueError: If no API key is provided or found
-        """
-        # Try explicit key first, fall back to environment
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        
-        # Fail fast if no key available
-        # 📝 PATTERN: Fail Fast
-        # Rather than waiting until we make a request (wasting time), we check
-        # immediately. This gives users a clear error message at startup.
-        if not self.api_key:
-            raise ValueError(
-                "API key must be provided or set in "
-                "OPENAI_API_KEY environment variable"
-            )
-        
-        # Create the official OpenAI client
-        # This handles HTTPS, retries, timeouts automatically
-        self.client = OpenAI(api_key=self.api_key)
+    api_key: str
+    rate_limiter: Optional[RateLimiter]
     
     def validate_api_key(self) -> bool:
         """
@@ -191,68 +183,70 @@ class WebSearchClient:
         """
         return self.api_key.startswith("sk-") and len(self.api_key) > 20
     
-    def search(self, query: str, options: Optional[SearchOptions] = None) -> Dict[str, Any]:
+    def _retry_delay(self, error: APIError, attempt: int) -> Optional[float]:
         """
-        Perform a web search using OpenAI's API.
+        Decide whether a failed request should be retried, and after how long.
+        
+        With a rate limiter the SDK's own retries are off, so this covers
+        everything they did: 429s, 5xx responses, timeouts and dropped
+        connections (see RETRYABLE_ERRORS).
+        
+        📝 PATTERN: Jittered Exponential Backoff
+        -----------------------------------------
+        Each retry waits up to twice as long as the last, with a random
+        fraction so that many callers don't retry in lock-step. The server's
+        retry-after header is handed to the rate limiter, which then holds
+        back EVERY caller sharing it - not just this one.
         
         Args:
-            query: The search query
-            options: Optional search configuration
+            error: The retryable error from the SDK
+            attempt: How many times this request has already been retried
             
         Returns:
-            Raw API response dictionary
+            Seconds to sleep before retrying, or None to give up
+        """
+        if self.rate_limiter is None or not self.rate_limiter.should_retry(attempt):
+            return None
+        
+        # Connection errors and timeouts never got a response
+        response = getattr(error, "response", None)
+        self.rate_limiter.update_from_headers(getattr(response, "headers", None))
+        return self.rate_limiter.backoff_delay(attempt)
+    
+    def _read_raw(self, raw: Any) -> Any:
+        """
+        Adapt the rate limiter to a successful response, then parse it.
+        
+        📚 CONCEPT: Headers on Every Response
+        --------------------------------------
+        OpenAI reports the remaining quota (x-ratelimit-remaining-*) on
+        every response, not only on 429s. Reading it from successful calls
+        lets the limiter slow down BEFORE the server starts refusing us.
+        
+        Args:
+            raw: Result of responses.with_raw_response.create
+            
+        Returns:
+            The parsed SDK response (or stream)
+        """
+        self.rate_limiter.update_from_headers(raw.headers)
+        return raw.parse()
+    
+    def _validate_query(self, query: str) -> None:
+        """
+        Check a query before spending a network round trip on it.
+        
+        Args:
+            query: The search query
             
         Raises:
-            ValueError: If query is invalid
-            SearchError: If API request fails
+            ValueError: If query is empty or too long
         """
-        # Validate query
         if not query or not query.strip():
             raise ValueError("Query cannot be empty")
         
         if len(query) > 5000:
             raise ValueError("Query too long (max 5000 characters)")
-        
-        # Use default options if none provided
-        if options is None:
-            options = SearchOptions()
-        
-        # Construct request payload
-        payload = self._construct_payload(query, options)
-        
-        try:
-            # Make API request
-            response = self.client.responses.create(**payload)
-            
-            # Convert response to dictionary
-            return self._response_to_dict(response)
-            
-        except AuthenticationError as e:
-            raise SearchError(
-                code="AUTHENTICATION_ERROR",
-                message="Invalid API key or authentication failed",
-                details={"original_error": str(e)}
-            )
-        except RateLimitError as e:
-            raise SearchError(
-                code="RATE_LIMIT_ERROR",
-                message="API rate limit exceeded",
-                details={"original_error": str(e)}
-            )
-        except APIError as e:  # pragma: no cover
-            # Fallback for generic API errors (specific ones caught above)
-            raise SearchError(
-                code="API_ERROR",
-                message=f"API request failed: {str(e)}",
-                details={"original_error": str(e)}
-            )
-        except Exception as e:  # pragma: no cover
-            # Defensive fallback - should not be reached in normal operation
-            raise SearchError(
-                code="UNKNOWN_ERROR",
-                message=f"Unexpected error: {str(e)}",
-                details={"original_error": str(e)}
-            )
     
     def _construct_payload(self, query: str, options: SearchOptions) -> Dict[str, Any]:
         """
@@ -309,27 +303,86 @@ class WebSearchClient:
         
         # Convert output items
         for item in response.output:
-            item_dict = {"type": item.type}
-            
-            if hasattr(item, 'id'):
-                item_dict["id"] = item.id
-            
-            if hasattr(item, 'status'):
-                item_dict["status"] = item.status
+            result["output"].append(self._item_to_dict(item))
+        
+        return result
+    
+    def _item_to_dict(self, item: Any) -> Dict[str, Any]:
+        """
+        Convert one output item (web search call or message) to a dictionary.
+        
+        Args:
+            item: OpenAI output item object
             
-            if item.type == "web_search_call":
-                if hasattr(item, 'action'):
-                    item_dict["action"] = self._action_to_dict(item.action)
+        Returns:
+            Dictionary representation of the item
+        """
+        item_dict = {"type": item.type}
+        
+        if hasattr(item, 'id'):
+            item_dict["id"] = item.id
+        
+        if hasattr(item, 'status'):
+            item_dict["status"] = item.status
+        
+        if item.type == "web_search_call":
+            if hasattr(item, 'action'):
+                item_dict["action"] = self._action_to_dict(item.action)
+        
+        elif item.type == "message":
+            if hasattr(item, 'role'):
+                item_dict["role"] = item.role
+            if hasattr(item, 'content'):
+                item_dict["content"] = self._content_to_dict(item.content)
+        
+        return item_dict
+    
+    def _event_to_dict(self, event: Any) -> Dict[str, Any]:
+        """
+        Convert one streaming event to a dictionary.
+        
+        Only the events the parser cares about carry a payload; everything
+        else is passed through as {"type": ...} so callers can still see it.
+        
+        Args:
+            event: OpenAI streaming event object
             
-            elif item.type == "message":
-                if hasattr(item, 'role'):
-                    item_dict["role"] = item.role
-                if hasattr(item, 'content'):
-                    item_dict["content"] = self._content_to_dict(item.content)
+        Returns:
+            Dictionary representation of the event
             
-            result["output"].append(item_dict)
+        Raises:
+            SearchError: If the event reports that the response failed
+        """
+        event_type = getattr(event, 'type', 'unknown')
+        event_dict: Dict[str, Any] = {"type": event_type}
         
-        return result
+        if event_type == "response.output_text.delta":
+            event_dict["delta"] = event.delta
+        
+        elif event_type == "response.output_text.annotation.added":
+            annotation = event.annotation
+            if not isinstance(annotation, dict):
+                annotation = {
+                    key: getattr(annotation, key, None)
+                    for key in ("type", "url", "title", "start_index", "end_index")
+                }
+            event_dict["annotation"] = annotation
+        
+        elif event_type == "response.output_item.done":
+            event_dict["item"] = self._item_to_dict(event.item)
+        
+        elif event_type == "response.completed":
+            event_dict["id"] = getattr(event.response, 'id', 'unknown')
+        
+        elif event_type in ("response.failed", "error"):
+            error = getattr(getattr(event, 'response', None), 'error', None) or event
+            raise SearchError(
+                code="API_ERROR",
+                message=f"API request failed: {getattr(error, 'message', 'stream error')}",
+                details={"event": event_type}
+            )
+        
+        return event_dict
     
     def _action_to_dict(self, action: Any) -> Dict[str, Any]:  # pragma: no cover
         """Convert action object to dictionary."""
@@ -383,3 +436,424 @@ class WebSearchClient:
             content_list.append(item_dict)
         
         return content_list
+
+
+# ============================================================================
+# THE CLIENT CLASS: Our Messenger to OpenAI
+# ============================================================================
+
+class WebSearchClient(_SearchClientBase):
+    """
+    Client for interacting with OpenAI's web search API.
+    
+    📚 CONCEPT: The Client Pattern
+    -------------------------------
+    A "client" in software is code that talks to a server/service. Think of it
+    like a restaurant:
+    - You → tell the waiter what you want (user code)
+    - Waiter → tells the kitchen (client)
+    - Kitchen → prepares food (OpenAI's servers)
+    - Waiter → brings food back (client returns response)
+    
+    This class ONLY handles communication. It doesn't:
+    - ❌ Validate business logic (that's the service layer)
+    - ❌ Parse responses (that's the parser)
+    - ❌ Present to users (that's the main app)
+    
+    It DOES:
+    - ✓ Manage authentication
+    - ✓ Build HTTP requests  
+    - ✓ Handle network errors
+    - ✓ Translate API errors into our domain errors
+    
+    📝 DESIGN DECISION: Why a Class?
+    ---------------------------------
+    We could have used functions:
+    
+    def search(api_key: str, query: str) -> dict:
+        ...
+    
+    But a class is better because:
+    1. State management (api_key stored once, not passed everywhere)
+    2. Multiple related methods (search, validate, construct_payload)
+    3. Easy to mock in tests
+    4. Follows industry patterns (easier for others to understand)
+    """
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        base_url: Optional[str] = None,
+    ):
+        """
+        Initialize the web search client.
+        
+        📚 CONCEPT: Dependency Injection
+        --------------------------------
+        This pattern is called "dependency injection." You can provide the API
+        key explicitly OR let it load from environment. This makes code:
+        - Flexible: Works in multiple environments (dev, test, prod)
+        - Testable: Can inject a fake key in tests
+        - Secure: Doesn't require hardcoded secrets
+        
+        EXAMPLE USAGE:
+        >>> # Option 1: Explicit key (for testing)
+        >>> client = WebSearchClient(api_key="sk-test-123")
+        >>> 
+        >>> # Option 2: From environment (for production)
+        >>> # Assumes .env has OPENAI_API_KEY=sk-abc...
+        >>> client = WebSearchClient()
+        
+        💡 PATTERN: The "or" Operator
+        ------------------------------
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        
+        How this works:
+        - If api_key is provided and truthy → use it
+        - If api_key is None or empty → check os.getenv()
+        - If both fail → self.api_key = None (caught below)
+        
+        Args:
+            api_key: OpenAI API key. If None, will load from OPENAI_API_KEY
+                    environment variable.
+            rate_limiter: Optional shared RateLimiter. When given, requests
+                    wait for quota before being sent, and 429s, 5xx
+                    responses, timeouts and dropped connections are retried
+                    with its jittered backoff instead of the SDK's.
+            base_url: Alternative API root, e.g. a local fake server
+                    (see src.fake_server). If None, the SDK uses
+                    OPENAI_BASE_URL or the real OpenAI endpoint.
+            
+        Raises:
+            ValueError: If no API key is provided or found
+        """
+        # Try explicit key first, fall back to environment
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        
+        # Fail fast if no key available
+        # 📝 PATTERN: Fail Fast
+        # Rather than waiting until we make a request (wasting time), we check
+        # immediately. This gives users a clear error message at startup.
+        if not self.api_key:
+            raise ValueError(
+                "API key must be provided or set in "
+                "OPENAI_API_KEY environment variable"
+            )
+        
+        self.rate_limiter = rate_limiter
+        
+        # Create the official OpenAI client
+        # This handles HTTPS, retries, timeouts automatically
+        # (with a rate limiter, retries are ours so the limiter sees them)
+        self.client = OpenAI(
+            api_key=self.api_key,
+            base_url=base_url,
+            max_retries=DEFAULT_MAX_RETRIES if rate_limiter is None else 0,
+        )
+    
+    def search(self, query: str, options: Optional[SearchOptions] = None) -> Dict[str, Any]:
+        """
+        Perform a web search using OpenAI's API.
+        
+        Args:
+            query: The search query
+            options: Optional search configuration
+            
+        Returns:
+            Raw API response dictionary
+            
+        Raises:
+            ValueError: If query is invalid
+            SearchError: If API request fails
+        """
+        self._validate_query(query)
+        
+        # Use default options if none provided
+        if options is None:
+            options = SearchOptions()
+        
+        # Construct request payload
+        payload = self._construct_payload(query, options)
+        
+        try:
+            # Make API request (waits for quota / retries 429s if configured)
+            response = self._create(payload, query)
+            
+            # Convert response to dictionary
+            return self._response_to_dict(response)
+            
+        except Exception as e:
+            raise _to_search_error(e)
+    
+    def search_stream(
+        self, query: str, options: Optional[SearchOptions] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Perform a web search and yield events as the API emits them.
+        
+        📚 CONCEPT: Server-Sent Events
+        -------------------------------
+        With stream=True the API sends many small events instead of one big
+        response: text deltas as the model writes, each citation as it is
+        attached, and every output item once it is finished. We translate
+        each event into a plain dictionary - interpreting them is the
+        parser's job (see StreamingResponseParser).
+        
+        Args:
+            query: The search query
+            options: Optional search configuration
+            
+        Yields:
+            Event dictionaries, each with at least a "type" key
+            
+        Raises:
+            ValueError: If query is invalid
+            SearchError: If the request fails or the stream reports an error
+        """
+        self._validate_query(query)
+        
+        if options is None:
+            options = SearchOptions()
+        
+        payload = self._construct_payload(query, options)
+        payload["stream"] = True
+        
+        try:
+            stream = self._create(payload, query)
+            try:
+                for event in stream:
+                    yield self._event_to_dict(event)
+            finally:
+                # Release the connection even if the consumer stops early
+                stream.close()
+        except Exception as e:
+            raise _to_search_error(e)
+    
+    def _create(self, payload: Dict[str, Any], query: str) -> Any:
+        """
+        Call responses.create, honouring the rate limiter if there is one.
+        
+        Args:
+            payload: Request payload from _construct_payload
+            query: The search query (used to estimate token cost)
+            
+        Returns:
+            The SDK response (or stream, if payload requests one)
+            
+        Raises:
+            Whatever the SDK raises once retries are exhausted
+        """
+        attempt = 0
+        while True:
+            # Wait for quota (no-op without a rate limiter)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(self.rate_limiter.estimate_tokens(query))
+            
+            try:
+                if self.rate_limiter is None:
+                    return self.client.responses.create(**payload)
+                return self._read_raw(self.client.responses.with_raw_response.create(**payload))
+            except RETRYABLE_ERRORS as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                self.rate_limiter.sleep(delay)
+                attempt += 1
+
+
+# ============================================================================
+# THE ASYNC CLIENT: Many Messengers Sharing One Phone Line
+# ============================================================================
+
+class AsyncWebSearchClient(_SearchClientBase):
+    """
+    Asynchronous client for OpenAI's web search API.
+    
+    📚 CONCEPT: Async I/O
+    ---------------------
+    A blocking search() parks a whole thread while OpenAI thinks. With
+    asyncio, a single thread can keep hundreds of searches in flight: each
+    `await` hands control back to the event loop until the bytes arrive.
+    
+    📝 DESIGN DECISION: One Pooled Transport
+    -----------------------------------------
+    Every call goes through the same httpx.AsyncClient, so TCP/TLS
+    connections are kept alive and reused instead of re-negotiated per
+    request. The pool size is configurable because the right number depends
+    on your rate limits, not on this code.
+    
+    Payload construction, query validation, response conversion and error
+    translation are shared with WebSearchClient through _SearchClientBase -
+    only the transport differs. search() and search_stream() are coroutine
+    counterparts of the sync methods, not overrides of them.
+    
+    EXAMPLE USAGE:
+    >>> async def run(queries):
+    ...     async with AsyncWebSearchClient(max_connections=50) as client:
+    ...         return await asyncio.gather(*(client.search(q) for q in queries))
+    """
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        base_url: Optional[str] = None,
+    ):
+        """
+        Initialize the async web search client.
+        
+        Args:
+            api_key: OpenAI API key. If None, will load from OPENAI_API_KEY
+                    environment variable.
+            max_connections: Upper bound on concurrent connections in the pool
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection stays in the pool
+            rate_limiter: Optional shared RateLimiter (see WebSearchClient)
+            base_url: Alternative API root (see WebSearchClient)
+            
+        Raises:
+            ValueError: If no API key is provided or found, or if the
+                        connection limits are not positive
+        """
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        
+        if not self.api_key:
+            raise ValueError(
+                "API key must be provided or set in "
+                "OPENAI_API_KEY environment variable"
+            )
+        
+        if max_connections < 1 or max_keepalive_connections < 0:
+            raise ValueError("Connection limits must be positive")
+        
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(max_keepalive_connections, max_connections),
+            keepalive_expiry=keepalive_expiry,
+        )
+        
+        self.rate_limiter = rate_limiter
+        
+        # One shared transport for every call made through this client
+        self.http_client = DefaultAsyncHttpxClient(limits=self.limits)
+        self.client = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=base_url,
+            http_client=self.http_client,
+            max_retries=DEFAULT_MAX_RETRIES if rate_limiter is None else 0,
+        )
+    
+    async def search(self, query: str, options: Optional[SearchOptions] = None) -> Dict[str, Any]:
+        """
+        Perform a web search without blocking the event loop.
+        
+        Args:
+            query: The search query
+            options: Optional search configuration
+            
+        Returns:
+            Raw API response dictionary
+            
+        Raises:
+            ValueError: If query is invalid
+            SearchError: If API request fails
+        """
+        self._validate_query(query)
+        
+        if options is None:
+            options = SearchOptions()
+        
+        payload = self._construct_payload(query, options)
+        
+        try:
+            response = await self._create(payload, query)
+            return self._response_to_dict(response)
+        except Exception as e:
+            raise _to_search_error(e)
+    
+    async def search_stream(
+        self, query: str, options: Optional[SearchOptions] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Perform a web search and yield events as the API emits them.
+        
+        The async counterpart of WebSearchClient.search_stream:
+        
+        >>> async for event in client.search_stream("bread"):
+        ...     parser.feed(event)
+        
+        Args:
+            query: The search query
+            options: Optional search configuration
+            
+        Yields:
+            Event dictionaries, each with at least a "type" key
+            
+        Raises:
+            ValueError: If query is invalid
+            SearchError: If the request fails or the stream reports an error
+        """
+        self._validate_query(query)
+        
+        if options is None:
+            options = SearchOptions()
+        
+        payload = self._construct_payload(query, options)
+        payload["stream"] = True
+        
+        try:
+            stream = await self._create(payload, query)
+            try:
+                async for event in stream:
+                    yield self._event_to_dict(event)
+            finally:
+                # Release the connection even if the consumer stops early
+                await stream.close()
+        except Exception as e:
+            raise _to_search_error(e)
+    
+    async def _create(self, payload: Dict[str, Any], query: str) -> Any:
+        """
+        Await responses.create, honouring the rate limiter if there is one.
+        
+        Args:
+            payload: Request payload from _construct_payload
+            query: The search query (used to estimate token cost)
+            
+        Returns:
+            The SDK response (or async stream, if payload requests one)
+            
+        Raises:
+            Whatever the SDK raises once retries are exhausted
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(self.rate_limiter.estimate_tokens(query))
+            
+            try:
+                if self.rate_limiter is None:
+                    return await self.client.responses.create(**payload)
+                return self._read_raw(
+                    await self.client.responses.with_raw_response.create(**payload)
+                )
+            except RETRYABLE_ERRORS as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+    
+    async def aclose(self) -> None:
+        """Close the pooled transport and release its connections."""
+        await self.client.close()
+    
+    async def __aenter__(self) -> "AsyncWebSearchClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
@@ -0,0 +1,303 @@
+"""
+Token-budgeted conversation context for the chat.
+
+Sending the whole session history with every turn makes prompt tokens (and
+with them latency and cost) grow without bound as a session goes on.
+ContextWindow keeps the most recent messages verbatim and folds everything
+older into a rolling summary that is only extended, in batches, when more
+messages fall out of the window - so most turns reuse the cached summary
+and no extra model call is made.
+
+The therapist's system prompt always goes first and unchanged, followed by
+the summary, so consecutive requests share the longest possible prefix for
+provider-side prompt caching.
+
+Tokens are counted with tiktoken. Its encoding files are downloaded on
+first use; while they cannot be loaded a characters-per-token estimate is
+used instead.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import tiktoken
+
+from src.cache import CacheStats
+from src.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+Message = Dict[str, str]
+#: Builds a new summary from the previous one (may be "") and the messages
+#: that just left the window
+Summarizer = Callable[[str, Sequence[Message]], str]
+
+#: Tokens the chat format adds around every message, and to prime the reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+#: Estimate used while no encoding loads (English prose averages ~4 chars/token)
+CHARS_PER_TOKEN = 4
+#: Encoding of the current OpenAI chat models, for unknown model names
+DEFAULT_ENCODING = "o200k_base"
+
+SUMMARY_PREFIX = "Summary of the earlier part of this session:\n"
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a therapy chat so it can continue "
+    "without the full transcript. Update the summary with the new messages. "
+    "Keep the client's concerns, feelings, goals, relevant personal details "
+    "and anything the therapist suggested or agreed to follow up on. Write "
+    "at most {max_words} words of plain prose."
+)
+
+
+def _load_encoding(model: str) -> Any:
+    """The tiktoken encoding for model, or None if it cannot be loaded."""
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:  # the encoding files are downloaded on first use
+        logger.warning("Could not load tiktoken encoding for %s (%s); estimating tokens",
+                       model, e)
+        return None
+
+
+class TokenCounter:
+    """
+    Count chat tokens, remembering the count for each distinct text.
+
+    History messages are counted again on every turn, so counts are cached
+    (least recently used first out) and only new messages are encoded. One
+    counter can be shared by every session.
+    """
+
+    def __init__(self, model: str = "gpt-4o-mini", encoding: Any = None,
+                 cache_size: int = 4096):
+        """
+        Create a counter.
+
+        Args:
+            model: Model whose tokenizer to use
+            encoding: Object with an encode(text) method (default: tiktoken's
+                encoding for model, or the character estimate)
+            cache_size: Distinct texts whose counts are remembered
+        """
+        self.model = model
+        self.encoding = encoding if encoding is not None else _load_encoding(model)
+        self.cache_size = cache_size
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the model's tokenizer rather than an estimate."""
+        return self.encoding is not None
+
+    @property
+    def stats(self) -> CacheStats:
+        """Count cache counters."""
+        with self._lock:
+            return CacheStats(hits=self._stats.hits, misses=self._stats.misses,
+                              evictions=self._stats.evictions, entries=len(self._counts))
+
+    def count(self, text: str) -> int:
+        """Tokens in a piece of text."""
+        with self._lock:
+            cached = self._counts.get(text)
+            if cached is not None:
+                self._counts.move_to_end(text)
+                self._stats.hits += 1
+                return cached
+            self._stats.misses += 1
+        if self.encoding is not None:
+            tokens = len(self.encoding.encode(text, disallowed_special=()))
+        else:
+            tokens = -(-len(text) // CHARS_PER_TOKEN)
+        with self._lock:
+            self._counts[text] = tokens
+            if len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+                self._stats.evictions += 1
+        return tokens
+
+    def count_message(self, message: Message) -> int:
+        """Tokens one message occupies in a chat request."""
+        return TOKENS_PER_MESSAGE + self.count(message["content"])
+
+    def count_messages(self, messages: Sequence[Message]) -> int:
+        """Prompt tokens of a complete chat request."""
+        return TOKENS_PER_REPLY + sum(self.count_message(m) for m in messages)
+
+
+@dataclass
+class ContextStats:
+    """What one turn's prompt cost, against sending the full history."""
+
+    full_tokens: int = 0
+    prompt_tokens: int = 0
+    summary_tokens: int = 0
+    recent_messages: int = 0
+    summarized_messages: int = 0
+    dropped_messages: int = 0
+    summary_seconds: float = 0.0
+
+    @property
+    def saved_tokens(self) -> int:
+        """Prompt tokens saved this turn."""
+        return self.full_tokens - self.prompt_tokens
+
+    @property
+    def saved_ratio(self) -> float:
+        """Fraction of the full-history prompt saved this turn."""
+        return self.saved_tokens / self.full_tokens if self.full_tokens else 0.0
+
+
+class ContextWindow:
+    """
+    Build each turn's prompt from a conversation's history.
+
+    One instance belongs to one conversation (it caches that conversation's
+    summary). It notices when the history it is given no longer starts
+    with the messages it summarized - a cleared chat, a new therapist - and
+    starts over.
+
+    EXAMPLE USAGE:
+    >>> window = ContextWindow(TokenCounter(), make_summarizer(client))
+    >>> messages = window.build(system_message, history)
+    >>> window.last_stats.saved_tokens
+    """
+
+    def __init__(self, counter: TokenCounter, summarize: Summarizer,
+                 recent_messages: int = 12, summary_batch: int = 8,
+                 max_prompt_tokens: int = 6000,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Create a window.
+
+        Args:
+            counter: Token counter for the chat model
+            summarize: Extends the rolling summary (see Summarizer)
+            recent_messages: Messages always sent verbatim
+            summary_batch: Messages the verbatim tail may grow beyond
+                recent_messages before it is cut back and the rest folded
+                into the summary (fewer, larger summary calls)
+            max_prompt_tokens: Budget for the whole prompt; the oldest
+                verbatim messages are left out (the newest never) to fit
+            clock: Monotonic time source, for timing summary calls
+
+        Raises:
+            ValueError: If recent_messages or summary_batch is below 1
+        """
+        if recent_messages < 1 or summary_batch < 1:
+            raise ValueError("recent_messages and summary_batch must be at least 1")
+        self.counter = counter
+        self.summarize = summarize
+        self.recent_messages = recent_messages
+        self.summary_batch = summary_batch
+        self.max_prompt_tokens = max_prompt_tokens
+        self.summary = ""
+        self.last_stats = ContextStats()
+        self._clock = clock
+        # History messages [0, _summarized) are covered by self.summary
+        self._summarized = 0
+        self._last_summarized: Optional[Message] = None
+
+    def reset(self) -> None:
+        """Forget the summary."""
+        self.summary = ""
+        self._summarized = 0
+        self._last_summarized = None
+
+    def build(self, system_message: str, history: Sequence[Message]) -> List[Message]:
+        """
+        The messages to send for the next reply.
+
+        Args:
+            system_message: The therapist's instructions
+            history: The whole conversation, oldest first, ending with the
+                user's new message
+
+        Returns:
+            System prompt, summary (once there is one) and recent messages
+        """
+        if self._summarized and (len(history) < self._summarized
+                                 or history[self._summarized - 1] != self._last_summarized):
+            logger.debug("History no longer matches the summary; starting over")
+            self.reset()
+
+        stats = ContextStats()
+        if len(history) - self._summarized > self.recent_messages + self.summary_batch:
+            self._fold(history, len(history) - self.recent_messages, stats)
+
+        system = {"role": "system", "content": system_message}
+        head = [system]
+        if self.summary:
+            head.append({"role": "system", "content": SUMMARY_PREFIX + self.summary})
+        recent = list(history[self._summarized:])
+        prompt_tokens = self.counter.count_messages(head + recent)
+        while len(recent) > 1 and prompt_tokens > self.max_prompt_tokens:
+            prompt_tokens -= self.counter.count_message(recent.pop(0))
+            stats.dropped_messages += 1
+
+        stats.full_tokens = self.counter.count_messages([system, *history])
+        stats.prompt_tokens = prompt_tokens
+        stats.summary_tokens = self.counter.count_message(head[1]) if self.summary else 0
+        stats.recent_messages = len(recent)
+        stats.summarized_messages = self._summarized
+        self.last_stats = stats
+        logger.info("Prompt: %d tokens (%d with full history, %d saved); %d recent, "
+                    "%d summarized, %d dropped", stats.prompt_tokens, stats.full_tokens,
+                    stats.saved_tokens, stats.recent_messages, stats.summarized_messages,
+                    stats.dropped_messages)
+        return head + recent
+
+    def _fold(self, history: Sequence[Message], end: int, stats: ContextStats) -> None:
+        """Extend the summary with history[_summarized:end]."""
+        started = self._clock()
+        try:
+            summary = self.summarize(self.summary, history[self._summarized:end])
+        except Exception as e:
+            # Keep the old summary; the unsummarized messages stay verbatim
+            # (within the token budget) and folding is retried next turn
+            logger.warning("Could not summarize %d messages: %s", end - self._summarized, e)
+            return
+        finally:
+            stats.summary_seconds = self._clock() - started
+        self.summary = summary.strip()
+        self._summarized = end
+        self._last_summarized = history[end - 1]
+
+
+def make_summarizer(client: Any, model: str = "gpt-4o-mini", max_words: int = 250) -> Summarizer:
+    """
+    A Summarizer that asks the chat model for the summary.
+
+    Args:
+        client: OpenAI client
+        model: Model that writes summaries
+        max_words: Length the summary is asked to stay within
+
+    Returns:
+        The summarizer
+    """
+    instructions = SUMMARY_INSTRUCTIONS.format(max_words=max_words)
+
+    def summarize(previous: str, messages: Sequence[Message]) -> str:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": (f"Current summary:\n{previous or '(none yet)'}\n\n"
+                                             f"New messages:\n{transcript}")},
+            ],
+        )
+        return response.choices[0].message.content or previous
+
+    return summarize
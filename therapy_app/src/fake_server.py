@@ -0,0 +1,480 @@
+"""
+Local stand-in for the OpenAI API, for load and performance testing.
+
+This module serves the two endpoints the app uses - POST /v1/responses
+(JSON or streamed) and POST /v1/chat/completions (JSON or streamed) - by
+replaying the recorded fixtures in src/fake_fixtures/sample_responses.json
+(shipped next to this module; the test suite reads the same file).
+Latency, generation speed, error injection and payload size are all
+configurable, so runs are reproducible and free.
+
+Point any client at it through base_url (or the OPENAI_BASE_URL
+environment variable, which the OpenAI SDK reads on its own):
+
+    python -m src.fake_server --port 8089 --latency-ms 300 --error-rate-429 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python -m src.main "test query"
+"""
+
+import argparse
+import copy
+import json
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.logging_config import get_logger, setup_logging
+
+
+logger = get_logger(__name__)
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent / "fake_fixtures" / "sample_responses.json"
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+@dataclass
+class FakeServerConfig:
+    """
+    Behaviour of the fake server.
+
+    Attributes:
+        fixture: Key in the fixtures file to replay for successful responses
+        latency_ms: Mean delay before the first byte of a response
+        latency_distribution: One of fixed, uniform, exponential, lognormal
+        tokens_per_second: Generation speed; None sends all text at once
+        error_rate_429: Probability a request is answered with a rate limit
+        error_rate_500: Probability a request is answered with a server error
+        retry_after_ms: Value of the retry-after-ms header on injected 429s
+        payload_scale: Repeat the answer text this many times
+        seed: Seed for latency and error sampling (None = nondeterministic)
+    """
+
+    fixture: str = "valid_search_response"
+    latency_ms: float = 0.0
+    latency_distribution: str = "fixed"
+    tokens_per_second: Optional[float] = None
+    error_rate_429: float = 0.0
+    error_rate_500: float = 0.0
+    retry_after_ms: int = 100
+    payload_scale: int = 1
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        """Validate configuration values."""
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_distribution must be one of {LATENCY_DISTRIBUTIONS}")
+        if self.latency_ms < 0:
+            raise ValueError("latency_ms cannot be negative")
+        if self.tokens_per_second is not None and self.tokens_per_second <= 0:
+            raise ValueError("tokens_per_second must be positive")
+        if not 0 <= self.error_rate_429 + self.error_rate_500 <= 1:
+            raise ValueError("Error rates must be between 0 and 1 in total")
+        if self.payload_scale < 1:
+            raise ValueError("payload_scale must be at least 1")
+
+
+@dataclass
+class FakeServerStats:
+    """Counters for requests handled by the fake server."""
+
+    requests: int = 0
+    streamed: int = 0
+    rate_limited: int = 0
+    server_errors: int = 0
+
+
+class FakeOpenAI:
+    """
+    Request-independent logic of the fake server.
+
+    Kept separate from the HTTP handler so that sampling and payload
+    building can be tested without sockets.
+    """
+
+    def __init__(self, config: Optional[FakeServerConfig] = None,
+                 fixtures_path: Union[str, Path] = DEFAULT_FIXTURES):
+        """
+        Load fixtures and prepare the random source.
+
+        Args:
+            config: Server behaviour (defaults to instant, error-free replies)
+            fixtures_path: JSON file of recorded API responses
+
+        Raises:
+            ValueError: If the configured fixture isn't in the file
+        """
+        self.config = config or FakeServerConfig()
+        with open(fixtures_path, "r", encoding="utf-8") as f:
+            self.fixtures = json.load(f)
+        if self.config.fixture not in self.fixtures:
+            raise ValueError(f"Unknown fixture: {self.config.fixture}")
+
+        self.response = self._scaled(self.fixtures[self.config.fixture])
+        self.stats = FakeServerStats()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Draw one pre-response delay, in seconds."""
+        mean = self.config.latency_ms / 1000
+        if mean == 0:
+            return 0.0
+        with self._lock:
+            distribution = self.config.latency_distribution
+            if distribution == "uniform":
+                return self._rng.uniform(0, 2 * mean)
+            if distribution == "exponential":
+                return self._rng.expovariate(1 / mean)
+            if distribution == "lognormal":
+                # sigma=0.5 gives a realistic long tail; mu keeps the mean
+                return self._rng.lognormvariate(math.log(mean) - 0.125, 0.5)
+            return mean
+
+    def sample_error(self) -> Optional[int]:
+        """Decide whether to inject an error; returns its status code."""
+        with self._lock:
+            roll = self._rng.random()
+            if roll < self.config.error_rate_429:
+                self.stats.rate_limited += 1
+                return 429
+            if roll < self.config.error_rate_429 + self.config.error_rate_500:
+                self.stats.server_errors += 1
+                return 500
+        return None
+
+    def count_request(self, stream: bool) -> None:
+        """Record one handled request."""
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.streamed += int(stream)
+
+    def token_delay(self) -> float:
+        """Seconds between streamed tokens."""
+        rate = self.config.tokens_per_second
+        return 1 / rate if rate else 0.0
+
+    def error_body(self, status: int) -> Dict[str, Any]:
+        """JSON body for an injected error."""
+        if status == 429:
+            return self.fixtures.get("api_error_429", {"error": {"message": "Rate limit exceeded"}})
+        return {"error": {"message": "The server had an error processing your request",
+                          "type": "server_error", "code": None}}
+
+    def answer_text(self) -> str:
+        """Concatenated output text of the replayed response."""
+        return "".join(
+            content.get("text", "")
+            for item in self.response.get("output", [])
+            if item.get("type") == "message"
+            for content in item.get("content", [])
+        )
+
+    def response_events(self) -> Iterator[Dict[str, Any]]:
+        """
+        Responses API stream events for the replayed response.
+
+        Mirrors the real event order: created, finished search calls, text
+        deltas, annotations, the finished message, then completed.
+        """
+        response = self.response
+        sequence = 0
+
+        def event(event_type: str, **fields: Any) -> Dict[str, Any]:
+            nonlocal sequence
+            sequence += 1
+            return {"type": event_type, "sequence_number": sequence, **fields}
+
+        yield event("response.created", response={**response, "status": "in_progress", "output": []})
+        for index, item in enumerate(response.get("output", [])):
+            if item.get("type") == "message":
+                for content in item.get("content", []):
+                    for token in split_tokens(content.get("text", "")):
+                        yield event("response.output_text.delta", item_id=item.get("id"),
+                                    output_index=index, content_index=0, delta=token)
+                    for n, annotation in enumerate(content.get("annotations", [])):
+                        yield event("response.output_text.annotation.added", item_id=item.get("id"),
+                                    output_index=index, content_index=0, annotation_index=n,
+                                    annotation=annotation)
+            yield event("response.output_item.done", output_index=index, item=item)
+        yield event("response.completed", response={**response, "status": "completed"})
+
+    def chat_completion(self, model: str) -> Dict[str, Any]:
+        """Non-streamed chat.completion body."""
+        text = self.answer_text()
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(split_tokens(text)),
+                      "total_tokens": len(split_tokens(text))},
+        }
+
+    def chat_chunks(self, model: str) -> Iterator[Dict[str, Any]]:
+        """Streamed chat.completion.chunk bodies, one token per chunk."""
+        created = int(time.time())
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        yield chunk({"role": "assistant", "content": ""})
+        for token in split_tokens(self.answer_text()):
+            yield chunk({"content": token})
+        yield chunk({}, "stop")
+
+    def _scaled(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of response with every answer text repeated payload_scale times."""
+        scaled = copy.deepcopy(response)
+        if self.config.payload_scale > 1:
+            for item in scaled.get("output", []):
+                for content in item.get("content", []):
+                    if "text" in content:
+                        content["text"] = "\n\n".join([content["text"]] * self.config.payload_scale)
+        return scaled
+
+
+def split_tokens(text: str) -> List[str]:
+    """Split text into word-sized "tokens" that join back to the original."""
+    tokens: List[str] = []
+    start = 0
+    for i in range(1, len(text)):
+        if text[i] == " " and text[i - 1] != " ":
+            tokens.append(text[start:i])
+            start = i
+    if text:
+        tokens.append(text[start:])
+    return tokens
+
+
+def _has_text(payload: Dict[str, Any]) -> bool:
+    """Whether a stream payload carries generated text (and so costs a token)."""
+    if payload.get("delta"):
+        return True
+    choices = payload.get("choices") or [{}]
+    return bool(choices[0].get("delta", {}).get("content"))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP handler speaking just enough of the OpenAI wire format."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, a client
+    # reusing the connection waits out the delayed ACK (~40 ms) each time
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        """Keep load tests quiet."""
+
+    def do_POST(self) -> None:
+        fake = self.server.fake
+        routes = {"/v1/responses": self._responses, "/v1/chat/completions": self._chat}
+        route = routes.get(self.path.split("?")[0])
+        if route is None:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            self._send_json(400, {"error": {"message": "Request body must be JSON"}})
+            return
+
+        stream = bool(body.get("stream"))
+        fake.count_request(stream)
+        time.sleep(fake.sample_latency())
+
+        status = fake.sample_error()
+        if status is not None:
+            headers = {"retry-after-ms": str(fake.config.retry_after_ms)} if status == 429 else {}
+            self._send_json(status, fake.error_body(status), headers)
+            return
+
+        route(body, stream)
+
+    def _responses(self, body: Dict[str, Any], stream: bool) -> None:
+        fake = self.server.fake
+        if stream:
+            self._send_events(((e["type"], e) for e in fake.response_events()), done_marker=False)
+        else:
+            self._generate(fake.answer_text())
+            self._send_json(200, fake.response)
+
+    def _chat(self, body: Dict[str, Any], stream: bool) -> None:
+        fake = self.server.fake
+        model = body.get("model", "gpt-4o-mini")
+        if stream:
+            self._send_events(((None, chunk) for chunk in fake.chat_chunks(model)), done_marker=True)
+        else:
+            self._generate(fake.answer_text())
+            self._send_json(200, fake.chat_completion(model))
+
+    def _generate(self, text: str) -> None:
+        """Spend the time a non-streamed answer of this length would take."""
+        time.sleep(self.server.fake.token_delay() * len(split_tokens(text)))
+
+    def _send_json(self, status: int, payload: Dict[str, Any],
+                   headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_events(self, events: Iterator[Tuple[Optional[str], Dict[str, Any]]],
+                     done_marker: bool) -> None:
+        """
+        Write Server-Sent Events, pacing text tokens at the configured rate.
+
+        Responses API events are named; chat completion chunks are not and
+        end with a literal [DONE] marker.
+        """
+        delay = self.server.fake.token_delay()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        for name, payload in events:
+            if delay and _has_text(payload):
+                time.sleep(delay)
+            prefix = f"event: {name}\n" if name else ""
+            self.wfile.write(f"{prefix}data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        if done_marker:
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    fake: FakeOpenAI
+
+
+class FakeOpenAIServer:
+    """
+    The fake API running on a background thread.
+
+    EXAMPLE USAGE:
+    >>> with FakeOpenAIServer(FakeServerConfig(latency_ms=200)) as server:
+    ...     client = WebSearchClient(api_key="sk-test", base_url=server.base_url)
+    ...     client.search("anything")
+    """
+
+    def __init__(self, config: Optional[FakeServerConfig] = None, host: str = "127.0.0.1",
+                 port: int = 0, fixtures_path: Union[str, Path] = DEFAULT_FIXTURES):
+        """
+        Bind the server socket (port 0 picks a free port).
+
+        Args:
+            config: Server behaviour
+            host: Interface to listen on
+            port: Port to listen on
+            fixtures_path: JSON file of recorded API responses
+        """
+        self.fake = FakeOpenAI(config, fixtures_path)
+        self.httpd = _Server((host, port), _Handler)
+        self.httpd.fake = self.fake
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """URL to pass as base_url to OpenAI clients."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def stats(self) -> FakeServerStats:
+        """Request counters."""
+        return self.fake.stats
+
+    def start(self) -> "FakeOpenAIServer":
+        """Serve requests on a daemon thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the socket."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments for running the server standalone."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--fixture", default="valid_search_response")
+    parser.add_argument("--fixtures-path", default=str(DEFAULT_FIXTURES))
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate-500", type=float, default=0.0)
+    parser.add_argument("--retry-after-ms", type=int, default=100)
+    parser.add_argument("--payload-scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the fake server in the foreground until interrupted."""
+    args = parse_arguments(argv)
+    config = FakeServerConfig(
+        fixture=args.fixture,
+        latency_ms=args.latency_ms,
+        latency_distribution=args.latency_distribution,
+        tokens_per_second=args.tokens_per_second,
+        error_rate_429=args.error_rate_429,
+        error_rate_500=args.error_rate_500,
+        retry_after_ms=args.retry_after_ms,
+        payload_scale=args.payload_scale,
+        seed=args.seed,
+    )
+    server = FakeOpenAIServer(config, args.host, args.port, args.fixtures_path)
+    logger.info("Fake OpenAI API listening on %s", server.base_url)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    setup_logging(log_level=os.getenv("LOG_LEVEL", "INFO"), enable_file=False)
+    raise SystemExit(main())
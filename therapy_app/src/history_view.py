@@ -0,0 +1,74 @@
+"""
+Windowed rendering of the chat history.
+
+Streamlit reruns the whole script on every interaction, and the chat used
+to redraw every message of the session each time, so a long session made
+every click and keystroke slower. HistoryView shows only the newest
+messages - a page at a time, with a "load earlier" control for the rest -
+so a rerun costs the same however long the session has grown.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from src.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class HistoryView:
+    """
+    The part of a conversation's history to draw on this rerun.
+
+    One instance belongs to one session. The history only grows until the
+    chat is cleared; a shorter history sends the view back to the newest
+    page.
+
+    EXAMPLE USAGE:
+    >>> view = HistoryView(page_size=20)
+    >>> hidden, visible = view.visible(messages)
+    >>> for role, content in visible:
+    ...     st.chat_message(role).markdown(content)
+    """
+
+    def __init__(self, page_size: int = 20):
+        """
+        Create a view.
+
+        Args:
+            page_size: Messages shown initially and added per "load earlier"
+
+        Raises:
+            ValueError: If page_size is below 1
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        self.page_size = page_size
+        self.pages = 1
+        self._seen = 0
+
+    def load_earlier(self) -> None:
+        """Show one more page of older messages."""
+        self.pages += 1
+
+    def reset(self) -> None:
+        """Back to the newest page."""
+        self.pages = 1
+
+    def visible(self, messages: Sequence[Dict[str, str]]) -> Tuple[int, List[Tuple[str, str]]]:
+        """
+        Choose the messages to draw.
+
+        Args:
+            messages: The whole conversation, oldest first
+
+        Returns:
+            How many older messages are hidden, and (role, content) for
+            each visible message, oldest first
+        """
+        if len(messages) < self._seen:
+            logger.debug("History shrank to %d messages; resetting view", len(messages))
+            self.reset()
+        self._seen = len(messages)
+        start = max(0, len(messages) - self.pages * self.page_size)
+        return start, [(message["role"], message["content"]) for message in messages[start:]]
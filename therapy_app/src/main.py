@@ -7,13 +7,13 @@ This module provides the CLI interface for the web search application.
 import os
 import sys
 import argparse
-from typing import List
+from typing import Iterable, List
 
 from dotenv import load_dotenv
 
 from src.search_service import SearchService
 from src.parser import ResponseParser
-from src.models import SearchOptions, SearchResult, Citation, SearchError
+from src.models import SearchOptions, SearchResult, Citation, SearchError, StreamUpdate
 from src.logging_config import setup_logging, get_logger, LogContext
 
 
@@ -45,6 +45,7 @@ Examples:
   %(prog)s "What are the latest AI developments?"
   %(prog)s "Python 3.12 new features" --model gpt-5
   %(prog)s "climate news" --domains bbc.com,cnn.com
+  %(prog)s "today's headlines" --stream
         """
     )
     
@@ -73,6 +74,12 @@ Examples:
         help="Enable verbose output"
     )
     
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the answer as it is generated instead of all at once"
+    )
+    
     parser.add_argument(
         "--api-key",
         type=str,
@@ -94,6 +101,43 @@ def display_results(result: SearchResult) -> None:
     print(formatted)
 
 
+def display_stream(query: str, updates: Iterable[StreamUpdate]) -> SearchResult:
+    """
+    Print a streaming search as it arrives.
+    
+    Answer text is printed word by word as deltas arrive; citations and
+    sources are printed once the result is complete.
+    
+    Args:
+        query: The search query (for the header)
+        updates: StreamUpdate objects from SearchService.search_stream()
+        
+    Returns:
+        The final SearchResult
+    """
+    parser = ResponseParser()
+    print("=" * 80)
+    print(f"Query: {query}")
+    print("=" * 80)
+    print()
+    print("Result:")
+    
+    printed_text = False
+    result = None
+    for update in updates:
+        if update.kind == "text":
+            print(update.text, end="", flush=True)
+            printed_text = True
+        elif update.kind == "done":
+            result = update.result
+    
+    if not printed_text:
+        print(result.text, end="")
+    print("\n")
+    print(parser.format_references(result))
+    return result
+
+
 def format_citations(citations: List[Citation]) -> str:
     """
     Format a list of citations for display.
@@ -168,12 +212,17 @@ def main() -> int:
         
         logger.info(f"Executing search query: '{args.query}'")
         with LogContext(logger, "Web search", query=args.query, model=args.model):
-            result = service.search(args.query, options)
+            if args.stream:
+                # Results are displayed as they arrive
+                result = display_stream(args.query, service.search_stream(args.query, options))
+            else:
+                result = service.search(args.query, options)
         
         logger.info(f"Search completed: {len(result.citations)} citations found")
         
         # Display results
-        display_results(result)
+        if not args.stream:
+            display_results(result)
         
         logger.info("Web search application completed successfully")
         return 0
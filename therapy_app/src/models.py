@@ -24,9 +24,9 @@ LEARNING OBJECTIVES:
 ✓ Appreciate immutability and data validation
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 
 
 # ============================================================================
@@ -303,7 +303,37 @@ class SearchResult:
         "⚠️ This answer doesn't cite any sources"
         """
         return len(self.citations) > 0
-    
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to plain JSON-compatible data (for caches and files).
+
+        💡 WHY NOT dataclasses.asdict()?
+        --------------------------------
+        asdict() would leave `timestamp` as a datetime, which json.dumps
+        can't handle. We store it as an ISO-8601 string instead.
+        """
+        return {
+            "query": self.query,
+            "text": self.text,
+            "citations": [vars(c).copy() for c in self.citations],
+            "sources": [vars(s).copy() for s in self.sources],
+            "search_id": self.search_id,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SearchResult":
+        """Rebuild a SearchResult from the output of to_dict()."""
+        return cls(
+            query=data["query"],
+            text=data["text"],
+            citations=[Citation(**c) for c in data["citations"]],
+            sources=[Source(**s) for s in data["sources"]],
+            search_id=data["search_id"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+        )
+
     def __str__(self) -> str:
         """
         Concise string representation for logging.
@@ -318,6 +348,48 @@ class SearchResult:
         return f"SearchResult(query='{self.query}', citations={len(self.citations)})"
 
 
+# ============================================================================
+# BLUEPRINT 4b: StreamUpdate - The Answer, One Piece at a Time
+# ============================================================================
+
+@dataclass
+class StreamUpdate:
+    """
+    One incremental piece of a streaming search.
+    
+    📚 CONCEPT: Progressive Results
+    --------------------------------
+    Instead of waiting for the whole SearchResult, a streaming search hands
+    you small updates as soon as they exist:
+    - kind="text": a few more words of the answer (in `text`)
+    - kind="citation": a newly attached citation (in `citation`)
+    - kind="sources": the websites the search consulted (in `sources`)
+    - kind="done": the finished SearchResult (in `result`)
+    
+    EXAMPLE USAGE:
+    >>> for update in service.search_stream("latest AI news"):
+    ...     if update.kind == "text":
+    ...         print(update.text, end="", flush=True)
+    ...     elif update.kind == "done":
+    ...         final = update.result
+    """
+    
+    # What this update carries: "text", "citation", "sources" or "done"
+    kind: str
+    
+    # New answer text (kind="text")
+    text: str = ""
+    
+    # Newly attached citation (kind="citation")
+    citation: Optional[Citation] = None
+    
+    # Sources consulted by the search (kind="sources")
+    sources: List[Source] = field(default_factory=list)
+    
+    # The complete result (kind="done")
+    result: Optional[SearchResult] = None
+
+
 # ============================================================================
 # BLUEPRINT 5: SearchError - When Things Go Wrong
 # ============================================================================
@@ -404,3 +476,66 @@ class SearchError(Exception):
         if self.details:
             error_str += f" | Details: {self.details}"
         return error_str
+
+
+# ============================================================================
+# BLUEPRINT 6: Batch Results - Many Searches, One Report
+# ============================================================================
+
+@dataclass
+class BatchStats:
+    """
+    Throughput numbers for a batch of searches.
+    
+    📚 CONCEPT: Percentiles vs Averages
+    ------------------------------------
+    An average hides the slow outliers that users actually notice. p50 is the
+    "typical" search; p99 is the slowest 1% - the number to watch when a
+    nightly job suddenly takes twice as long.
+    """
+    
+    # How many queries were submitted / succeeded / failed
+    total: int
+    succeeded: int
+    failed: int
+    
+    # Wall-clock time for the whole batch
+    elapsed_seconds: float
+    
+    # Completed queries per second of wall-clock time
+    queries_per_second: float
+    
+    # Per-query latency percentiles in milliseconds
+    p50_latency_ms: float
+    p99_latency_ms: float
+
+
+@dataclass
+class BatchSearchResult:
+    """
+    Outcome of SearchService.search_many().
+    
+    📝 DESIGN DECISION: Errors Are Values
+    --------------------------------------
+    One bad query shouldn't throw away 999 good answers, so `results` holds a
+    SearchResult OR a SearchError for every query, in the same order the
+    queries were given.
+    
+    EXAMPLE USAGE:
+    >>> batch = service.search_many(["python news", "rust news"])
+    >>> for query, outcome in zip(queries, batch.results):
+    ...     if isinstance(outcome, SearchError):
+    ...         print(f"{query} failed: {outcome.code}")
+    >>> print(f"{batch.stats.queries_per_second:.1f} queries/s")
+    """
+    
+    # One entry per input query, input order preserved
+    results: List[Union[SearchResult, SearchError]]
+    
+    # Throughput and latency for the batch
+    stats: BatchStats
+    
+    @property
+    def errors(self) -> List[SearchError]:
+        """All failures in the batch, in input order."""
+        return [r for r in self.results if isinstance(r, SearchError)]
@@ -5,9 +5,9 @@ This module handles parsing and transforming API responses into domain models.
 """
 
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-from src.models import SearchResult, Citation, Source
+from src.models import SearchResult, Citation, Source, StreamUpdate
 
 
 class ResponseParser:
@@ -129,6 +129,21 @@ class ResponseParser:
         lines.append("Result:")
         lines.append(result.text)
         lines.append("")
+        lines.append(self.format_references(result))
+        
+        return "\n".join(lines)
+    
+    def format_references(self, result: SearchResult) -> str:
+        """
+        Format the citations and sources sections of a SearchResult.
+        
+        Args:
+            result: SearchResult to format
+            
+        Returns:
+            Formatted string for display
+        """
+        lines = []
         
         if result.citations:
             lines.append("Citations:")
@@ -150,3 +165,103 @@ class ResponseParser:
         lines.append("=" * 80)
         
         return "\n".join(lines)
+
+
+class StreamingResponseParser(ResponseParser):
+    """
+    Incremental parser for streamed web search responses.
+    
+    Feed it the event dictionaries from WebSearchClient.search_stream() one
+    at a time; it turns the interesting ones into StreamUpdate objects and
+    builds up the SearchResult as it goes.
+    """
+    
+    def __init__(self, query: str):
+        """
+        Initialize a parser for one streamed search.
+        
+        Args:
+            query: The original search query
+        """
+        self.query = query
+        self.citations: List[Citation] = []
+        self.sources: List[Source] = []
+        self.search_id = ""
+        self._text_parts: List[str] = []
+    
+    @property
+    def text(self) -> str:
+        """The answer text received so far."""
+        return "".join(self._text_parts)
+    
+    def feed(self, event: Dict[str, Any]) -> Optional[StreamUpdate]:
+        """
+        Consume one stream event.
+        
+        Args:
+            event: Event dictionary from WebSearchClient.search_stream()
+            
+        Returns:
+            A StreamUpdate if the event carried something new, else None
+        """
+        event_type = event.get("type")
+        
+        if event_type == "response.output_text.delta":
+            delta = event.get("delta", "")
+            if not delta:
+                return None
+            self._text_parts.append(delta)
+            return StreamUpdate(kind="text", text=delta)
+        
+        if event_type == "response.output_text.annotation.added":
+            new_citations = self._extract_citations([event.get("annotation") or {}])
+            if not new_citations:
+                return None
+            self.citations.extend(new_citations)
+            return StreamUpdate(kind="citation", citation=new_citations[0])
+        
+        if event_type == "response.output_item.done":
+            return self._finish_item(event.get("item") or {})
+        
+        if event_type == "response.completed":
+            return StreamUpdate(kind="done", result=self.result())
+        
+        return None
+    
+    def result(self) -> SearchResult:
+        """
+        Build a SearchResult from everything received so far.
+        
+        Returns:
+            SearchResult (possibly partial if the stream hasn't finished)
+        """
+        return SearchResult(
+            query=self.query,
+            text=self.text,
+            citations=list(self.citations),
+            sources=list(self.sources),
+            search_id=self.search_id,
+            timestamp=datetime.now()
+        )
+    
+    def _finish_item(self, item: Dict[str, Any]) -> Optional[StreamUpdate]:
+        """Handle a completed output item (search call or message)."""
+        if item.get("type") == "web_search_call":
+            self.search_id = item.get("id", "")
+            self.sources = self._extract_sources(item.get("action") or {})
+            return StreamUpdate(kind="sources", sources=list(self.sources))
+        
+        if item.get("type") == "message":
+            # The finished message is authoritative; fill in anything the
+            # delta/annotation events didn't deliver
+            for content_item in item.get("content", []):
+                if content_item.get("type") != "output_text":
+                    continue
+                if not self._text_parts:
+                    self._text_parts.append(content_item.get("text", ""))
+                if not self.citations:
+                    self.citations = self._extract_citations(
+                        content_item.get("annotations", [])
+                    )
+        
+        return None
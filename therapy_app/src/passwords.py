@@ -0,0 +1,121 @@
+"""
+Password hashing off the caller's thread.
+
+Hashing and verification run on a small dedicated thread pool, so however
+many users log in at once a slow key-derivation function never occupies
+more than `max_workers` cores. The pool only caps concurrency: it does not
+make a hash any faster, and a caller still waits for the whole KDF (longer
+when more than `max_workers` requests are queued). Callers that can wait on
+a Future use the *_async methods; hash() and verify() block the calling
+thread until the pool has finished, just as computing inline would.
+
+Stored hash formats:
+
+    <64 hex chars>                                    unsalted SHA-256 (legacy)
+    pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>  PBKDF2-HMAC-SHA256
+"""
+
+import atexit
+import hashlib
+import hmac
+import os
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+SCHEMES = ("sha256", "pbkdf2_sha256")
+
+#: OWASP's 2023 recommendation for PBKDF2-HMAC-SHA256
+PBKDF2_ITERATIONS = 600_000
+
+
+class PasswordHasher:
+    """
+    Hash and verify passwords on a bounded executor.
+
+    hash() and verify() block the calling thread until the pool has done
+    the work; the *_async variants return the Future. Either way at most
+    `max_workers` hashes are computed concurrently, which limits CPU use
+    but not latency: each caller still waits for its full KDF run. Every
+    verification runs the KDF: nothing is remembered between calls.
+
+    The pool is shut down by close(), or at interpreter exit if the hasher
+    is still alive.
+    """
+
+    def __init__(self, scheme: str = "sha256", iterations: int = PBKDF2_ITERATIONS,
+                 max_workers: int = 2):
+        """
+        Create a hasher.
+
+        Args:
+            scheme: Format new hashes are written in (one of SCHEMES)
+            iterations: PBKDF2 rounds for new pbkdf2_sha256 hashes
+            max_workers: Hashes computed at the same time (further
+                requests queue; they are not served faster)
+
+        Raises:
+            ValueError: If scheme is not recognised
+        """
+        if scheme not in SCHEMES:
+            raise ValueError(f"Unknown password scheme {scheme!r}; expected one of {SCHEMES}")
+        self.scheme = scheme
+        self.iterations = iterations
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="password-hasher")
+        atexit.register(_close_hasher, weakref.ref(self))
+
+    def hash(self, password: str) -> str:
+        """Hash a password in the configured scheme (blocks until the pool is done)."""
+        return self.hash_async(password).result()
+
+    def hash_async(self, password: str) -> "Future[str]":
+        """Schedule hash() on the pool."""
+        return self._executor.submit(self._hash, password)
+
+    def verify(self, password: str, stored: str) -> bool:
+        """
+        Check a password against a stored hash in any supported format.
+
+        Blocks until the pool is done; use verify_async() to wait elsewhere.
+        """
+        return self.verify_async(password, stored).result()
+
+    def verify_async(self, password: str, stored: str) -> "Future[bool]":
+        """Schedule verify() on the pool."""
+        return self._executor.submit(self._verify, password, stored)
+
+    def needs_rehash(self, stored: str) -> bool:
+        """Whether a stored hash is weaker than what this hasher writes."""
+        if self.scheme == "sha256":
+            return False
+        parts = stored.split("$")
+        return parts[0] != self.scheme or int(parts[1]) < self.iterations
+
+    def close(self) -> None:
+        """Shut down the pool once queued work is done."""
+        self._executor.shutdown()
+
+    def _hash(self, password: str) -> str:
+        if self.scheme == "sha256":
+            return hashlib.sha256(password.encode()).hexdigest()
+        salt = os.urandom(16)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations)
+        return f"pbkdf2_sha256${self.iterations}${salt.hex()}${digest.hex()}"
+
+    def _verify(self, password: str, stored: str) -> bool:
+        if stored.startswith("pbkdf2_sha256$"):
+            _, iterations, salt, expected = stored.split("$")
+            actual = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt),
+                                         int(iterations)).hex()
+        else:
+            expected = stored
+            actual = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(actual, expected)
+
+
+def _close_hasher(ref: "weakref.ref[PasswordHasher]") -> None:
+    """Shut down a hasher's pool at interpreter exit, if it is still alive."""
+    hasher = ref()
+    if hasher is not None:
+        hasher.close()
@@ -0,0 +1,291 @@
+"""
+Client-side rate limiting for OpenAI requests.
+
+This module provides token buckets for requests/min and tokens/min, adapts
+them to the rate-limit headers OpenAI returns, and computes jittered
+exponential backoff for retrying 429 responses.
+"""
+
+import asyncio
+import math
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Mapping, Optional
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parse an OpenAI reset duration such as "20ms", "1s" or "6m0s".
+
+    Args:
+        value: Duration string from an x-ratelimit-reset-* header
+
+    Returns:
+        Duration in seconds, or None if the string isn't a duration
+    """
+    parts = _DURATION_PART.findall(value.strip())
+    if not parts or "".join(n + u for n, u in parts) != value.strip():
+        return None
+    return sum(float(number) * _UNIT_SECONDS[unit] for number, unit in parts)
+
+
+def parse_retry_after(headers: Mapping[str, str], now: Callable[[], float] = time.time) -> Optional[float]:
+    """
+    Read the server's requested wait from retry-after style headers.
+
+    Args:
+        headers: Response headers
+        now: Wall-clock time source (for HTTP-date values)
+
+    Returns:
+        Seconds to wait, or None if the server didn't say
+    """
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - now())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    reserve() always succeeds immediately and may drive the balance negative;
+    the caller then sleeps for the returned time. Because the reservation is
+    made under a short lock and the sleep happens outside it, the same bucket
+    can be shared by threads and asyncio tasks alike.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a full bucket.
+
+        Args:
+            per_minute: Sustained rate; also the burst capacity
+            clock: Monotonic time source, injectable for tests
+
+        Raises:
+            ValueError: If per_minute is not positive
+        """
+        if per_minute <= 0:
+            raise ValueError("Rate must be positive")
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self._updated = clock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take `amount` tokens and return how long to wait before using them.
+
+        Args:
+            amount: Tokens to consume
+
+        Returns:
+            Seconds until the reservation is covered (0.0 if immediately)
+        """
+        with self._lock:
+            self._refill()
+            self.available -= amount
+            if self.available >= 0:
+                return 0.0
+            return -self.available / self.rate
+
+    def clamp(self, remaining: float) -> None:
+        """Never believe we have more tokens than the server says remain."""
+        with self._lock:
+            self._refill()
+            self.available = min(self.available, remaining)
+
+    def set_rate(self, per_minute: float) -> None:
+        """Change the sustained rate and burst capacity."""
+        with self._lock:
+            self._refill()
+            self.capacity = float(per_minute)
+            self.rate = per_minute / 60.0
+            self.available = min(self.available, self.capacity)
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimiter:
+    """
+    Requests/min and tokens/min limiter with adaptive backoff.
+
+    One instance is meant to be shared by every client in the process.
+    Each request reserves one request token plus an estimate of its model
+    tokens before it is sent. When the server answers 429, its headers
+    tighten the buckets and may block all callers until retry-after.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 200_000,
+        expected_output_tokens: int = 1000,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        headroom: float = 0.95,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Any] = time.sleep,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request quota to stay under (server-reported
+                limits can lower it, never raise it)
+            tokens_per_minute: Token quota to stay under (likewise)
+            expected_output_tokens: Tokens reserved per request for the answer
+            max_retries: Retries (429s, 5xx, dropped connections) before giving up
+            base_delay: First backoff step in seconds
+            max_delay: Cap on a single backoff step in seconds
+            headroom: Fraction of a server-reported limit to actually use
+            clock: Monotonic time source, injectable for tests
+            sleep: Blocking sleep function, injectable for tests
+            rng: Uniform [0, 1) random source for jitter
+
+        Raises:
+            ValueError: If a setting is out of range
+        """
+        if max_retries < 0 or base_delay < 0 or max_delay < base_delay or not 0 < headroom <= 1:
+            raise ValueError("Invalid retry or headroom settings")
+
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.requests = TokenBucket(requests_per_minute, clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock)
+        self.expected_output_tokens = expected_output_tokens
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.headroom = headroom
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+
+    def estimate_tokens(self, text: str) -> int:
+        """Rough token cost of a request: ~4 characters per prompt token."""
+        return math.ceil(len(text) / 4) + self.expected_output_tokens
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until a request costing `tokens` may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """
+        Async variant of acquire() that yields to the event loop while waiting.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Full-jitter exponential backoff for the given retry attempt (0-based).
+
+        Jitter spreads retries from many callers out in time so they don't
+        all hit the API again at the same instant.
+        """
+        return self.rng() * min(self.max_delay, self.base_delay * (2 ** attempt))
+
+    def should_retry(self, attempt: int) -> bool:
+        """Whether a request that has already been retried `attempt` times may retry again."""
+        return attempt < self.max_retries
+
+    def update_from_headers(self, headers: Any) -> Optional[float]:
+        """
+        Adapt to the rate-limit headers of an API response.
+
+        Args:
+            headers: Response headers (anything that isn't a mapping is ignored)
+
+        Returns:
+            Seconds the server asked us to wait, if it said
+        """
+        if not isinstance(headers, Mapping):
+            return None
+
+        for kind, bucket, configured in (
+            ("requests", self.requests, self.requests_per_minute),
+            ("tokens", self.tokens, self.tokens_per_minute),
+        ):
+            limit = _as_float(headers.get(f"x-ratelimit-limit-{kind}"))
+            if limit:
+                # The caller's limit is a cap the server's quota can't lift
+                target = min(configured, limit * self.headroom)
+                if target != bucket.capacity:
+                    bucket.set_rate(target)
+
+            remaining = _as_float(headers.get(f"x-ratelimit-remaining-{kind}"))
+            if remaining is not None:
+                bucket.clamp(remaining)
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+                if remaining <= 0 and reset:
+                    self._block_for(reset)
+
+        retry_after = parse_retry_after(headers)
+        if retry_after:
+            self._block_for(retry_after)
+        return retry_after
+
+    def _block_for(self, seconds: float) -> None:
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self.clock() + seconds)
+
+    def _reserve(self, tokens: int) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        with self._lock:
+            blocked = self._blocked_until - self.clock()
+        return max(wait, blocked, 0.0)
+
+
+def _as_float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -4,22 +4,46 @@ Search service for orchestrating web search operations.
 This module provides the business logic layer for web search.
 """
 
-from typing import Optional, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Iterable, Iterator, Union
 
+from src.cache import SearchCache, make_cache_key
 from src.client import WebSearchClient
-from src.parser import ResponseParser
-from src.models import SearchOptions, SearchResult, SearchError
+from src.parser import ResponseParser, StreamingResponseParser
+from src.rate_limit import RateLimiter
+from src.singleflight import SingleFlight, SingleFlightStats
+from src.models import (
+    SearchOptions,
+    SearchResult,
+    SearchError,
+    StreamUpdate,
+    BatchSearchResult,
+    BatchStats,
+)
 
 
 class SearchService:
     """Service for coordinating web search operations."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[SearchCache] = None,
+        coalesce_requests: bool = True,
+        rate_limiter: Optional[RateLimiter] = None,
+        base_url: Optional[str] = None,
+    ):
         """
         Initialize the search service.
         
         Args:
             api_key: OpenAI API key
+            cache: Optional result cache (e.g. MemoryCache or DiskCache)
+            coalesce_requests: Share one upstream request between concurrent
+                identical (query, options) searches
+            rate_limiter: Optional RateLimiter shared with other clients
+            base_url: Alternative API root, e.g. a local fake server
             
         Raises:
             ValueError: If no API key is provided
@@ -27,8 +51,12 @@ class SearchService:
         if not api_key:
             raise ValueError("API key is required")
         
-        self.client = WebSearchClient(api_key=api_key)
+        self.client = WebSearchClient(
+            api_key=api_key, rate_limiter=rate_limiter, base_url=base_url
+        )
         self.parser = ResponseParser()
+        self.cache = cache
+        self.single_flight = SingleFlight() if coalesce_requests else None
     
     def search(self, query: str, options: Optional[SearchOptions] = None) -> SearchResult:
         """
@@ -53,6 +81,110 @@ class SearchService:
         if options is None:
             options = SearchOptions()
         
+        if self.cache is None and self.single_flight is None:
+            return self._fetch(query, options, None)
+        
+        key = make_cache_key(query, options)
+        
+        # Serve repeated searches without an API round trip
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        # Concurrent identical searches share one upstream request
+        if self.single_flight is not None:
+            result, _ = self.single_flight.do(key, lambda: self._fetch(query, options, key))
+            return result
+        
+        return self._fetch(query, options, key)
+    
+    def search_stream(
+        self, query: str, options: Optional[SearchOptions] = None
+    ) -> Iterator[StreamUpdate]:
+        """
+        Perform a web search, yielding the answer as it is generated.
+        
+        Text deltas, citations and sources are yielded as they arrive; the
+        last update always has kind="done" and carries the full SearchResult.
+        Cache hits are replayed as a single text update followed by "done".
+        
+        Args:
+            query: The search query
+            options: Optional search configuration
+            
+        Yields:
+            StreamUpdate objects
+            
+        Raises:
+            ValueError: If query is invalid
+            SearchError: If search fails
+        """
+        if not self.validate_query(query):
+            raise ValueError("Invalid query: must be non-empty and under 5000 characters")
+        
+        if options is None:
+            options = SearchOptions()
+        
+        cache_key = make_cache_key(query, options) if self.cache is not None else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield StreamUpdate(kind="text", text=cached.text)
+                yield StreamUpdate(kind="done", result=cached)
+                return
+        
+        parser = StreamingResponseParser(query)
+        result = None
+        try:
+            for event in self.client.search_stream(query, options):
+                update = parser.feed(event)
+                if update is None:
+                    continue
+                if update.kind == "done":
+                    result = update.result
+                    continue
+                yield update
+        except SearchError:
+            raise
+        except Exception as e:
+            raise SearchError(
+                code="SEARCH_FAILED",
+                message=f"Search operation failed: {str(e)}",
+                details={"original_error": str(e)}
+            )
+        
+        # A stream that ends without response.completed still yields what it
+        # got, but a truncated answer must not be served from the cache
+        if result is None:
+            result = parser.result()
+        elif cache_key is not None:
+            self.cache.set(cache_key, result)
+        
+        yield StreamUpdate(kind="done", result=result)
+    
+    @property
+    def coalescing_stats(self) -> Optional[SingleFlightStats]:
+        """How many searches were coalesced onto another caller's request."""
+        if self.single_flight is None:
+            return None
+        return self.single_flight.stats
+    
+    def _fetch(self, query: str, options: SearchOptions, cache_key: Optional[str]) -> SearchResult:
+        """
+        Call the API, parse the response and populate the cache.
+        
+        Args:
+            query: The search query
+            options: Search configuration
+            cache_key: Key to store the result under (None = don't cache)
+            
+        Returns:
+            Parsed SearchResult
+            
+        Raises:
+            SearchError: If the request or parsing fails
+        """
         try:
             # Perform search via client
             raw_response = self.client.search(query, options)
@@ -60,8 +192,6 @@ class SearchService:
             # Parse response
             result = self.parser.parse(raw_response, query)
             
-            return result
-            
         except SearchError:
             # Re-raise search errors
             raise
@@ -72,6 +202,74 @@ class SearchService:
                 message=f"Search operation failed: {str(e)}",
                 details={"original_error": str(e)}
             )
+        
+        if self.cache is not None and cache_key is not None:
+            self.cache.set(cache_key, result)
+        
+        return result
+    
+    def search_many(
+        self,
+        queries: Iterable[str],
+        options: Optional[SearchOptions] = None,
+        max_concurrency: int = 8,
+    ) -> BatchSearchResult:
+        """
+        Run many searches concurrently on a bounded worker pool.
+        
+        A failing query never aborts the batch: its slot in the results holds
+        the SearchError instead (invalid queries become VALIDATION_ERROR).
+        
+        Args:
+            queries: Search queries to run
+            options: Search configuration shared by every query
+            max_concurrency: Maximum number of searches in flight at once
+            
+        Returns:
+            BatchSearchResult with one outcome per query, in input order
+            
+        Raises:
+            ValueError: If max_concurrency is less than 1
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
+        queries = list(queries)
+        outcomes: List[Union[SearchResult, SearchError]] = [None] * len(queries)
+        latencies = [0.0] * len(queries)
+        
+        def run(index: int) -> None:
+            started = time.perf_counter()
+            try:
+                outcomes[index] = self.search(queries[index], options)
+            except SearchError as e:
+                outcomes[index] = e
+            except ValueError as e:
+                outcomes[index] = SearchError(
+                    code="VALIDATION_ERROR",
+                    message=str(e),
+                    details={"query": queries[index]}
+                )
+            latencies[index] = time.perf_counter() - started
+        
+        batch_started = time.perf_counter()
+        if queries:
+            workers = min(max_concurrency, len(queries))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(run, range(len(queries))))
+        elapsed = time.perf_counter() - batch_started
+        
+        failed = sum(1 for outcome in outcomes if isinstance(outcome, SearchError))
+        stats = BatchStats(
+            total=len(queries),
+            succeeded=len(queries) - failed,
+            failed=failed,
+            elapsed_seconds=elapsed,
+            queries_per_second=len(queries) / elapsed if elapsed > 0 else 0.0,
+            p50_latency_ms=_percentile(latencies, 50) * 1000,
+            p99_latency_ms=_percentile(latencies, 99) * 1000,
+        )
+        return BatchSearchResult(results=outcomes, stats=stats)
     
     def validate_query(self, query: str) -> bool:
         """
@@ -127,3 +325,21 @@ class SearchService:
                 raise ValueError(f"Invalid domain format: '{domain}'")
         
         return SearchOptions(allowed_domains=domains)
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of a list of numbers.
+    
+    Args:
+        values: Samples (need not be sorted)
+        percent: Percentile to compute, 0-100
+        
+    Returns:
+        The percentile value, or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))  # ceiling division
+    return ordered[int(rank) - 1]
@@ -0,0 +1,180 @@
+"""
+Document serializers for the JSON user store.
+
+Each serializer turns a profile dictionary into bytes and back, and names
+the file suffix its output is stored under, so files written in different
+formats can sit side by side and always be read back. The stdlib JSON
+format needs nothing extra; the others use optional packages:
+
+    orjson          compact JSON, several times faster than json
+    msgpack         binary, smaller and faster to parse than JSON
+    <format>+zstd   any of the above, compressed with zstandard
+"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, List
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+class Serializer(ABC):
+    """Converts documents to and from bytes."""
+
+    #: Format name accepted by get_serializer()
+    name: str = ""
+    #: File suffix documents in this format are stored under
+    suffix: str = ""
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """Encode a document."""
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """Decode a document produced by dumps()."""
+
+
+class JsonSerializer(Serializer):
+    """Indented stdlib JSON, the format profiles have always used."""
+
+    name = "json"
+    suffix = ".json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, indent=2).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(Serializer):
+    """Compact JSON via orjson; readable by anything that reads JSON."""
+
+    name = "orjson"
+    suffix = ".json"
+
+    def __init__(self):
+        _require(orjson, "orjson")
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    """MessagePack binary documents."""
+
+    name = "msgpack"
+    suffix = ".msgpack"
+
+    def __init__(self):
+        _require(msgpack, "msgpack")
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+class ZstdSerializer(Serializer):
+    """Another serializer's output, compressed with zstandard."""
+
+    def __init__(self, inner: Serializer, level: int = 3):
+        """
+        Wrap a serializer.
+
+        Args:
+            inner: Serializer whose bytes are compressed
+            level: zstd compression level (1-22)
+        """
+        _require(zstandard, "zstandard")
+        self.inner = inner
+        self.level = level
+        self.name = f"{inner.name}+zstd"
+        self.suffix = f"{inner.suffix}.zst"
+
+    def dumps(self, value: Any) -> bytes:
+        # Compressor objects are not thread-safe, and cheap to create
+        return zstandard.ZstdCompressor(level=self.level).compress(self.inner.dumps(value))
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(zstandard.ZstdDecompressor().decompress(data))
+
+
+FORMATS = ("json", "orjson", "msgpack", "json+zstd", "orjson+zstd", "msgpack+zstd")
+
+_BASE = {"json": JsonSerializer, "orjson": OrjsonSerializer, "msgpack": MsgpackSerializer}
+
+
+def get_serializer(name: str) -> Serializer:
+    """
+    Build the serializer for a format name.
+
+    Args:
+        name: One of FORMATS
+
+    Returns:
+        The serializer
+
+    Raises:
+        ValueError: If the format is not recognised
+        ImportError: If the format needs a package that isn't installed
+    """
+    base, _, compression = name.partition("+")
+    if base not in _BASE or compression not in ("", "zstd"):
+        raise ValueError(f"Unknown serialization format {name!r}; expected one of {FORMATS}")
+    serializer = _BASE[base]()
+    return ZstdSerializer(serializer) if compression else serializer
+
+
+def available_formats() -> List[str]:
+    """Formats whose packages are installed."""
+    available = []
+    for name in FORMATS:
+        try:
+            get_serializer(name)
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+_SUFFIXES = {".json": "json", ".msgpack": "msgpack",
+             ".json.zst": "json+zstd", ".msgpack.zst": "msgpack+zstd"}
+
+#: Every suffix a serializer can write, so readers can find any stored document
+SUFFIXES = tuple(_SUFFIXES)
+
+
+def reader_for(suffix: str, preferred: Serializer) -> Serializer:
+    """
+    Serializer to read a file with the given suffix.
+
+    Raises:
+        ImportError: If reading it needs a package that isn't installed
+    """
+    if suffix == preferred.suffix:
+        return preferred
+    return get_serializer(_SUFFIXES[suffix])
+
+
+def _require(module: Any, package: str) -> None:
+    if module is None:
+        raise ImportError(f"This format needs the {package} package (pip install {package})")
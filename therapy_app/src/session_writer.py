@@ -0,0 +1,257 @@
+"""
+Background, debounced persistence of chat sessions.
+
+Checkpointing a session rewrites the session journal and index and may
+touch the user's profile. The chat used to do that on the request thread
+every few messages, so the user waited on disk before the next render.
+SessionWriter takes the transcript, returns at once and writes it from a
+worker thread:
+
+- saves of the same session are coalesced: only the newest transcript is
+  kept (a checkpoint writes every message not yet saved, so nothing is
+  lost), and it is written once the session has been quiet for `debounce`
+  seconds, or at the latest `max_delay` seconds after the first unsaved
+  change;
+- at most `max_pending` sessions wait at a time; further saves block until
+  the worker makes room;
+- flush() writes a user's (or everyone's) pending sessions now and waits
+  for them, for logout, and close() runs at interpreter exit.
+"""
+
+import atexit
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.logging_config import get_logger
+from src.user_manager import UserManager
+
+
+logger = get_logger(__name__)
+
+_Key = Tuple[str, str]
+
+
+@dataclass
+class WriterStats:
+    """What the writer has done, and what it is holding."""
+
+    saves: int = 0
+    coalesced: int = 0
+    writes: int = 0
+    failures: int = 0
+    depth: int = 0
+    max_depth: int = 0
+    last_latency: float = 0.0
+    max_latency: float = 0.0
+    total_latency: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        """Mean seconds from a session's first unsaved change to its write."""
+        return self.total_latency / self.writes if self.writes else 0.0
+
+
+@dataclass
+class _Pending:
+    """The newest unsaved transcript of one session."""
+
+    therapist: str
+    messages: List[Dict]
+    first_save: float
+    last_save: float
+    forced: bool = False
+    not_before: float = float("-inf")
+
+
+class SessionWriter:
+    """
+    Write chat sessions through a UserManager from a background thread.
+
+    EXAMPLE USAGE:
+    >>> writer = SessionWriter(user_manager)
+    >>> session_id = writer.save(username, therapist, messages, session_id)
+    >>> writer.flush(username)  # on logout
+    """
+
+    def __init__(self, user_manager: UserManager, debounce: float = 2.0,
+                 max_delay: float = 10.0, max_pending: int = 256,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Create a writer and start its worker thread.
+
+        Args:
+            user_manager: Manager whose log_session() does the writing
+            debounce: Quiet seconds after which a session is written
+            max_delay: Longest a changed session waits while saves keep coming
+            max_pending: Sessions waiting at most; save() blocks beyond it
+            clock: Monotonic time source
+
+        Raises:
+            ValueError: If max_pending is below 1
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.user_manager = user_manager
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self._clock = clock
+        self._pending: Dict[_Key, _Pending] = {}
+        self._in_flight: Optional[_Key] = None
+        self._stats = WriterStats()
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._thread.start()
+        atexit.register(_close_writer, weakref.ref(self))
+
+    @property
+    def stats(self) -> WriterStats:
+        """A snapshot of the counters."""
+        with self._cond:
+            return WriterStats(**{**vars(self._stats), "depth": len(self._pending)})
+
+    def save(self, username: str, therapist: str, messages: List[Dict],
+             session_id: Optional[str] = None) -> str:
+        """
+        Queue a checkpoint of a session.
+
+        Args:
+            username: Username
+            therapist: Therapist name
+            messages: The whole transcript so far (copied, so the caller may
+                keep appending to its list)
+            session_id: Session to checkpoint; None starts a new session
+
+        Returns:
+            The session ID, assigned now for a new session
+
+        Raises:
+            RuntimeError: If the writer has been closed
+        """
+        if session_id is None:
+            session_id = self.user_manager.new_session_id()
+        key = (username, session_id)
+        snapshot = list(messages)
+        with self._cond:
+            while (not self._closed and key not in self._pending
+                   and len(self._pending) >= self.max_pending):
+                self._cond.wait()
+            if self._closed:
+                raise RuntimeError("SessionWriter is closed")
+            now = self._clock()
+            self._stats.saves += 1
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = _Pending(therapist, snapshot, now, now)
+                self._stats.max_depth = max(self._stats.max_depth, len(self._pending))
+            else:
+                self._stats.coalesced += 1
+                pending.therapist, pending.messages, pending.last_save = therapist, snapshot, now
+            self._cond.notify_all()
+        return session_id
+
+    def flush(self, username: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Write pending sessions now and wait until they are saved.
+
+        Saves queued while flushing are left to the usual schedule.
+
+        Args:
+            username: Only this user's sessions (default: everyone's)
+            timeout: Seconds to wait at most (default: no limit)
+
+        Returns:
+            Whether every session pending at the call was written in time
+        """
+        with self._cond:
+            keys = {key for key in [*self._pending, self._in_flight]
+                    if key is not None and (username is None or key[0] == username)}
+            for key in keys & self._pending.keys():
+                self._pending[key].forced = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._in_flight not in keys and not any(
+                key in self._pending and self._pending[key].forced for key in keys), timeout)
+            unsaved = sum(key in self._pending or key == self._in_flight for key in keys)
+        if unsaved:
+            logger.warning("%d session(s) for %s not saved by flush", unsaved,
+                           username or "all users")
+        return not unsaved
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write everything pending and stop the worker.
+
+        Returns:
+            Whether everything was written in time
+        """
+        with self._cond:
+            if self._closed:
+                return True
+        done = self.flush(timeout=timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return done
+
+    def _due(self, pending: _Pending) -> float:
+        if pending.forced:
+            return float("-inf")
+        return max(pending.not_before,
+                   min(pending.last_save + self.debounce, pending.first_save + self.max_delay))
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    now = self._clock()
+                    key = min(self._pending, key=lambda k: self._due(self._pending[k]), default=None)
+                    if key is not None and self._due(self._pending[key]) <= now:
+                        break
+                    self._cond.wait(None if key is None else self._due(self._pending[key]) - now)
+                pending = self._pending.pop(key)
+                self._in_flight = key
+                self._cond.notify_all()
+            self._write(key, pending)
+
+    def _write(self, key: _Key, pending: _Pending) -> None:
+        username, session_id = key
+        try:
+            self.user_manager.log_session(username, pending.therapist, pending.messages,
+                                          session_id=session_id)
+        except Exception:
+            logger.exception("Could not save session %s for %s; retrying", session_id, username)
+            with self._cond:
+                self._stats.failures += 1
+                # Retry after the debounce, unless a newer save replaced it
+                newer = self._pending.setdefault(key, pending)
+                if newer is pending:
+                    pending.forced = False
+                    pending.not_before = self._clock() + self.debounce
+                self._in_flight = None
+                self._cond.notify_all()
+            return
+        with self._cond:
+            latency = self._clock() - pending.first_save
+            self._stats.writes += 1
+            self._stats.last_latency = latency
+            self._stats.max_latency = max(self._stats.max_latency, latency)
+            self._stats.total_latency += latency
+            self._in_flight = None
+            depth = len(self._pending)
+            self._cond.notify_all()
+        logger.debug("Saved session %s for %s (%d messages) %.3fs after the first change; "
+                     "%d pending", session_id, username, len(pending.messages), latency, depth)
+
+
+def _close_writer(ref: "weakref.ref[SessionWriter]") -> None:
+    """Write a writer's pending sessions at interpreter exit, if it is still alive."""
+    writer = ref()
+    if writer is not None:
+        writer.close(timeout=10.0)
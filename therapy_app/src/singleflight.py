@@ -0,0 +1,100 @@
+"""
+In-flight request coalescing.
+
+This module lets concurrent callers asking for the same thing share a single
+upstream call instead of each making their own.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters describing how much duplicate work was avoided."""
+
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+    in_flight: int = 0
+
+
+class _Call:
+    """One upstream call and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls that share a key.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait and receive the leader's result, or its
+    exception. Once the call finishes the key is forgotten, so later calls
+    run again - this is deduplication, not caching.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = SingleFlightStats()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the work being requested
+            fn: Zero-argument function performing the work
+
+        Returns:
+            Tuple of (result, shared) where shared is True if this caller
+            received another caller's result
+
+        Raises:
+            Whatever fn raised, re-raised in every waiting caller
+        """
+        with self._lock:
+            self._stats.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats.executions += 1
+            else:
+                self._stats.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        """Snapshot of call, execution and coalesced counters."""
+        with self._lock:
+            return SingleFlightStats(
+                calls=self._stats.calls,
+                executions=self._stats.executions,
+                coalesced=self._stats.coalesced,
+                in_flight=len(self._calls),
+            )
@@ -0,0 +1,1472 @@
+"""
+Storage backends for UserManager.
+
+This module defines the UserStore interface and two implementations: the
+original one-JSON-file-per-profile layout, and a SQLite database (WAL mode)
+where profiles, intake responses, goals, progress notes and sessions are
+indexed tables updated row by row.
+
+Existing JSON data can be imported with:
+
+    python -m src.storage migrate user_data
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple, Union
+
+from src.cache import CacheStats
+from src.serializers import SUFFIXES, Serializer, get_serializer, reader_for
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: locks only cover this process
+    fcntl = None
+
+
+def _clone(value: Any) -> Any:
+    """Copy a JSON-shaped value; several times faster than copy.deepcopy."""
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+
+class ProfileCache:
+    """
+    Bounded LRU of profiles, each tagged with the version it was read at.
+
+    A lookup only hits if the caller's current version of the profile (a
+    file's stat signature, a database's data_version, ...) still matches,
+    so changes made by other processes are never masked. Entries are
+    copied on the way in and out so callers can't mutate the cache.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Profiles kept before the least recently used is evicted
+
+        Raises:
+            ValueError: If max_entries is negative
+        """
+        if max_entries < 0:
+            raise ValueError("max_entries cannot be negative")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Hashable, Dict[str, Any]]]" = OrderedDict()
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, username: str, version: Hashable) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached profile if it is still at version."""
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    del self._entries[username]
+                    self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(username)
+            self._stats.hits += 1
+            profile = entry[1]
+        return _clone(profile)
+
+    def put(self, username: str, version: Hashable, profile: Dict[str, Any]) -> None:
+        """Remember profile as the content of version."""
+        if self.max_entries == 0:
+            return
+        profile = _clone(profile)
+        with self._lock:
+            self._entries[username] = (version, profile)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def discard(self, username: str) -> None:
+        """Forget a profile."""
+        with self._lock:
+            self._entries.pop(username, None)
+
+    @property
+    def stats(self) -> CacheStats:
+        """Snapshot of hit/miss/eviction counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                entries=len(self._entries),
+            )
+
+
+#: Profile lists that only keep a recent window, with older entries archived
+ARCHIVED_FIELDS = ("session_history", "progress_notes")
+
+#: Default number of recent entries kept per archived field
+PROFILE_WINDOW = 50
+
+#: In-process locks users are spread over (users sharing one just take turns)
+LOCK_STRIPES = 64
+
+
+class UserStore(ABC):
+    """
+    Interface for persisting user profiles and therapy sessions.
+
+    Profiles are exchanged as plain dictionaries in the shape UserManager
+    has always used; each backend decides how to lay them out on disk.
+
+    So that profiles stay the same size however old an account is, the
+    ARCHIVED_FIELDS lists only hold recent entries (at least the last
+    `window`, at most twice that). Older ones are archived and returned by
+    load_archive(); profile["archived"] counts them per field.
+    """
+
+    @abstractmethod
+    def create_profile(self, profile: Dict[str, Any]) -> bool:
+        """Store a new profile; False if the username is already taken."""
+
+    @abstractmethod
+    def get_profile(self, username: str) -> Optional[Dict[str, Any]]:
+        """Return the full profile, or None if the user doesn't exist."""
+
+    @abstractmethod
+    def update_profile(self, username: str, updates: Dict[str, Any]) -> bool:
+        """Apply field updates; False if the user doesn't exist."""
+
+    @abstractmethod
+    def add_progress_note(self, username: str, note: Dict[str, Any]) -> bool:
+        """Append one progress note; False if the user doesn't exist."""
+
+    @abstractmethod
+    def add_session(self, session: Dict[str, Any], summary: Dict[str, Any]) -> None:
+        """
+        Save a session transcript and, if the user exists, count it.
+
+        Args:
+            session: Full session record (includes username and messages)
+            summary: Entry for the profile's session_history
+        """
+
+    @abstractmethod
+    def append_messages(self, username: str, session_id: str,
+                        messages: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        Checkpoint a session that is still in progress.
+
+        Only messages beyond those already saved are written.
+
+        Args:
+            username: Owner of the session
+            session_id: Session to extend
+            messages: The complete transcript so far
+
+        Returns:
+            The session's message count, or None if there is no such session
+        """
+
+    @abstractmethod
+    def list_sessions(self, username: str, limit: Optional[int] = None,
+                      before: Optional[str] = None,
+                      therapist: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Summarize a user's sessions without loading their transcripts.
+
+        Args:
+            username: Owner of the sessions
+            limit: Return at most this many (the most recent ones)
+            before: Only sessions whose id sorts before this one
+            therapist: Only sessions with this therapist
+
+        Returns:
+            Summaries (session_id, username, therapist, start_time,
+            message_count), oldest first
+        """
+
+    @abstractmethod
+    def load_session(self, username: str, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return one full session with its messages, or None if it doesn't exist."""
+
+    def get_sessions(self, username: str) -> List[Dict[str, Any]]:
+        """Return every saved session for a user, oldest first."""
+        return [self.load_session(username, summary["session_id"])
+                for summary in self.list_sessions(username)]
+
+    @abstractmethod
+    def load_archive(self, username: str, field: str) -> List[Dict[str, Any]]:
+        """
+        Return the archived entries of a profile list, oldest first.
+
+        Args:
+            username: Owner of the profile
+            field: One of ARCHIVED_FIELDS
+
+        Returns:
+            Entries no longer in the profile itself (empty if none)
+
+        Raises:
+            ValueError: If field is not archived
+        """
+
+    @abstractmethod
+    def iter_intake_responses(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream every user's intake answers, bypassing the profile cache.
+
+        Yields:
+            (username, intake_responses) for users who have answered
+        """
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class JsonUserStore(UserStore):
+    """
+    One pretty-printed JSON file per profile, one journal per session.
+
+    Layout ("sharded"; <shard> is two levels of hash prefix, e.g. 3f/a2):
+        <data_dir>/profiles/<shard>/<username>.json
+        <data_dir>/sessions/<shard>/<username>/session_<id>.jsonl
+        <data_dir>/sessions/<shard>/<username>/index.json
+
+    Trees created before sharding use the same paths without <shard>
+    ("flat") and keep working until migrate_to_sharded() converts them;
+    <data_dir>/layout.json records which layout a directory uses. Sharding
+    keeps every directory small (a few entries per leaf at a million
+    users), so lookups, creates and backups don't slow down as users grow.
+
+    A session journal is JSON Lines: a header record followed by one
+    {"seq": n, "message": {...}} record per message, appended as the chat
+    grows, so a checkpoint costs only the new messages. The index maps each
+    session id to its therapist, start time, message count and the byte
+    offset where its committed records end; listing sessions reads only the
+    index, and a checkpoint first truncates anything past that offset.
+    A checkpoint writes only the journal and the index: the message counts
+    in the profile's session_history are filled in from the index when the
+    profile is read. Sessions written as single session_<id>.json documents
+    by older versions are still read, are added to the index the first time
+    they are listed, and are rewritten as journals when checkpointed.
+
+    Profiles are cached write-through: a read only opens the file if its
+    stat signature changed since this process last read or wrote it.
+
+    Several processes may share one data directory. Every change to a
+    user's files happens under that user's advisory lock
+    (<data_dir>/locks/<shard>/<username>.lock), and profiles and indexes are
+    replaced atomically via a temporary file and rename, so readers never
+    need the lock and never see a half-written file. Lock files are empty
+    and stay in place once created: deleting one while another process
+    holds or is opening it would let two processes lock different files.
+    They can be removed while no process has the directory open. Within a
+    process, users are spread over LOCK_STRIPES thread locks, so memory
+    does not grow with the number of users.
+
+    When an archived list reaches twice the window, its oldest entries are
+    written to a segment (sessions/<shard>/<username>/archive/
+    <field>-<first index><suffix>) before the trimmed profile is saved. A
+    segment orphaned by a crash in between is ignored and later rewritten,
+    because profile["archived"] is what decides which segments count.
+    """
+
+    def __init__(self, data_dir: Union[str, Path] = "user_data", cache_size: int = 256,
+                 layout: Optional[str] = None,
+                 profile_format: Union[str, Serializer] = "json",
+                 window: int = PROFILE_WINDOW):
+        """
+        Open the data directory, creating it if needed.
+
+        Args:
+            data_dir: Root directory for user data
+            cache_size: Profiles kept in memory (0 disables the cache)
+            layout: "sharded" or "flat"; None uses the directory's recorded
+                layout (new directories are sharded, unrecorded ones flat)
+            profile_format: Serializer, or format name (see src.serializers),
+                profiles are written with. Profiles in any other format are
+                still read, and converted the next time they are saved.
+            window: Recent session_history / progress_notes entries kept
+                in the profile
+
+        Raises:
+            ValueError: If layout or profile_format is not recognised
+            ImportError: If profile_format needs a package that isn't installed
+        """
+        self.data_dir = Path(data_dir)
+        self.profile_cache = ProfileCache(cache_size)
+        self.serializer = (get_serializer(profile_format) if isinstance(profile_format, str)
+                           else profile_format)
+        self._suffixes = [self.serializer.suffix] + [
+            suffix for suffix in SUFFIXES if suffix != self.serializer.suffix
+        ]
+        self._converting: set = set()
+        # Users whose legacy session documents this process has indexed
+        self._legacy_indexed: set = set()
+        self.window = window
+        self.profiles_dir = self.data_dir / "profiles"
+        self.sessions_dir = self.data_dir / "sessions"
+        self.locks_dir = self.data_dir / "locks"
+        self._thread_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+        # Ensure directories exist
+        self.profiles_dir.mkdir(parents=True, exist_ok=True)
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.locks_dir.mkdir(parents=True, exist_ok=True)
+
+        if layout is None:
+            layout = _read_layout(self.data_dir)
+        if layout is None:
+            # Existing data without a record predates sharding
+            if _has_entries(self.profiles_dir) or _has_entries(self.sessions_dir):
+                layout = "flat"
+            else:
+                layout = "sharded"
+                _write_layout(self.data_dir, layout)
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout {layout!r}; expected one of {LAYOUTS}")
+        self.layout = layout
+
+    def _shard(self, username: str) -> Path:
+        return shard_path(username) if self.layout == "sharded" else Path()
+
+    def _get_profile_path(self, username: str, suffix: Optional[str] = None) -> Path:
+        """Get path to user profile file (in the configured format by default)."""
+        suffix = suffix or self.serializer.suffix
+        return self.profiles_dir / self._shard(username) / f"{username}{suffix}"
+
+    def _find_profile(self, username: str) -> Optional[Tuple[Path, str, os.stat_result]]:
+        """Locate a profile in whichever format it was saved in."""
+        for suffix in self._suffixes:
+            path = self._get_profile_path(username, suffix)
+            try:
+                return path, suffix, os.stat(path)
+            except FileNotFoundError:
+                continue
+        return None
+
+    def _get_session_path(self, username: str) -> Path:
+        """Get path to user session directory, creating it if needed."""
+        user_session_dir = self._session_dir(username)
+        user_session_dir.mkdir(parents=True, exist_ok=True)
+        return user_session_dir
+
+    def _session_dir(self, username: str) -> Path:
+        """Path to user session directory, which may not exist yet."""
+        return self.sessions_dir / self._shard(username) / username
+
+    def iter_usernames(self) -> Iterator[str]:
+        """Yield every username with a profile, streaming the directory tree."""
+        for path in _walk_shards(self.profiles_dir, self.layout):
+            username = _profile_username(os.path.basename(path))
+            if username is not None:
+                yield username
+
+    def iter_intake_responses(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for path in _walk_shards(self.profiles_dir, self.layout):
+            filename = os.path.basename(path)
+            username = _profile_username(filename)
+            if username is None:
+                continue
+            with open(path, 'rb') as f:
+                profile = reader_for(filename[len(username):], self.serializer).loads(f.read())
+            if profile.get("intake_responses"):
+                yield username, profile["intake_responses"]
+
+    def iter_session_owners(self) -> Iterator[str]:
+        """Yield every username with a session directory."""
+        for path in _walk_shards(self.sessions_dir, self.layout):
+            yield os.path.basename(path)
+
+    @contextmanager
+    def _user_lock(self, username: str) -> Iterator[None]:
+        """Hold a user's lock against other threads and other processes."""
+        thread_lock = self._thread_locks[hash(username) % LOCK_STRIPES]
+        lock_path = self.locks_dir / self._shard(username) / f"{username}.lock"
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with thread_lock, open(lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield  # closing the file releases the flock
+
+    def _write_profile(self, username: str, profile: Dict[str, Any]) -> None:
+        self._roll_over(username, profile)
+        profile_path = self._get_profile_path(username)
+        data = self.serializer.dumps(profile)
+        try:
+            stat = _atomic_write(profile_path, data)
+        except FileNotFoundError:
+            profile_path.parent.mkdir(parents=True, exist_ok=True)
+            stat = _atomic_write(profile_path, data)
+        self.profile_cache.put(username, (_file_version(stat), self._index_version(username)),
+                               profile)
+
+        if username in self._converting:
+            # The profile was last read in another format; drop that copy
+            self._converting.discard(username)
+            for suffix in self._suffixes[1:]:
+                try:
+                    os.unlink(self._get_profile_path(username, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def _roll_over(self, username: str, profile: Dict[str, Any]) -> None:
+        """Archive the oldest entries of any list that has grown too long."""
+        for field in ARCHIVED_FIELDS:
+            entries = profile.get(field) or []
+            if len(entries) < 2 * self.window:
+                continue
+            archived = dict(profile.get("archived") or {})
+            first = archived.get(field, 0)
+            moved = len(entries) - self.window
+            archive_dir = self._get_session_path(username) / "archive"
+            archive_dir.mkdir(parents=True, exist_ok=True)
+            _atomic_write(archive_dir / f"{field}-{first:09d}{self.serializer.suffix}",
+                          self.serializer.dumps(entries[:moved]))
+            archived[field] = first + moved
+            profile[field] = entries[moved:]
+            profile["archived"] = archived
+
+    def load_archive(self, username: str, field: str) -> List[Dict[str, Any]]:
+        if field not in ARCHIVED_FIELDS:
+            raise ValueError(f"{field!r} is not archived; expected one of {ARCHIVED_FIELDS}")
+        profile = self.get_profile(username) or {}
+        archived = (profile.get("archived") or {}).get(field, 0)
+        archive_dir = self._get_session_path(username) / "archive"
+        if not archived or not archive_dir.is_dir():
+            return []
+
+        entries: List[Dict[str, Any]] = []
+        prefix = f"{field}-"
+        for path in sorted(archive_dir.glob(f"{prefix}*")):
+            first = int(path.name[len(prefix):len(prefix) + 9])
+            if first != len(entries) or first >= archived:
+                continue  # orphaned by a roll-over that never reached the profile
+            with open(path, 'rb') as f:
+                suffix = path.name[len(prefix) + 9:]
+                entries.extend(reader_for(suffix, self.serializer).loads(f.read()))
+        return entries[:archived]
+
+    def create_profile(self, profile: Dict[str, Any]) -> bool:
+        with self._user_lock(profile["username"]):
+            if self._find_profile(profile["username"]) is not None:
+                return False
+            self._write_profile(profile["username"], profile)
+        return True
+
+    def get_profile(self, username: str) -> Optional[Dict[str, Any]]:
+        found = self._find_profile(username)
+        if found is None:
+            self.profile_cache.discard(username)
+            return None
+
+        profile_path, suffix, stat = found
+        if suffix != self.serializer.suffix:
+            self._converting.add(username)
+        version = (_file_version(stat), self._index_version(username))
+        profile = self.profile_cache.get(username, version)
+        if profile is None:
+            with open(profile_path, 'rb') as f:
+                profile = reader_for(suffix, self.serializer).loads(f.read())
+            self._fill_message_counts(username, profile)
+            self.profile_cache.put(username, version, profile)
+        return profile
+
+    def _index_version(self, username: str) -> Optional[Hashable]:
+        try:
+            return _file_version(os.stat(self._session_dir(username) / "index.json"))
+        except FileNotFoundError:
+            return None
+
+    def _fill_message_counts(self, username: str, profile: Dict[str, Any]) -> None:
+        """Take session_history message counts from the session index, which checkpoints update."""
+        if not profile.get("session_history"):
+            return
+        index = self._read_index(username)
+        for summary in profile["session_history"]:
+            entry = index.get(summary.get("session_id"))
+            if entry is not None:
+                summary["message_count"] = entry["message_count"]
+
+    def update_profile(self, username: str, updates: Dict[str, Any]) -> bool:
+        with self._user_lock(username):
+            profile = self.get_profile(username)
+            if profile is None:
+                return False
+            profile.update(updates)
+            self._write_profile(username, profile)
+        return True
+
+    def add_progress_note(self, username: str, note: Dict[str, Any]) -> bool:
+        with self._user_lock(username):
+            profile = self.get_profile(username)
+            if profile is None:
+                return False
+            profile['progress_notes'].append(note)
+            self._write_profile(username, profile)
+        return True
+
+    def add_session(self, session: Dict[str, Any], summary: Dict[str, Any]) -> None:
+        username = session["username"]
+        session_id = session["session_id"]
+        messages = session.get("messages", [])
+        header = {k: v for k, v in session.items() if k not in ("messages", "message_count")}
+        data = json.dumps(header).encode() + b"\n" + self._encode_messages(messages, 0)
+
+        with self._user_lock(username):
+            # Read before the index changes, so a cached profile stays valid
+            profile = self.get_profile(username)
+            _atomic_write(self._journal_path(username, session_id), data)
+
+            index = self._read_index(username)
+            index[session_id] = {
+                "therapist": session.get("therapist"),
+                "start_time": session.get("start_time"),
+                "message_count": len(messages),
+                "offset": len(data),
+            }
+            self._write_index(username, index)
+
+            if profile:
+                profile['total_sessions'] = profile.get('total_sessions', 0) + 1
+                profile['session_history'].append(summary)
+                self._write_profile(username, profile)
+
+    def append_messages(self, username: str, session_id: str,
+                        messages: List[Dict[str, Any]]) -> Optional[int]:
+        with self._user_lock(username):
+            index = self._read_index(username)
+            entry = index.get(session_id)
+            if entry is None or entry.get("legacy"):
+                return self._upgrade_legacy(username, session_id, messages, index)
+
+            saved = entry["message_count"]
+            if len(messages) <= saved:
+                return saved
+
+            with open(self._journal_path(username, session_id), 'rb+') as f:
+                if "offset" in entry:
+                    # Drop records from a checkpoint that never reached the index
+                    f.seek(entry["offset"])
+                    f.truncate()
+                else:
+                    # Unknown offset: start on a fresh line even if a write was torn
+                    f.seek(-1, 2)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write(self._encode_messages(messages[saved:], saved))
+                entry["offset"] = f.tell()
+            entry["message_count"] = len(messages)
+            # The profile's session_history counts are read from the index
+            self._write_index(username, index)
+        return len(messages)
+
+    def _upgrade_legacy(self, username: str, session_id: str, messages: List[Dict[str, Any]],
+                        index: Dict[str, Dict[str, Any]]) -> Optional[int]:
+        """
+        Checkpoint a session_<id>.json document by rewriting it as a journal.
+
+        The session was counted when it was first saved, so the profile's
+        total_sessions is left alone. Called with the user's lock held.
+
+        Returns:
+            The session's message count, or None if there is no such document
+        """
+        legacy_path = self._session_dir(username) / f"session_{session_id}.json"
+        try:
+            with open(legacy_path, 'r') as f:
+                session = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        if len(messages) <= len(session.get("messages", [])):
+            messages = session.get("messages", [])
+        header = {k: v for k, v in session.items() if k not in ("messages", "message_count")}
+        data = json.dumps(header).encode() + b"\n" + self._encode_messages(messages, 0)
+        _atomic_write(self._journal_path(username, session_id), data)
+        index[session_id] = {
+            "therapist": session.get("therapist"),
+            "start_time": session.get("start_time"),
+            "message_count": len(messages),
+            "offset": len(data),
+        }
+        self._write_index(username, index)
+        os.unlink(legacy_path)
+        return len(messages)
+
+    def list_sessions(self, username: str, limit: Optional[int] = None,
+                      before: Optional[str] = None,
+                      therapist: Optional[str] = None) -> List[Dict[str, Any]]:
+        index = self._index_legacy_sessions(username)
+        summaries = [
+            {
+                "session_id": session_id,
+                "username": username,
+                "therapist": entry["therapist"],
+                "start_time": entry["start_time"],
+                "message_count": entry["message_count"],
+            }
+            for session_id, entry in sorted(index.items())
+            if (before is None or session_id < before)
+            and (therapist is None or entry["therapist"] == therapist)
+        ]
+        return _most_recent(summaries, limit)
+
+    def load_session(self, username: str, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._read_index(username).get(session_id)
+        if entry is None:
+            return None
+        if entry.get("legacy"):
+            with open(self._get_session_path(username) / f"session_{session_id}.json", 'r') as f:
+                return json.load(f)
+        return self._read_journal(username, session_id, entry)
+
+    def _index_legacy_sessions(self, username: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the index after adding any unindexed session_<id>.json documents.
+
+        The directory is scanned once per user per process: this code only
+        writes journals, which are indexed as they are written.
+        """
+        index = self._read_index(username)
+        if username in self._legacy_indexed:
+            return index
+        legacy = list(self._session_dir(username).glob("session_*.json"))
+        if all(path.stem[len("session_"):] in index for path in legacy):
+            self._legacy_indexed.add(username)
+            return index
+
+        with self._user_lock(username):
+            index = self._read_index(username)
+            for path in legacy:
+                if path.stem[len("session_"):] in index:
+                    continue
+                with open(path, 'r') as f:
+                    session = json.load(f)
+                index[session["session_id"]] = {
+                    "therapist": session.get("therapist"),
+                    "start_time": session.get("start_time"),
+                    "message_count": len(session.get("messages", [])),
+                    "legacy": True,
+                }
+            self._write_index(username, index)
+        self._legacy_indexed.add(username)
+        return index
+
+    def _journal_path(self, username: str, session_id: str) -> Path:
+        return self._get_session_path(username) / f"session_{session_id}.jsonl"
+
+    def _read_index(self, username: str) -> Dict[str, Dict[str, Any]]:
+        index_path = self._session_dir(username) / "index.json"
+        if not index_path.exists():
+            return {}
+        with open(index_path, 'r') as f:
+            return json.load(f)
+
+    def _write_index(self, username: str, index: Dict[str, Dict[str, Any]]) -> None:
+        _atomic_write(self._get_session_path(username) / "index.json",
+                      json.dumps(index, separators=(",", ":")).encode())
+
+    def _encode_messages(self, messages: List[Dict[str, Any]], first_seq: int) -> bytes:
+        return "".join(
+            json.dumps({"seq": seq, "message": message}) + "\n"
+            for seq, message in enumerate(messages, first_seq)
+        ).encode()
+
+    def _read_journal(self, username: str, session_id: str,
+                      entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Rebuild a transcript from its journal.
+
+        Reading stops at the indexed offset. Journals written before offsets
+        were indexed may still hold records from a checkpoint that crashed
+        before updating the index, so only the first message_count sequence
+        numbers are used and a later record for the same number wins; a torn
+        final line is skipped.
+        """
+        message_count = entry["message_count"]
+        records: Dict[int, Dict[str, Any]] = {}
+        with open(self._journal_path(username, session_id), 'rb') as f:
+            data = f.read(entry["offset"]) if "offset" in entry else f.read()
+            lines = data.splitlines()
+            session = json.loads(lines[0])
+            for line in lines[1:]:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                records[record["seq"]] = record["message"]
+
+        messages = []
+        while len(messages) < message_count and len(messages) in records:
+            messages.append(records[len(messages)])
+
+        session["messages"] = messages
+        session["message_count"] = len(messages)
+        return session
+
+
+def _most_recent(summaries: List[Dict[str, Any]], limit: Optional[int]) -> List[Dict[str, Any]]:
+    """Keep the last limit summaries (all of them if limit is None)."""
+    if limit is None:
+        return summaries
+    return summaries[max(len(summaries) - limit, 0):]
+
+
+LAYOUTS = ("sharded", "flat")
+
+
+def shard_path(username: str) -> Path:
+    """Two-level directory a user's files live under in the sharded layout."""
+    digest = hashlib.sha1(username.encode()).hexdigest()
+    return Path(digest[:2], digest[2:4])
+
+
+def _read_layout(data_dir: Path) -> Optional[str]:
+    try:
+        with open(data_dir / "layout.json", 'r') as f:
+            return json.load(f)["layout"]
+    except FileNotFoundError:
+        return None
+
+
+def _write_layout(data_dir: Path, layout: str) -> None:
+    _atomic_write(data_dir / "layout.json", json.dumps({"layout": layout}).encode())
+
+
+def _profile_username(filename: str) -> Optional[str]:
+    """The username a profile file belongs to, or None for other files."""
+    if filename.startswith("."):
+        return None
+    for suffix in sorted(SUFFIXES, key=len, reverse=True):
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return None
+
+
+def _has_entries(directory: Path) -> bool:
+    with os.scandir(directory) as entries:
+        return next(entries, None) is not None
+
+
+def _walk_shards(root: Path, layout: str) -> Iterator[str]:
+    """Yield the paths of the per-user entries under root, one directory at a time."""
+    levels = 2 if layout == "sharded" else 0
+    yield from _walk(str(root), levels)
+
+
+def _walk(directory: str, levels: int) -> Iterator[str]:
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not levels:
+                yield entry.path
+            elif entry.is_dir():
+                yield from _walk(entry.path, levels - 1)
+
+
+def _atomic_write(path: Path, data: bytes) -> os.stat_result:
+    """
+    Replace path with data so readers see either the old or the new file.
+
+    Returns:
+        The new file's stat result
+    """
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            stat = os.fstat(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return stat
+
+
+def _file_version(stat: os.stat_result) -> Hashable:
+    """Signature that changes whenever a file is rewritten or replaced."""
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+# Profile fields stored as columns of the users table, in profile order
+_USER_COLUMNS = (
+    "username", "password_hash", "created_at", "last_login", "assigned_therapist",
+    "recommended_therapist", "intake_completed", "intake_date", "total_sessions",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password_hash TEXT NOT NULL,
+    created_at TEXT,
+    last_login TEXT,
+    assigned_therapist TEXT,
+    recommended_therapist TEXT,
+    intake_completed INTEGER NOT NULL DEFAULT 0,
+    intake_date TEXT,
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS intake_responses (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    UNIQUE (username, question_id)
+);
+CREATE TABLE IF NOT EXISTS goals (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    goal TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS goals_username ON goals (username, id);
+CREATE TABLE IF NOT EXISTS progress_notes (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    date TEXT,
+    note TEXT,
+    therapist TEXT
+);
+CREATE INDEX IF NOT EXISTS progress_notes_username ON progress_notes (username, id);
+CREATE TABLE IF NOT EXISTS sessions (
+    username TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    therapist TEXT,
+    start_time TEXT,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (username, session_id)
+);
+CREATE INDEX IF NOT EXISTS sessions_therapist ON sessions (username, therapist, session_id);
+CREATE TABLE IF NOT EXISTS session_messages (
+    username TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (username, session_id, seq)
+);
+"""
+
+
+# Archived profile list -> (table, columns, order, row to entry)
+_PROFILE_LISTS = {
+    "progress_notes": (
+        "progress_notes", "date, note, therapist", "id",
+        lambda date, note, therapist: {"date": date, "note": note, "therapist": therapist},
+    ),
+    "session_history": (
+        "sessions", "session_id, therapist, start_time, message_count", "session_id",
+        lambda session_id, therapist, date, count: {
+            "session_id": session_id, "therapist": therapist, "date": date, "message_count": count,
+        },
+    ),
+}
+
+
+class SQLiteUserStore(UserStore):
+    """
+    SQLite store with one row per profile, answer, goal, note and session.
+
+    Logging in touches a single column, adding a note inserts a single row,
+    and a session no longer rewrites the whole profile document. WAL mode
+    lets readers proceed while a write is in progress.
+
+    Profile fields that have no column of their own are kept in the
+    users.extra JSON column so arbitrary initial_data still round-trips.
+    session_history is derived from the sessions table.
+
+    Assembled profiles are cached until this store changes them or
+    PRAGMA data_version shows another connection has committed.
+
+    Notes and sessions stay in their tables; a profile is assembled with
+    only the newest `window` of each, and load_archive() queries the rest.
+    """
+
+    def __init__(self, path: Union[str, Path], cache_size: int = 256,
+                 window: int = PROFILE_WINDOW):
+        """
+        Open (or create) the database.
+
+        Args:
+            path: SQLite file to store users in
+            cache_size: Profiles kept in memory (0 disables the cache)
+            window: Recent session_history / progress_notes entries put in
+                assembled profiles
+        """
+        self.path = Path(path)
+        self.window = window
+        self.profile_cache = ProfileCache(cache_size)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def create_profile(self, profile: Dict[str, Any]) -> bool:
+        with self._transaction():
+            try:
+                self._insert_profile(profile)
+            except sqlite3.IntegrityError:
+                return False
+        self.profile_cache.discard(profile["username"])
+        return True
+
+    def get_profile(self, username: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            profile = self.profile_cache.get(username, version)
+            if profile is None:
+                profile = self._load_profile(username)
+                if profile is not None:
+                    self.profile_cache.put(username, version, profile)
+        return profile
+
+    def _load_profile(self, username: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_USER_COLUMNS)}, extra FROM users WHERE username = ?",
+                (username,),
+            ).fetchone()
+            if row is None:
+                return None
+            columns = dict(zip(_USER_COLUMNS, row))
+            extra = json.loads(row[-1])
+
+            intake = {
+                question: json.loads(answer)
+                for question, answer in self._conn.execute(
+                    "SELECT question_id, answer FROM intake_responses"
+                    " WHERE username = ? ORDER BY id", (username,)
+                )
+            }
+            goals = [goal for (goal,) in self._conn.execute(
+                "SELECT goal FROM goals WHERE username = ? ORDER BY id", (username,)
+            )]
+            notes = self._select_list("progress_notes", username, archived=False)
+            history = self._select_list("session_history", username, archived=False)
+            archived = {}
+            for field in ARCHIVED_FIELDS:
+                table = _PROFILE_LISTS[field][0]
+                (total,) = self._conn.execute(
+                    f"SELECT COUNT(*) FROM {table} WHERE username = ?", (username,)
+                ).fetchone()
+                if total > self.window:
+                    archived[field] = total - self.window
+
+        profile = {
+            "username": columns["username"],
+            "password_hash": columns["password_hash"],
+            "created_at": columns["created_at"],
+            "last_login": columns["last_login"],
+            "assigned_therapist": columns["assigned_therapist"],
+            "recommended_therapist": columns["recommended_therapist"],
+            "intake_completed": bool(columns["intake_completed"]),
+            "intake_responses": intake,
+            "therapy_goals": goals,
+            "progress_notes": notes,
+            "total_sessions": columns["total_sessions"],
+            "session_history": history,
+        }
+        if columns["intake_date"] is not None:
+            profile["intake_date"] = columns["intake_date"]
+        if archived:
+            profile["archived"] = archived
+        profile.update(extra)
+        return profile
+
+    def load_archive(self, username: str, field: str) -> List[Dict[str, Any]]:
+        if field not in ARCHIVED_FIELDS:
+            raise ValueError(f"{field!r} is not archived; expected one of {ARCHIVED_FIELDS}")
+        with self._lock:
+            return self._select_list(field, username, archived=True)
+
+    def iter_intake_responses(self, page_size: int = 1000) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        # Page through usernames so the lock is never held across a yield
+        last = ""
+        while True:
+            with self._lock:
+                usernames = [username for (username,) in self._conn.execute(
+                    "SELECT DISTINCT username FROM intake_responses WHERE username > ?"
+                    " ORDER BY username LIMIT ?", (last, page_size)
+                )]
+                if not usernames:
+                    return
+                rows = self._conn.execute(
+                    "SELECT username, question_id, answer FROM intake_responses"
+                    " WHERE username BETWEEN ? AND ? ORDER BY username, id",
+                    (usernames[0], usernames[-1]),
+                ).fetchall()
+            for username, answers in groupby(rows, key=itemgetter(0)):
+                yield username, {question: json.loads(answer) for _, question, answer in answers}
+            last = usernames[-1]
+
+    def _select_list(self, field: str, username: str, archived: bool) -> List[Dict[str, Any]]:
+        """The newest window of a profile list, or every older entry, oldest first."""
+        table, columns, order, to_entry = _PROFILE_LISTS[field]
+        if archived:
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM {table} WHERE username = ? ORDER BY {order}"
+                f" LIMIT MAX((SELECT COUNT(*) FROM {table} WHERE username = ?) - ?, 0)",
+                (username, username, self.window),
+            ).fetchall()
+        else:
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM {table} WHERE username = ? ORDER BY {order} DESC LIMIT ?",
+                (username, self.window),
+            ).fetchall()[::-1]
+        return [to_entry(*row) for row in rows]
+
+    def update_profile(self, username: str, updates: Dict[str, Any]) -> bool:
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT extra FROM users WHERE username = ?", (username,)
+            ).fetchone()
+            if row is None:
+                return False
+            self._apply(username, updates, json.loads(row[0]))
+        self.profile_cache.discard(username)
+        return True
+
+    def add_progress_note(self, username: str, note: Dict[str, Any]) -> bool:
+        with self._transaction():
+            if not self._exists(username):
+                return False
+            self._insert_notes(username, [note])
+        self.profile_cache.discard(username)
+        return True
+
+    def add_session(self, session: Dict[str, Any], summary: Dict[str, Any]) -> None:
+        with self._transaction():
+            self._put_session(session)
+            self._conn.execute(
+                "UPDATE users SET total_sessions = total_sessions + 1 WHERE username = ?",
+                (session["username"],),
+            )
+        self.profile_cache.discard(session["username"])
+
+    def append_messages(self, username: str, session_id: str,
+                        messages: List[Dict[str, Any]]) -> Optional[int]:
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT message_count FROM sessions WHERE username = ? AND session_id = ?",
+                (username, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+
+            saved = row[0]
+            if len(messages) <= saved:
+                return saved
+
+            self._insert_messages(username, session_id, messages[saved:], saved)
+            self._conn.execute(
+                "UPDATE sessions SET message_count = ? WHERE username = ? AND session_id = ?",
+                (len(messages), username, session_id),
+            )
+        self.profile_cache.discard(username)
+        return len(messages)
+
+    def import_profile(self, profile: Dict[str, Any]) -> None:
+        """
+        Create or fully replace a profile, dropping its existing sessions.
+
+        The old rows are deleted and the new ones written in one
+        transaction, so an interrupted import leaves either the previous
+        profile or the complete new one, never a partial user.
+        """
+        username = profile["username"]
+        with self._transaction():
+            for table in ("users", "intake_responses", "goals", "progress_notes",
+                          "sessions", "session_messages"):
+                self._conn.execute(f"DELETE FROM {table} WHERE username = ?", (username,))
+            self._insert_profile(profile)
+        self.profile_cache.discard(username)
+
+    def import_session(self, session: Dict[str, Any]) -> None:
+        """Save a session without counting it (it is already in total_sessions)."""
+        with self._transaction():
+            self._put_session(session)
+        self.profile_cache.discard(session["username"])
+
+    def list_sessions(self, username: str, limit: Optional[int] = None,
+                      before: Optional[str] = None,
+                      therapist: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = ("SELECT session_id, therapist, start_time, message_count"
+                 " FROM sessions WHERE username = ?")
+        params: List[Any] = [username]
+        if before is not None:
+            query += " AND session_id < ?"
+            params.append(before)
+        if therapist is not None:
+            query += " AND therapist = ?"
+            params.append(therapist)
+        query += " ORDER BY session_id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(max(limit, 0))
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {
+                "session_id": session_id,
+                "username": username,
+                "therapist": session_therapist,
+                "start_time": start_time,
+                "message_count": message_count,
+            }
+            for session_id, session_therapist, start_time, message_count in reversed(rows)
+        ]
+
+    def load_session(self, username: str, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT therapist, start_time, message_count FROM sessions"
+                " WHERE username = ? AND session_id = ?", (username, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            messages = [json.loads(message) for (message,) in self._conn.execute(
+                "SELECT message FROM session_messages"
+                " WHERE username = ? AND session_id = ? ORDER BY seq", (username, session_id),
+            )]
+        therapist, start_time, message_count = row
+        return {
+            "session_id": session_id,
+            "username": username,
+            "therapist": therapist,
+            "start_time": start_time,
+            "messages": messages,
+            "message_count": message_count,
+        }
+
+    def get_sessions(self, username: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, therapist, start_time, message_count"
+                " FROM sessions WHERE username = ? ORDER BY session_id", (username,)
+            ).fetchall()
+            transcripts: Dict[str, List[Dict[str, Any]]] = {}
+            for session_id, message in self._conn.execute(
+                "SELECT session_id, message FROM session_messages"
+                " WHERE username = ? ORDER BY session_id, seq", (username,)
+            ):
+                transcripts.setdefault(session_id, []).append(json.loads(message))
+        return [
+            {
+                "session_id": session_id,
+                "username": username,
+                "therapist": therapist,
+                "start_time": start_time,
+                "messages": transcripts.get(session_id, []),
+                "message_count": message_count,
+            }
+            for session_id, therapist, start_time, message_count in rows
+        ]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Run a write transaction, committing on success.
+
+        BEGIN IMMEDIATE takes the database's write lock before the first
+        read, so read-modify-write updates from other processes can't
+        interleave and lose each other's changes.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            yield
+
+    def _exists(self, username: str) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM users WHERE username = ?", (username,)
+        ).fetchone() is not None
+
+    def _insert_profile(self, profile: Dict[str, Any]) -> None:
+        self._conn.execute(
+            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
+            (profile["username"], profile["password_hash"]),
+        )
+        self._apply(profile["username"], profile, {})
+
+    def _apply(self, username: str, updates: Dict[str, Any], extra: Dict[str, Any]) -> None:
+        """Write each updated field to its column, table or the extra blob."""
+        columns = {}
+        extra_changed = False
+        for field, value in updates.items():
+            if field in ("username", "session_history", "archived"):
+                continue  # the key, and views over other tables
+            if field in _USER_COLUMNS:
+                columns[field] = int(bool(value)) if field == "intake_completed" else value
+            elif field == "intake_responses":
+                self._conn.execute("DELETE FROM intake_responses WHERE username = ?", (username,))
+                self._conn.executemany(
+                    "INSERT INTO intake_responses (username, question_id, answer) VALUES (?, ?, ?)",
+                    [(username, str(q), json.dumps(a)) for q, a in (value or {}).items()],
+                )
+            elif field == "therapy_goals":
+                self._conn.execute("DELETE FROM goals WHERE username = ?", (username,))
+                self._conn.executemany(
+                    "INSERT INTO goals (username, goal) VALUES (?, ?)",
+                    [(username, goal) for goal in value or []],
+                )
+            elif field == "progress_notes":
+                # Profiles carry only a window of notes, possibly a stale
+                # one; add the notes that aren't stored yet and leave the
+                # rest alone rather than rewriting the window
+                self._insert_notes(username, self._unsaved_notes(username, value or []))
+            else:
+                extra[field] = value
+                extra_changed = True
+
+        if extra_changed:
+            columns["extra"] = json.dumps(extra)
+        if columns:
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            self._conn.execute(
+                f"UPDATE users SET {assignments} WHERE username = ?",
+                (*columns.values(), username),
+            )
+
+    def _put_session(self, session: Dict[str, Any]) -> None:
+        username, session_id = session["username"], session["session_id"]
+        messages = session.get("messages", [])
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sessions"
+            " (username, session_id, therapist, start_time, message_count)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (username, session_id, session.get("therapist"), session.get("start_time"),
+             len(messages)),
+        )
+        self._conn.execute(
+            "DELETE FROM session_messages WHERE username = ? AND session_id = ?",
+            (username, session_id),
+        )
+        self._insert_messages(username, session_id, messages, 0)
+
+    def _insert_messages(self, username: str, session_id: str,
+                         messages: List[Dict[str, Any]], first_seq: int) -> None:
+        self._conn.executemany(
+            "INSERT INTO session_messages (username, session_id, seq, message) VALUES (?, ?, ?, ?)",
+            [(username, session_id, seq, json.dumps(message))
+             for seq, message in enumerate(messages, first_seq)],
+        )
+
+    def _unsaved_notes(self, username: str,
+                       notes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return the notes with no stored row yet, matched by timestamp and text."""
+        dates = [note.get("date") for note in notes if note.get("date") is not None]
+        stored = Counter(self._conn.execute(
+            "SELECT date, note, therapist FROM progress_notes"
+            " WHERE username = ? AND (date >= ? OR date IS NULL)",
+            (username, min(dates, default="")),
+        ))
+        unsaved = []
+        for note in notes:
+            key = (note.get("date"), note.get("note"), note.get("therapist"))
+            if stored[key]:
+                stored[key] -= 1
+            else:
+                unsaved.append(note)
+        return unsaved
+
+    def _insert_notes(self, username: str, notes: List[Dict[str, Any]]) -> None:
+        self._conn.executemany(
+            "INSERT INTO progress_notes (username, date, note, therapist) VALUES (?, ?, ?, ?)",
+            [(username, n.get("date"), n.get("note"), n.get("therapist")) for n in notes],
+        )
+
+
+BACKENDS = ("json", "sqlite")
+
+
+def open_store(data_dir: Union[str, Path] = "user_data", backend: str = "json",
+               cache_size: int = 256, profile_format: str = "json",
+               window: int = PROFILE_WINDOW) -> UserStore:
+    """
+    Open the store for a data directory.
+
+    Args:
+        data_dir: Root directory for user data
+        backend: "json" (profiles/ and sessions/ trees) or "sqlite" (users.db)
+        cache_size: Profiles kept in the store's in-process cache
+        profile_format: How the json backend writes profiles (see src.serializers)
+        window: Recent session_history / progress_notes entries kept in profiles
+
+    Returns:
+        The opened UserStore
+
+    Raises:
+        ValueError: If backend is not recognised
+    """
+    if backend == "json":
+        return JsonUserStore(data_dir, cache_size, profile_format=profile_format, window=window)
+    if backend == "sqlite":
+        return SQLiteUserStore(Path(data_dir) / "users.db", cache_size, window=window)
+    raise ValueError(f"Unknown storage backend {backend!r}; expected one of {BACKENDS}")
+
+
+@dataclass
+class MigrationReport:
+    """What a migration imported."""
+
+    users: int = 0
+    sessions: int = 0
+
+
+def migrate_json_to_sqlite(data_dir: Union[str, Path] = "user_data",
+                           db_path: Optional[Union[str, Path]] = None) -> MigrationReport:
+    """
+    Import a JSON user-data tree into a SQLite store.
+
+    Profiles that already exist in the database are overwritten with the
+    JSON version, and sessions are replaced by id, so the migration can be
+    re-run safely. Each profile is imported in a single transaction, so an
+    interrupted run never leaves a half-imported user behind. The JSON
+    files are left untouched.
+
+    Args:
+        data_dir: Directory containing profiles/ and sessions/
+        db_path: Database to write (default: <data_dir>/users.db)
+
+    Returns:
+        Counts of imported users and sessions
+    """
+    source = JsonUserStore(data_dir, cache_size=0)
+    target = SQLiteUserStore(db_path or Path(data_dir) / "users.db")
+    report = MigrationReport()
+
+    try:
+        for username in source.iter_usernames():
+            profile = source.get_profile(username)
+            profile.setdefault("username", username)
+            if profile.pop("archived", None):
+                for field in ARCHIVED_FIELDS:
+                    profile[field] = source.load_archive(username, field) + profile.get(field, [])
+            target.import_profile(profile)
+            report.users += 1
+
+        for username in source.iter_session_owners():
+            for session in source.get_sessions(username):
+                session.setdefault("username", username)
+                target.import_session(session)
+                report.sessions += 1
+    finally:
+        target.close()
+
+    return report
+
+
+@dataclass
+class ShardingReport:
+    """What migrate_to_sharded() moved."""
+
+    profiles: int = 0
+    session_dirs: int = 0
+
+
+def migrate_to_sharded(data_dir: Union[str, Path] = "user_data") -> ShardingReport:
+    """
+    Move a flat JSON tree into the sharded layout.
+
+    Entries are renamed one at a time while the directory is streamed, so
+    memory use doesn't grow with the number of users and no file is copied.
+    Profiles and session directories are moved into profiles.sharding/ and
+    sessions.sharding/, which replace the originals once they are empty; an
+    interrupted run can simply be repeated. Run it with the app stopped.
+
+    Args:
+        data_dir: Directory containing profiles/ and sessions/
+
+    Returns:
+        Counts of moved profiles and session directories
+    """
+    data_dir = Path(data_dir)
+    report = ShardingReport()
+    if _read_layout(data_dir) == "sharded":
+        return report
+
+    for name in ("profiles", "sessions"):
+        flat, staging = data_dir / name, data_dir / f"{name}.sharding"
+        staging.mkdir(parents=True, exist_ok=True)
+        if flat.is_dir():
+            with os.scandir(flat) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".tmp"):
+                        os.unlink(entry.path)  # left behind by a crashed write
+                        continue
+                    if name == "profiles":
+                        username = _profile_username(entry.name)
+                        if username is None:
+                            username = entry.name  # not a profile; keep it with the rest
+                        else:
+                            report.profiles += 1
+                    else:
+                        username = entry.name
+                        report.session_dirs += 1
+                    target = staging / shard_path(username) / entry.name
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    os.rename(entry.path, target)
+            flat.rmdir()
+        staging.rename(flat)
+
+    # Flat lock files are only ever held by processes using the flat layout
+    locks = data_dir / "locks"
+    if locks.is_dir():
+        with os.scandir(locks) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    os.unlink(entry.path)
+
+    _write_layout(data_dir, "sharded")
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for storage maintenance."""
+    parser = argparse.ArgumentParser(description="User data storage tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser("migrate", help="Import JSON user data into SQLite")
+    migrate.add_argument("data_dir", nargs="?", default="user_data")
+    migrate.add_argument("--db", default=None, help="Database path (default: <data_dir>/users.db)")
+    shard = commands.add_parser("shard", help="Move a flat JSON tree into the sharded layout")
+    shard.add_argument("data_dir", nargs="?", default="user_data")
+    args = parser.parse_args(argv)
+
+    if args.command == "shard":
+        sharding = migrate_to_sharded(args.data_dir)
+        print(f"Moved {sharding.profiles} profile(s) and "
+              f"{sharding.session_dirs} session directory(ies)")
+        return 0
+
+    report = migrate_json_to_sqlite(args.data_dir, args.db)
+    print(f"Imported {report.users} user(s) and {report.sessions} session(s)")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+"""
+Throttled rendering of streamed chat replies.
+
+Redrawing a Streamlit placeholder re-renders (and re-sends over the
+websocket) the whole reply so far, so redrawing on every streamed token
+costs O(n^2) in the reply length. StreamRenderer collects deltas and only
+redraws when enough time has passed or enough text has arrived since the
+last frame.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List
+
+from src.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+#: Appended to partial replies to show that more is coming
+CURSOR = "▌"
+
+
+@dataclass
+class RenderStats:
+    """What rendering one reply cost."""
+
+    deltas: int = 0
+    chars: int = 0
+    frames: int = 0
+    bytes_pushed: int = 0
+
+
+class StreamRenderer:
+    """
+    Coalesce streamed text deltas into throttled redraws.
+
+    EXAMPLE USAGE:
+    >>> renderer = StreamRenderer(placeholder.markdown)
+    >>> for delta in deltas:
+    ...     renderer.feed(delta)
+    >>> reply = renderer.finish()
+    """
+
+    def __init__(self, render: Callable[[str], Any], interval: float = 0.05,
+                 max_chars: int = 200, cursor: str = CURSOR,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Create a renderer for one reply.
+
+        Args:
+            render: Draws the text so far (e.g. a placeholder's markdown method)
+            interval: Seconds after which pending text is drawn
+            max_chars: Pending characters that trigger a draw regardless of time
+            cursor: Shown after partial replies
+            clock: Monotonic time source
+        """
+        self.render = render
+        self.interval = interval
+        self.max_chars = max_chars
+        self.cursor = cursor
+        self.stats = RenderStats()
+        self._clock = clock
+        self._text = ""
+        self._text_bytes = 0
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._pending_bytes = 0
+        self._cursor_bytes = len(cursor.encode())
+        self._last_frame = clock()
+
+    @property
+    def text(self) -> str:
+        """Everything received so far."""
+        if self._pending:
+            self._collect()
+        return self._text
+
+    def feed(self, delta: str) -> None:
+        """Add a delta, drawing a frame if the time or size budget is used up."""
+        if not delta:
+            return
+        self._pending.append(delta)
+        self._pending_chars += len(delta)
+        self._pending_bytes += len(delta.encode())
+        self.stats.deltas += 1
+        self.stats.chars += len(delta)
+        if (self._pending_chars >= self.max_chars
+                or self._clock() - self._last_frame >= self.interval):
+            self._draw(self.cursor, self._cursor_bytes)
+
+    def finish(self) -> str:
+        """Draw the complete reply without the cursor and return it."""
+        self._draw("", 0)
+        logger.debug("Rendered reply: %d deltas, %d chars in %d frames (%d bytes)",
+                     self.stats.deltas, self.stats.chars, self.stats.frames,
+                     self.stats.bytes_pushed)
+        return self._text
+
+    def _collect(self) -> None:
+        # One join per frame instead of one concatenation per delta
+        self._text = "".join([self._text, *self._pending])
+        self._text_bytes += self._pending_bytes
+        self._pending.clear()
+        self._pending_bytes = 0
+
+    def _draw(self, suffix: str, suffix_bytes: int) -> None:
+        self._collect()
+        self.render(self._text + suffix)
+        self.stats.frames += 1
+        self.stats.bytes_pushed += self._text_bytes + suffix_bytes
+        self._pending_chars = 0
+        self._last_frame = self._clock()
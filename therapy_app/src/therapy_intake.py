@@ -2,81 +2,465 @@
 Therapy Intake Assessment System
 
 Analyzes user responses to recommend the most appropriate therapist.
+
+The questions, their scoring weights and the therapist explanations live in
+a versioned question bank file (intake_bank.json next to this module, or
+the file named by THERAPY_INTAKE_BANK). It is validated once into a
+read-only QuestionBank, and edits to the file are picked up without a
+restart.
 """
 
-from typing import Dict, Tuple
+import heapq
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import islice
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from src.logging_config import get_logger
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+logger = get_logger(__name__)
+
+#: The question bank shipped with the app
+BANK_PATH = Path(__file__).with_name("intake_bank.json")
+
+#: Rendered explanations kept per bank version
+EXPLANATION_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class WeightMatrix:
+    """
+    A question bank's weights compiled to integer rows.
+
+    Therapists get integer ids in the order the bank first mentions them.
+    Each multiple-choice option becomes a dense row of weights indexed by
+    therapist id, so scoring a set of answers is a sum of rows. The ranked
+    result for each distinct selection of options is kept, so the top
+    therapist is picked once per selection; there are at most
+    prod(options + 1) selections, so this never grows past a few thousand.
+    """
+
+    therapists: Tuple[str, ...]
+    #: question id -> one weight row per option
+    rows: Dict[str, Tuple[Tuple[int, ...], ...]]
+    #: question id -> per option, the therapist ids it names, in order
+    named: Dict[str, Tuple[Tuple[int, ...], ...]]
+    _ranked: Dict[Tuple, Tuple[Optional[str], Tuple[Tuple[str, int], ...]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def compile(cls, questions: List[Dict]) -> "WeightMatrix":
+        """Build the matrix for a list of questions shaped like TherapyIntake.QUESTIONS."""
+        ids: Dict[str, int] = {}
+        for question in questions:
+            for option in question.get("options", ()):
+                for therapist in option["weights"]:
+                    ids.setdefault(therapist, len(ids))
+
+        rows = {}
+        named = {}
+        for question in questions:
+            if question["type"] != "multiple_choice":
+                continue
+            question_rows = []
+            question_named = []
+            for option in question["options"]:
+                row = [0] * len(ids)
+                for therapist, weight in option["weights"].items():
+                    row[ids[therapist]] = weight
+                question_rows.append(tuple(row))
+                question_named.append(tuple(ids[t] for t in option["weights"]))
+            rows[question["id"]] = tuple(question_rows)
+            named[question["id"]] = tuple(question_named)
+        return cls(tuple(ids), rows, named)
+
+    def selection(self, responses: Dict) -> Tuple:
+        """The selected option index per question, or None where there is no valid answer."""
+        key = []
+        for question_id, rows in self.rows.items():
+            selected_index = responses.get(question_id)
+            if selected_index is not None and 0 <= selected_index < len(rows):
+                key.append(selected_index)
+            else:
+                key.append(None)
+        return tuple(key)
+
+    def score(self, selection: Tuple) -> Tuple[List[int], List[int]]:
+        """
+        Sum the rows of the selected options.
+
+        Args:
+            selection: As returned by selection()
+
+        Returns:
+            Tuple of (totals indexed by therapist id, ids of the therapists
+            the answers named, in the order they were first named)
+        """
+        selected = []
+        order: Dict[int, None] = {}
+        for (question_id, rows), index in zip(self.rows.items(), selection):
+            if index is not None:
+                selected.append(rows[index])
+                order.update(dict.fromkeys(self.named[question_id][index]))
+        totals = [sum(column) for column in zip(*selected)] or [0] * len(self.therapists)
+        return totals, list(order)
+
+    def rank(self, responses: Dict) -> Tuple[Optional[str], Dict[str, int]]:
+        """
+        Score a set of answers.
+
+        Args:
+            responses: Dictionary of question_id -> selected option index
+
+        Returns:
+            Tuple of (highest-scoring therapist, or None if no answer named
+            one; scores of the therapists named, in the order first named)
+        """
+        key = self.selection(responses)
+        ranked = self._ranked.get(key)
+        if ranked is None:
+            totals, order = self.score(key)
+            best = max(order, key=totals.__getitem__) if order else None
+            ranked = (
+                None if best is None else self.therapists[best],
+                tuple((self.therapists[t], totals[t]) for t in order),
+            )
+            self._ranked[key] = ranked
+        return ranked[0], dict(ranked[1])
+
+    @cached_property
+    def _stacked(self) -> Tuple[Any, Any, Any, Any]:
+        """Every option row in one array, plus an all-zero row for "no answer"."""
+        if np is None:
+            raise ImportError("Batch scoring needs the numpy package (pip install numpy)")
+        width = len(self.therapists)
+        unnamed = len(self.rows) * width  # ranks below this mark therapists the option names
+        weights, ranks, offsets, counts = [], [], [], []
+        for q, (question_id, rows) in enumerate(self.rows.items()):
+            offsets.append(len(weights))
+            counts.append(len(rows))
+            for row, named in zip(rows, self.named[question_id]):
+                rank = [unnamed] * width
+                for position, therapist in enumerate(named):
+                    rank[therapist] = q * width + position
+                weights.append(row)
+                ranks.append(rank)
+        weights.append([0] * width)
+        ranks.append([unnamed] * width)
+        return (np.array(weights, dtype=np.int64).reshape(-1, width),
+                np.array(ranks, dtype=np.int64).reshape(-1, width),
+                np.array(offsets, dtype=np.intp), np.array(counts, dtype=np.intp))
+
+    def score_batch(self, answers: Any) -> Tuple[Any, Any]:
+        """
+        Score many respondents at once with NumPy.
+
+        Ties are broken exactly as rank() breaks them: by which therapist
+        the respondent's answers named first.
+
+        Args:
+            answers: (respondents x questions) integer array of option
+                indexes, columns in the order of `rows`; out-of-range values
+                (e.g. -1) mean the question wasn't answered
+
+        Returns:
+            Tuple of (recommended therapist id per respondent, -1 where no
+            answer named a therapist; (respondents x therapists) scores)
+
+        Raises:
+            ValueError: If answers has the wrong shape
+            ImportError: If numpy isn't installed
+        """
+        weights, ranks, offsets, counts = self._stacked
+        answers = np.asarray(answers, dtype=np.intp)
+        if answers.ndim != 2 or answers.shape[1] != len(self.rows):
+            raise ValueError(f"Expected a (respondents x {len(self.rows)}) array of option "
+                             f"indexes, got shape {answers.shape}")
+        unnamed = len(self.rows) * len(self.therapists)
+        rows = np.where((answers >= 0) & (answers < counts), answers + offsets, len(weights) - 1)
+
+        scores = np.zeros((len(answers), len(self.therapists)), dtype=np.int64)
+        first_named = np.full(scores.shape, unnamed, dtype=np.int64)
+        for column in rows.T:
+            scores += weights[column]
+            np.minimum(first_named, ranks[column], out=first_named)
+
+        named = first_named < unnamed
+        best = np.where(named, scores, np.iinfo(np.int64).min).max(axis=1, keepdims=True)
+        tied = named & (scores == best)
+        recommended = np.where(tied, first_named, unnamed).argmin(axis=1)
+        recommended[~named.any(axis=1)] = -1
+        return recommended, scores
+
+    def responses_array(self, responses: Iterable[Dict]) -> Any:
+        """Turn response dictionaries into the array score_batch() takes."""
+        if np is None:
+            raise ImportError("Batch scoring needs the numpy package (pip install numpy)")
+        return np.array(
+            [[-1 if index is None else index for index in self.selection(r)] for r in responses],
+            dtype=np.intp,
+        ).reshape(-1, len(self.rows))
+
+
+@dataclass(frozen=True)
+class QuestionBank:
+    """
+    A validated, read-only question bank and what is compiled from it.
+
+    Build one with from_dict() or load_question_bank(). Questions are
+    frozen (mappings become read-only views, lists become tuples), so a bank
+    can be shared between threads and sessions without copying. Rendered
+    explanations are cached on the bank, so each version has its own cache
+    (least recently used dropped first).
+    """
+
+    version: int
+    questions: Tuple[Mapping[str, Any], ...]
+    explanations: Mapping[str, str]
+    default_therapist: str
+    matrix: WeightMatrix
+    _rendered: "OrderedDict[Tuple, str]" = field(default_factory=OrderedDict, init=False,
+                                                  repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False,
+                                  compare=False)
+
+    @classmethod
+    def from_dict(cls, data: Any, source: str = "question bank") -> "QuestionBank":
+        """
+        Validate and compile a decoded question bank file.
+
+        Args:
+            data: The decoded file
+            source: Name used in error messages
+
+        Raises:
+            ValueError: If the bank is malformed
+        """
+        def fail(problem: str) -> None:
+            raise ValueError(f"{source}: {problem}")
+
+        if not isinstance(data, dict):
+            fail("expected an object with version, default_therapist, questions and explanations")
+        version = data.get("version")
+        if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+            fail(f"version must be a positive integer, got {version!r}")
+        explanations = data.get("explanations")
+        if not isinstance(explanations, dict) or not all(
+                isinstance(text, str) for text in explanations.values()):
+            fail("explanations must map therapist names to text")
+        if data.get("default_therapist") not in explanations:
+            fail(f"default_therapist {data.get('default_therapist')!r} has no explanation")
+        questions = data.get("questions")
+        if not isinstance(questions, list) or not questions:
+            fail("questions must be a non-empty list")
+
+        seen = set()
+        for number, question in enumerate(questions, 1):
+            where = f"question {number}"
+            if not isinstance(question, dict) or not isinstance(question.get("question"), str):
+                fail(f"{where} needs question text")
+            if not isinstance(question.get("id"), str) or question["id"] in seen:
+                fail(f"{where} needs a unique string id")
+            seen.add(question["id"])
+            if question.get("type") == "text":
+                continue
+            if question.get("type") != "multiple_choice":
+                fail(f"{where} has unknown type {question.get('type')!r}")
+            options = question.get("options")
+            if not isinstance(options, list) or not options:
+                fail(f"{where} needs a non-empty list of options")
+            for option in options:
+                if not (isinstance(option, dict) and isinstance(option.get("text"), str)
+                        and isinstance(option.get("weights"), dict)):
+                    fail(f"{where} has an option without text and weights")
+                for therapist, weight in option["weights"].items():
+                    if not isinstance(weight, int) or isinstance(weight, bool):
+                        fail(f"{where} gives {therapist!r} a non-integer weight {weight!r}")
+                    if therapist not in explanations:
+                        fail(f"{where} weights {therapist!r}, who has no explanation")
+
+        return cls(
+            version=version,
+            questions=_freeze(questions),
+            explanations=_freeze(explanations),
+            default_therapist=data["default_therapist"],
+            matrix=WeightMatrix.compile(questions),
+        )
+
+    def explain(self, therapist_key: str, scores: Dict[str, int]) -> str:
+        """
+        Render the explanation for a recommendation (see
+        TherapyIntake.get_recommendation_explanation); repeated calls with
+        the same arguments return the same cached string.
+        """
+        key = (therapist_key, tuple(scores.items()))
+        with self._lock:
+            explanation = self._rendered.get(key)
+            if explanation is not None:
+                self._rendered.move_to_end(key)
+                return explanation
+
+        explanation = f"Based on your responses, we recommend **{therapist_key}**.\n\n"
+        explanation += self.explanations.get(therapist_key, "")
+
+        # Show top 3 matches
+        if len(scores) > 1:
+            top_scores = heapq.nlargest(3, scores.items(), key=lambda x: x[1])
+            explanation += "\n\n**Your top matches:**\n"
+            for i, (therapist, score) in enumerate(top_scores, 1):
+                explanation += f"{i}. {therapist} (Match score: {score})\n"
+
+        with self._lock:
+            self._rendered[key] = explanation
+            while len(self._rendered) > EXPLANATION_CACHE_SIZE:
+                self._rendered.popitem(last=False)
+        return explanation
+
+    def analyze_batch(self, answers: Any) -> Tuple[Any, Any]:
+        """WeightMatrix.score_batch(), with the default therapist for respondents it can't place."""
+        recommended, scores = self.matrix.score_batch(answers)
+        if self.default_therapist in self.matrix.therapists:
+            recommended[recommended < 0] = self.matrix.therapists.index(self.default_therapist)
+        return recommended, scores
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of decoded JSON: dicts become mapping views, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def load_question_bank(path: Union[str, Path]) -> QuestionBank:
+    """
+    Read and validate a question bank file.
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If it isn't valid JSON or isn't a valid bank
+    """
+    with open(path, 'rb') as f:
+        data = json.loads(f.read())
+    return QuestionBank.from_dict(data, source=str(path))
+
+
+class QuestionBankFile:
+    """
+    A question bank file, reloaded when it changes.
+
+    current() checks the file at most every `check_interval` seconds. A
+    changed file is loaded and validated completely before it replaces the
+    current bank, in a single assignment, so callers see either the old
+    version or the new one. A file that fails validation is logged and the
+    previous version stays in use until the file changes again.
+    """
+
+    def __init__(self, path: Union[str, Path], check_interval: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Load the bank.
+
+        Args:
+            path: Question bank JSON file
+            check_interval: Seconds between checks for changes
+            clock: Monotonic time source
+
+        Raises:
+            OSError: If the file can't be read
+            ValueError: If the file isn't a valid bank
+        """
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._file_key = _file_key(os.stat(self.path))
+        self._bank = load_question_bank(self.path)
+        self._checked = clock()
+
+    def current(self) -> QuestionBank:
+        """The newest valid version of the bank."""
+        if self._clock() - self._checked >= self.check_interval:
+            self._reload_if_changed()
+        return self._bank
+
+    def _reload_if_changed(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            return  # another thread is already checking; serve the current version
+        try:
+            self._checked = self._clock()
+            try:
+                key = _file_key(os.stat(self.path))
+                if key == self._file_key:
+                    return
+                self._file_key = key
+                bank = load_question_bank(self.path)
+            except (OSError, ValueError) as e:
+                logger.warning("Keeping question bank version %s: %s", self._bank.version, e)
+                return
+            self._bank = bank
+            logger.info("Loaded question bank version %s from %s", bank.version, self.path)
+        finally:
+            self._lock.release()
+
+
+def _file_key(stat: os.stat_result) -> Tuple[int, int, int]:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class _CurrentQuestions:
+    """Class attribute that reads as the current bank's questions."""
+
+    def __get__(self, instance: Any, owner: type) -> Tuple[Mapping[str, Any], ...]:
+        return owner.bank().questions
 
 
 class TherapyIntake:
     """Handles intake assessment and therapist recommendation."""
     
+    #: Where the question bank is loaded from (reloaded when the file
+    #: changes); opened on first use so importing the module reads nothing
+    bank_file: Optional[QuestionBankFile] = None
+    _bank_file_lock = threading.Lock()
+    
     # Intake questions with scoring weights for each therapist
-    QUESTIONS = [
-        {
-            "id": "primary_concern",
-            "question": "What brings you to therapy today?",
-            "type": "multiple_choice",
-            "options": [
-                {"text": "Anxiety, worry, or racing thoughts", "weights": {"Sourdough (Cognitive Behavioral Therapy)": 3, "Naan (Mindfulness-Based Therapy)": 2}},
-                {"text": "Depression or feeling stuck", "weights": {"Brioche (Psychodynamic Therapy)": 2, "Ciabatta (Person-Centered Therapy)": 2}},
-                {"text": "Relationship or communication issues", "weights": {"Pumpernickel (Dialectical Behavior Therapy)": 3, "Ciabatta (Person-Centered Therapy)": 2}},
-                {"text": "Life transitions or finding purpose", "weights": {"Rye (Existential Therapy)": 3, "Focaccia (Solution-Focused Brief Therapy)": 2}},
-                {"text": "Emotional regulation difficulties", "weights": {"Pumpernickel (Dialectical Behavior Therapy)": 3, "Whole Wheat (Acceptance and Commitment Therapy)": 2}},
-                {"text": "Trauma or past experiences affecting me", "weights": {"Brioche (Psychodynamic Therapy)": 3}},
-                {"text": "Stress management and mindfulness", "weights": {"Naan (Mindfulness-Based Therapy)": 3, "Whole Wheat (Acceptance and Commitment Therapy)": 2}},
-                {"text": "Specific problem I want to solve quickly", "weights": {"Focaccia (Solution-Focused Brief Therapy)": 3, "Sourdough (Cognitive Behavioral Therapy)": 2}}
-            ]
-        },
-        {
-            "id": "therapy_preference",
-            "question": "What approach appeals to you most?",
-            "type": "multiple_choice",
-            "options": [
-                {"text": "Practical tools and strategies", "weights": {"Sourdough (Cognitive Behavioral Therapy)": 3, "Pumpernickel (Dialectical Behavior Therapy)": 2}},
-                {"text": "Understanding my past and unconscious patterns", "weights": {"Brioche (Psychodynamic Therapy)": 3}},
-                {"text": "Accepting myself and living according to my values", "weights": {"Whole Wheat (Acceptance and Commitment Therapy)": 3}},
-                {"text": "Being heard and understood without judgment", "weights": {"Ciabatta (Person-Centered Therapy)": 3}},
-                {"text": "Finding solutions and focusing on the future", "weights": {"Focaccia (Solution-Focused Brief Therapy)": 3}},
-                {"text": "Exploring meaning and authenticity", "weights": {"Rye (Existential Therapy)": 3}},
-                {"text": "Mindfulness and present-moment awareness", "weights": {"Naan (Mindfulness-Based Therapy)": 3}}
-            ]
-        },
-        {
-            "id": "emotional_style",
-            "question": "How would you describe your emotional experience?",
-            "type": "multiple_choice",
-            "options": [
-                {"text": "Intense emotions that feel overwhelming", "weights": {"Pumpernickel (Dialectical Behavior Therapy)": 3, "Naan (Mindfulness-Based Therapy)": 2}},
-                {"text": "Stuck in negative thought patterns", "weights": {"Sourdough (Cognitive Behavioral Therapy)": 3}},
-                {"text": "Disconnected from my feelings", "weights": {"Brioche (Psychodynamic Therapy)": 2, "Naan (Mindfulness-Based Therapy)": 2}},
-                {"text": "Avoiding difficult emotions", "weights": {"Whole Wheat (Acceptance and Commitment Therapy)": 3}},
-                {"text": "Generally balanced, just need direction", "weights": {"Focaccia (Solution-Focused Brief Therapy)": 2, "Ciabatta (Person-Centered Therapy)": 2}}
-            ]
-        },
-        {
-            "id": "timeline",
-            "question": "What's your therapy timeline preference?",
-            "type": "multiple_choice",
-            "options": [
-                {"text": "Short-term, focused on specific goals", "weights": {"Focaccia (Solution-Focused Brief Therapy)": 3, "Sourdough (Cognitive Behavioral Therapy)": 2}},
-                {"text": "Medium-term, learning new skills", "weights": {"Pumpernickel (Dialectical Behavior Therapy)": 2, "Whole Wheat (Acceptance and Commitment Therapy)": 2}},
-                {"text": "Long-term, deep exploration", "weights": {"Brioche (Psychodynamic Therapy)": 3, "Rye (Existential Therapy)": 2}},
-                {"text": "Flexible, whatever it takes", "weights": {"Ciabatta (Person-Centered Therapy)": 2, "Naan (Mindfulness-Based Therapy)": 2}}
-            ]
-        },
-        {
-            "id": "goals",
-            "question": "What are you hoping to achieve?",
-            "type": "text",
-            "instruction": "Describe your therapy goals in 1-2 sentences"
-        }
-    ]
+    QUESTIONS = _CurrentQuestions()
+    
+    @staticmethod
+    def bank() -> QuestionBank:
+        """The question bank currently loaded."""
+        if TherapyIntake.bank_file is None:
+            with TherapyIntake._bank_file_lock:
+                if TherapyIntake.bank_file is None:
+                    path = os.getenv("THERAPY_INTAKE_BANK", str(BANK_PATH))
+                    TherapyIntake.bank_file = QuestionBankFile(path)
+        return TherapyIntake.bank_file.current()
     
     @staticmethod
-    def get_questions() -> list:
-        """Return all intake questions."""
+    def get_questions() -> Tuple[Mapping[str, Any], ...]:
+        """Return all intake questions (read-only)."""
         return TherapyIntake.QUESTIONS
     
+    @staticmethod
+    def weight_matrix() -> WeightMatrix:
+        """The current questions compiled for scoring."""
+        return TherapyIntake.bank().matrix
+    
     @staticmethod
     def analyze_responses(responses: Dict) -> Tuple[str, Dict[str, int]]:
         """
@@ -86,29 +470,60 @@ class TherapyIntake:
             responses: Dictionary of question_id -> selected option index
             
         Returns:
-            Tuple of (recommended_therapist_key, scores_dict)
+            Tuple of (recommended_therapist_key, scores_dict). scores_dict
+            lists therapists in the order the answers first named them, and
+            ties go to the earliest.
         """
-        scores = {}
-        
-        # Process multiple choice questions
-        for question in TherapyIntake.QUESTIONS:
-            if question["type"] == "multiple_choice":
-                question_id = question["id"]
-                if question_id in responses:
-                    selected_index = responses[question_id]
-                    if 0 <= selected_index < len(question["options"]):
-                        weights = question["options"][selected_index]["weights"]
-                        for therapist, weight in weights.items():
-                            scores[therapist] = scores.get(therapist, 0) + weight
+        bank = TherapyIntake.bank()
+        recommended_therapist, scores = bank.matrix.rank(responses)
         
-        # Find therapist with highest score
-        if not scores:
+        if recommended_therapist is None:
             # Default to Person-Centered if no clear preference
-            return "Ciabatta (Person-Centered Therapy)", scores
+            return bank.default_therapist, scores
         
-        recommended_therapist = max(scores, key=scores.get)
         return recommended_therapist, scores
     
+    @staticmethod
+    def analyze_batch(responses_array: Any) -> Tuple[Any, Any]:
+        """
+        Score a whole cohort in one NumPy pass.
+        
+        Args:
+            responses_array: (respondents x questions) integer array of
+                selected option indexes, one column per multiple-choice
+                question in QUESTIONS order; -1 marks an unanswered question
+                (see weight_matrix().responses_array())
+            
+        Returns:
+            Tuple of (recommended therapist ids, (respondents x therapists)
+            score matrix); ids index weight_matrix().therapists and match
+            what analyze_responses() recommends for each respondent
+        """
+        return TherapyIntake.bank().analyze_batch(responses_array)
+    
+    @staticmethod
+    def analyze_stored(user_manager: Any,
+                       chunk_size: int = 10000) -> Iterator[Tuple[List[str], Any, Any]]:
+        """
+        Re-score every stored intake, streaming users out of storage in chunks.
+        
+        Args:
+            user_manager: UserManager whose users are scored
+            chunk_size: Respondents scored per NumPy pass
+            
+        Yields:
+            (usernames, recommended therapist ids, score matrix) per chunk
+        """
+        bank = TherapyIntake.bank()  # one version for the whole run
+        stored = user_manager.iter_intake_responses()
+        while True:
+            chunk = list(islice(stored, chunk_size))
+            if not chunk:
+                return
+            usernames = [username for username, _ in chunk]
+            answers = bank.matrix.responses_array(responses for _, responses in chunk)
+            yield (usernames, *bank.analyze_batch(answers))
+    
     @staticmethod
     def get_recommendation_explanation(therapist_key: str, scores: Dict[str, int]) -> str:
         """
@@ -121,49 +536,4 @@ class TherapyIntake:
         Returns:
             Explanation text
         """
-        therapist_explanations = {
-            "Sourdough (Cognitive Behavioral Therapy)": 
-                "Dr. Sourdough specializes in CBT, which is excellent for addressing thought patterns, "
-                "anxiety, and developing practical coping strategies. This structured approach helps you "
-                "identify and challenge unhelpful thoughts.",
-            
-            "Brioche (Psychodynamic Therapy)":
-                "Dr. Brioche offers psychodynamic therapy to help you explore how past experiences and "
-                "unconscious patterns influence your present. This deeper exploration can provide lasting insight.",
-            
-            "Whole Wheat (Acceptance and Commitment Therapy)":
-                "Dr. Whole Wheat practices ACT, helping you accept difficult emotions while committing to "
-                "actions aligned with your values. This approach promotes psychological flexibility.",
-            
-            "Pumpernickel (Dialectical Behavior Therapy)":
-                "Dr. Pumpernickel specializes in DBT, offering skills training in mindfulness, distress tolerance, "
-                "and emotion regulation. This is particularly helpful for intense emotions and relationship challenges.",
-            
-            "Ciabatta (Person-Centered Therapy)":
-                "Dr. Ciabatta provides person-centered therapy with unconditional positive regard, creating a "
-                "safe space for self-discovery and growth. You lead the session direction.",
-            
-            "Focaccia (Solution-Focused Brief Therapy)":
-                "Dr. Focaccia uses solution-focused therapy to help you identify what's already working and "
-                "build on your strengths. This forward-looking approach is efficient and goal-oriented.",
-            
-            "Rye (Existential Therapy)":
-                "Dr. Rye offers existential therapy to explore questions of meaning, freedom, and authenticity. "
-                "This philosophical approach helps you confront life's fundamental concerns.",
-            
-            "Naan (Mindfulness-Based Therapy)":
-                "Dr. Naan teaches mindfulness-based therapy, cultivating present-moment awareness and "
-                "self-compassion. This approach reduces reactivity and promotes inner peace."
-        }
-        
-        explanation = f"Based on your responses, we recommend **{therapist_key}**.\n\n"
-        explanation += therapist_explanations.get(therapist_key, "")
-        
-        # Show top 3 matches
-        if len(scores) > 1:
-            sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-            explanation += "\n\n**Your top matches:**\n"
-            for i, (therapist, score) in enumerate(sorted_scores[:3], 1):
-                explanation += f"{i}. {therapist} (Match score: {score})\n"
-        
-        return explanation
+        return TherapyIntake.bank().explain(therapist_key, scores)
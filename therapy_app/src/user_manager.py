@@ -4,39 +4,66 @@ User Management System for The Bread Therapist Collective
 Handles user authentication, profile management, and session tracking.
 """
 
-import json
-import hashlib
+import atexit
 import os
+import threading
+import time
+import uuid
+import weakref
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterator, List, Tuple
+
+from src.passwords import PasswordHasher
+from src.storage import UserStore, open_store
 
 
 class UserManager:
     """Manages user profiles, authentication, and session data."""
     
-    def __init__(self, data_dir: str = "user_data"):
-        self.data_dir = Path(data_dir)
-        self.profiles_dir = self.data_dir / "profiles"
-        self.sessions_dir = self.data_dir / "sessions"
+    def __init__(self, data_dir: str = "user_data", storage: Optional[UserStore] = None,
+                 hasher: Optional[PasswordHasher] = None, login_flush_interval: float = 0.0):
+        """
+        Initialize the user manager.
         
-        # Ensure directories exist
-        self.profiles_dir.mkdir(parents=True, exist_ok=True)
-        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        Args:
+            data_dir: Root directory for user data
+            storage: Storage backend to use. If None, one is opened for
+                data_dir using the USER_STORAGE_BACKEND environment
+                variable ("json" by default, or "sqlite"). Its profile
+                cache holds USER_PROFILE_CACHE_SIZE profiles (default 256),
+                and the json backend writes profiles in USER_PROFILE_FORMAT
+                ("json" by default; see src.serializers for the others).
+                Profiles keep the newest USER_PROFILE_WINDOW (default 50)
+                session_history and progress_notes entries in full.
+            hasher: Password hasher to use. If None, one writing the
+                USER_PASSWORD_SCHEME format ("sha256" by default, or
+                "pbkdf2_sha256") is created.
+            login_flush_interval: Seconds last_login updates are held and
+                coalesced before being written (default 0: written at
+                once). Held updates live only in memory: they are written
+                by the next login after the interval, by flush_logins() or
+                at interpreter exit, and are lost if the process is killed
+                (e.g. SIGKILL) before then.
+        """
+        self.data_dir = Path(data_dir)
+        self.storage = storage or open_store(
+            self.data_dir,
+            os.getenv("USER_STORAGE_BACKEND", "json"),
+            int(os.getenv("USER_PROFILE_CACHE_SIZE", "256")),
+            os.getenv("USER_PROFILE_FORMAT", "json"),
+            int(os.getenv("USER_PROFILE_WINDOW", "50")),
+        )
+        self.hasher = hasher or PasswordHasher(os.getenv("USER_PASSWORD_SCHEME", "sha256"))
+        self.login_flush_interval = login_flush_interval
+        self._pending_logins: Dict[str, str] = {}
+        self._logins_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        atexit.register(_flush_pending_logins, weakref.ref(self))
     
     def _hash_password(self, password: str) -> str:
-        """Hash password using SHA-256."""
-        return hashlib.sha256(password.encode()).hexdigest()
-    
-    def _get_profile_path(self, username: str) -> Path:
-        """Get path to user profile file."""
-        return self.profiles_dir / f"{username}.json"
-    
-    def _get_session_path(self, username: str) -> Path:
-        """Get path to user session directory."""
-        user_session_dir = self.sessions_dir / username
-        user_session_dir.mkdir(exist_ok=True)
-        return user_session_dir
+        """Hash password on the hasher's pool, blocking until it is done (SHA-256 by default)."""
+        return self.hasher.hash(password)
     
     def create_user(self, username: str, password: str, initial_data: Dict = None) -> bool:
         """
@@ -50,11 +77,6 @@ class UserManager:
         Returns:
             True if user created successfully, False if user already exists
         """
-        profile_path = self._get_profile_path(username)
-        
-        if profile_path.exists():
-            return False
-        
         profile = {
             "username": username,
             "password_hash": self._hash_password(password),
@@ -71,15 +93,18 @@ class UserManager:
             **(initial_data or {})
         }
         
-        with open(profile_path, 'w') as f:
-            json.dump(profile, f, indent=2)
-        
-        return True
+        return self.storage.create_profile(profile)
     
     def authenticate(self, username: str, password: str) -> bool:
         """
         Authenticate a user.
         
+        The password is checked on the hasher's pool (this call blocks
+        until it is done), and hashes in an older scheme are upgraded.
+        last_login is written at once, or, with a login_flush_interval,
+        held in memory and written with other logins by flush_logins()
+        (see __init__ for what a crash loses).
+        
         Args:
             username: Username
             password: Password to verify
@@ -87,34 +112,56 @@ class UserManager:
         Returns:
             True if authentication successful, False otherwise
         """
-        profile_path = self._get_profile_path(username)
+        profile = self.storage.get_profile(username)
         
-        if not profile_path.exists():
+        if profile is None:
             return False
         
-        with open(profile_path, 'r') as f:
-            profile = json.load(f)
+        stored = profile['password_hash']
         
-        password_hash = self._hash_password(password)
+        if not self.hasher.verify(password, stored):
+            return False
         
-        if profile['password_hash'] == password_hash:
-            # Update last login
-            profile['last_login'] = datetime.now().isoformat()
-            with open(profile_path, 'w') as f:
-                json.dump(profile, f, indent=2)
-            return True
+        if self.hasher.needs_rehash(stored):
+            self.storage.update_profile(username, {'password_hash': self._hash_password(password)})
         
-        return False
+        with self._logins_lock:
+            self._pending_logins[username] = datetime.now().isoformat()
+            due = time.monotonic() - self._last_flush >= self.login_flush_interval
+        if due:
+            self.flush_logins()
+        return True
     
-    def get_user_profile(self, username: str) -> Optional[Dict]:
-        """Get user profile data."""
-        profile_path = self._get_profile_path(username)
-        
-        if not profile_path.exists():
-            return None
+    def flush_logins(self) -> int:
+        """
+        Write held last_login updates to storage.
         
-        with open(profile_path, 'r') as f:
-            return json.load(f)
+        Returns:
+            Number of users updated
+        """
+        with self._logins_lock:
+            pending, self._pending_logins = self._pending_logins, {}
+            self._last_flush = time.monotonic()
+        for username, last_login in pending.items():
+            self.storage.update_profile(username, {'last_login': last_login})
+        return len(pending)
+    
+    def get_user_profile(self, username: str) -> Optional[Dict]:
+        """Get user profile data, including a last_login not yet flushed."""
+        profile = self.storage.get_profile(username)
+        if profile is not None:
+            with self._logins_lock:
+                last_login = self._pending_logins.get(username)
+            if last_login is not None:
+                profile['last_login'] = last_login
+        return profile
+    
+    def iter_intake_responses(self) -> Iterator[Tuple[str, Dict]]:
+        """
+        Stream (username, intake_responses) for every user who has answered
+        the intake, without filling the profile cache.
+        """
+        return self.storage.iter_intake_responses()
     
     def update_user_profile(self, username: str, updates: Dict) -> bool:
         """
@@ -127,20 +174,7 @@ class UserManager:
         Returns:
             True if successful, False if user doesn't exist
         """
-        profile_path = self._get_profile_path(username)
-        
-        if not profile_path.exists():
-            return False
-        
-        with open(profile_path, 'r') as f:
-            profile = json.load(f)
-        
-        profile.update(updates)
-        
-        with open(profile_path, 'w') as f:
-            json.dump(profile, f, indent=2)
-        
-        return True
+        return self.storage.update_profile(username, updates)
     
     def save_intake_assessment(self, username: str, responses: Dict, recommended_therapist: str) -> bool:
         """Save intake assessment responses and therapist recommendation."""
@@ -151,21 +185,30 @@ class UserManager:
             "intake_date": datetime.now().isoformat()
         })
     
-    def log_session(self, username: str, therapist: str, messages: List[Dict]) -> str:
+    def log_session(self, username: str, therapist: str, messages: List[Dict],
+                    session_id: Optional[str] = None) -> str:
         """
         Log a therapy session.
         
+        Pass the session_id returned by the first call to checkpoint the
+        same conversation again later: only the messages added since the
+        previous checkpoint are written, and the session is counted once.
+        
         Args:
             username: Username
             therapist: Therapist name
-            messages: List of message dictionaries
+            messages: List of message dictionaries (the whole transcript so far)
+            session_id: Session to checkpoint; None starts a new session
+                (an ID from new_session_id() not saved yet also starts one)
             
         Returns:
             Session ID (timestamp-based filename)
         """
-        session_dir = self._get_session_path(username)
-        session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        session_file = session_dir / f"session_{session_id}.json"
+        if session_id is not None:
+            if self.storage.append_messages(username, session_id, messages) is not None:
+                return session_id
+        else:
+            session_id = self.new_session_id()
         
         session_data = {
             "session_id": session_id,
@@ -176,49 +219,81 @@ class UserManager:
             "message_count": len(messages)
         }
         
-        with open(session_file, 'w') as f:
-            json.dump(session_data, f, indent=2)
-        
-        # Update user profile
-        profile = self.get_user_profile(username)
-        if profile:
-            profile['total_sessions'] = profile.get('total_sessions', 0) + 1
-            profile['session_history'].append({
-                "session_id": session_id,
-                "therapist": therapist,
-                "date": datetime.now().isoformat(),
-                "message_count": len(messages)
-            })
-            self.update_user_profile(username, profile)
+        # Save the transcript and count it on the user's profile
+        self.storage.add_session(session_data, {
+            "session_id": session_id,
+            "therapist": therapist,
+            "date": datetime.now().isoformat(),
+            "message_count": len(messages)
+        })
         
         return session_id
     
-    def get_session_history(self, username: str) -> List[Dict]:
-        """Get all sessions for a user."""
-        session_dir = self._get_session_path(username)
-        sessions = []
+    def new_session_id(self) -> str:
+        """
+        ID for a session not saved yet.
+        
+        log_session() creates the session under this ID on its first call,
+        so the ID can be handed out before anything is written. IDs start
+        with the local start time down to the microsecond, so they sort
+        chronologically for get_session_history(before=...); a random
+        suffix keeps sessions started at the same instant apart.
+        """
+        return f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}"
+    
+    def get_session_history(self, username: str, limit: Optional[int] = None,
+                            before: Optional[str] = None,
+                            therapist: Optional[str] = None) -> List[Dict]:
+        """
+        Get summaries of a user's sessions, oldest first.
+        
+        Only the session index is read; use load_session() for a transcript.
+        
+        Args:
+            username: Username
+            limit: Return at most this many of the most recent sessions
+            before: Only sessions older than this session ID (for paging back)
+            therapist: Only sessions with this therapist
+            
+        Returns:
+            Dicts with session_id, username, therapist, start_time and message_count
+        """
+        return self.storage.list_sessions(username, limit, before, therapist)
+    
+    def load_session(self, username: str, session_id: str) -> Optional[Dict]:
+        """Load one session with its messages, or None if it doesn't exist."""
+        return self.storage.load_session(username, session_id)
+    
+    def load_archive(self, username: str, field: str) -> List[Dict]:
+        """
+        Load the older entries rolled out of a profile list, oldest first.
         
-        for session_file in sorted(session_dir.glob("session_*.json")):
-            with open(session_file, 'r') as f:
-                sessions.append(json.load(f))
+        Profiles keep only recent session_history and progress_notes;
+        profile["archived"] says how many older entries there are.
         
-        return sessions
+        Args:
+            username: Username
+            field: "session_history" or "progress_notes"
+        """
+        return self.storage.load_archive(username, field)
     
     def add_progress_note(self, username: str, note: str, therapist: str = None) -> bool:
         """Add a progress note to user profile."""
-        profile = self.get_user_profile(username)
-        if not profile:
-            return False
-        
         progress_note = {
             "date": datetime.now().isoformat(),
             "note": note,
             "therapist": therapist
         }
         
-        profile['progress_notes'].append(progress_note)
-        return self.update_user_profile(username, {"progress_notes": profile['progress_notes']})
+        return self.storage.add_progress_note(username, progress_note)
     
     def set_therapy_goals(self, username: str, goals: List[str]) -> bool:
         """Set therapy goals for a user."""
         return self.update_user_profile(username, {"therapy_goals": goals})
+
+
+def _flush_pending_logins(ref: "weakref.ref[UserManager]") -> None:
+    """Write a manager's held logins at interpreter exit, if it is still alive."""
+    manager = ref()
+    if manager is not None:
+        manager.flush_logins()
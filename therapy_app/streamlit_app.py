@@ -5,21 +5,44 @@ Professional therapy through the lens of bread with personalized user experience
 intake assessments, therapist recommendations, and session progression tracking.
 """
 
-import os
 import streamlit as st
-from openai import OpenAI
 from dotenv import load_dotenv
-from src.user_manager import UserManager
+from src.app_resources import (
+    create_chat_client, create_context_window, create_history_view, create_session_writer,
+    create_token_counter, create_user_manager
+)
 from src.therapy_intake import TherapyIntake
+from src.stream_renderer import StreamRenderer
 
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-# Initialize user manager
-user_manager = UserManager()
+# Streamlit reruns this script on every interaction; build the client (and
+# its connection pool) and the user manager once per server process.
+@st.cache_resource
+def get_chat_client():
+    return create_chat_client()
+
+
+@st.cache_resource
+def get_user_manager():
+    return create_user_manager()
+
+
+@st.cache_resource
+def get_session_writer():
+    return create_session_writer(get_user_manager())
+
+
+@st.cache_resource
+def get_token_counter(model):
+    return create_token_counter(model)
+
+
+client = get_chat_client()
+user_manager = get_user_manager()
+session_writer = get_session_writer()
 
 # Available models
 MODELS = [
@@ -625,6 +648,10 @@ st.markdown("""
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# Id of the saved session the current chat is checkpointed into (None = not saved yet)
+if "session_id" not in st.session_state:
+    st.session_state.session_id = None
+
 if "selected_model" not in st.session_state:
     st.session_state.selected_model = "gpt-4o-mini"
 
@@ -634,6 +661,16 @@ if "selected_therapist" not in st.session_state:
 if "system_message" not in st.session_state:
     st.session_state.system_message = ""
 
+# Bounds the prompt sent per turn (recent messages + a rolling summary)
+if "context_window" not in st.session_state:
+    st.session_state.context_window = create_context_window(
+        client, get_token_counter(st.session_state.selected_model)
+    )
+
+# Draws only the newest page of messages on each rerun
+if "history_view" not in st.session_state:
+    st.session_state.history_view = create_history_view()
+
 if "show_settings" not in st.session_state:
     st.session_state.show_settings = False
 
@@ -858,6 +895,7 @@ with st.sidebar:
         if st.button("🔄 Change Therapist", use_container_width=True, key="sidebar_change_therapist"):
             st.session_state.selected_therapist = None
             st.session_state.messages = []
+            st.session_state.session_id = None
             st.rerun()
 
 # Main container
@@ -888,6 +926,7 @@ if st.session_state.selected_therapist is None:
                         st.session_state.selected_therapist = key
                         st.session_state.system_message = therapist["system_message"]
                         st.session_state.messages = []  # Clear messages when changing therapist
+                        st.session_state.session_id = None
                         st.rerun()
 
 else:
@@ -902,11 +941,17 @@ else:
 
     with col1:
         st.markdown(f"**Model:** `{st.session_state.selected_model}` | **Messages:** {len(st.session_state.messages)}")
+        context_stats = st.session_state.context_window.last_stats
+        if context_stats.full_tokens:
+            st.caption(f"Last prompt: {context_stats.prompt_tokens} tokens "
+                       f"({context_stats.saved_tokens} saved by summarizing "
+                       f"{context_stats.summarized_messages} earlier messages)")
 
     with col2:
         if st.button("🔄 Change Therapist", use_container_width=True, key="change_therapist_btn"):
             st.session_state.selected_therapist = None
             st.session_state.messages = []
+            st.session_state.session_id = None
             st.rerun()
 
     with col3:
@@ -948,9 +993,14 @@ else:
         </div>
         """.format(current_therapist['name']), unsafe_allow_html=True)
     else:
-        for message in st.session_state.messages:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
+        history_view = st.session_state.history_view
+        hidden, visible = history_view.visible(st.session_state.messages)
+        if hidden:
+            st.button(f"⬆️ Load earlier messages ({hidden} more)", key="load_earlier_btn",
+                      on_click=history_view.load_earlier)
+        for role, content in visible:
+            with st.chat_message(role):
+                st.markdown(content)
 
 st.markdown('</div>', unsafe_allow_html=True)
 
@@ -967,12 +1017,16 @@ if st.session_state.selected_therapist is not None:
         # Generate AI response
         with st.chat_message("assistant"):
             message_placeholder = st.empty()
+            renderer = StreamRenderer(message_placeholder.markdown)
             full_response = ""
 
             try:
-                # Prepare messages with system message
-                messages = [{"role": "system", "content": st.session_state.system_message}]
-                messages.extend(st.session_state.messages)
+                # System message, summary of older turns, recent messages
+                context_window = st.session_state.context_window
+                context_window.counter = get_token_counter(st.session_state.selected_model)
+                messages = context_window.build(
+                    st.session_state.system_message, st.session_state.messages
+                )
 
                 # Stream the response
                 stream = client.chat.completions.create(
@@ -981,12 +1035,12 @@ if st.session_state.selected_therapist is not None:
                     stream=True,
                 )
 
+                # Redraw at most every 50 ms or 200 characters
                 for chunk in stream:
                     if chunk.choices[0].delta.content is not None:
-                        full_response += chunk.choices[0].delta.content
-                        message_placeholder.markdown(full_response + "▌")
+                        renderer.feed(chunk.choices[0].delta.content)
 
-                message_placeholder.markdown(full_response)
+                full_response = renderer.finish()
 
             except Exception as e:
                 error_message = f"❌ Error: {str(e)}"
@@ -996,13 +1050,14 @@ if st.session_state.selected_therapist is not None:
         # Add assistant response to chat history
         st.session_state.messages.append({"role": "assistant", "content": full_response})
 
-        # Auto-save session after each exchange
-        if len(st.session_state.messages) % 4 == 0:  # Save every 2 exchanges
-            user_manager.log_session(
-                st.session_state.username,
-                st.session_state.selected_therapist,
-                st.session_state.messages
-            )
+        # Auto-save session after each exchange, in the background; quick
+        # exchanges are coalesced and only new messages are written
+        st.session_state.session_id = session_writer.save(
+            st.session_state.username,
+            st.session_state.selected_therapist,
+            st.session_state.messages,
+            session_id=st.session_state.session_id
+        )
 
 # Footer with session info and logout
 if st.session_state.authenticated:
@@ -1017,28 +1072,36 @@ if st.session_state.authenticated:
     with col_footer2:
         if st.button("💾 Save Session", use_container_width=True):
             if st.session_state.messages:
-                session_id = user_manager.log_session(
+                session_id = session_writer.save(
                     st.session_state.username,
                     st.session_state.selected_therapist,
-                    st.session_state.messages
+                    st.session_state.messages,
+                    session_id=st.session_state.session_id
                 )
-                st.success(f"Session saved! (ID: {session_id})")
+                st.session_state.session_id = session_id
+                if session_writer.flush(st.session_state.username, timeout=5.0):
+                    st.success(f"Session saved! (ID: {session_id})")
+                else:
+                    st.warning(f"Session {session_id} is still being saved.")
                 st.session_state.user_profile = user_manager.get_user_profile(st.session_state.username)
 
     with col_footer3:
         if st.button("🚪 Logout", use_container_width=True):
-            # Save session before logout
+            # Save session before logout, and wait for pending saves
             if st.session_state.messages:
-                user_manager.log_session(
+                session_writer.save(
                     st.session_state.username,
                     st.session_state.selected_therapist,
-                    st.session_state.messages
+                    st.session_state.messages,
+                    session_id=st.session_state.session_id
                 )
+            session_writer.flush(st.session_state.username, timeout=5.0)
 
             # Clear session state
             st.session_state.authenticated = False
             st.session_state.username = None
             st.session_state.user_profile = None
             st.session_state.messages = []
+            st.session_state.session_id = None
             st.session_state.selected_therapist = None
             st.rerun()
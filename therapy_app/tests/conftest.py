@@ -21,8 +21,8 @@ load_dotenv()
 
 @pytest.fixture
 def fixtures_dir() -> Path:
-    """Return the path to the test fixtures directory."""
-    return Path(__file__).parent / "fixtures"
+    """Return the directory of recorded API responses (shared with src.fake_server)."""
+    return Path(__file__).parent.parent / "src" / "fake_fixtures"
 
 
 @pytest.fixture
@@ -153,6 +153,27 @@ def reset_environment(monkeypatch):
     # Cleanup happens automatically with monkeypatch
 
 
+class FakeClock:
+    """Time source the test advances by hand; sleep() just moves it forward."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Provide a fake clock for code that takes clock= (and sleep=) arguments."""
+    return FakeClock()
+
+
 @pytest.fixture
 def mock_datetime():
     """Provide a mock datetime for consistent testing."""
@@ -184,3 +205,22 @@ def pytest_collection_modifyitems(config, items):
         if "api" in item.keywords:
             if not os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY").startswith("sk-test"):
                 item.add_marker(skip_api)
+
+
+@pytest.fixture
+def stream_event_dicts(valid_api_response: Dict[str, Any]) -> list:
+    """Event dictionaries as WebSearchClient.search_stream() yields them."""
+    search_call, message = valid_api_response["output"]
+    content = message["content"][0]
+    text = content["text"]
+    events = [{"type": "response.created"}, {"type": "response.output_item.done", "item": search_call}]
+    # Stream the answer a few words at a time
+    words = text.split(" ")
+    for i in range(0, len(words), 4):
+        delta = " ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else "")
+        events.append({"type": "response.output_text.delta", "delta": delta})
+    for annotation in content["annotations"]:
+        events.append({"type": "response.output_text.annotation.added", "annotation": annotation})
+    events.append({"type": "response.output_item.done", "item": message})
+    events.append({"type": "response.completed", "id": valid_api_response["id"]})
+    return events
@@ -0,0 +1,109 @@
+"""
+Unit tests for the Streamlit app's shared resources.
+"""
+
+import pytest
+
+from src.app_resources import (
+    create_chat_client, create_context_window, create_history_view, create_session_writer,
+    create_token_counter, create_user_manager
+)
+from src.fake_server import FakeOpenAIServer
+
+
+@pytest.fixture
+def fake_server():
+    """A fake server with default (instant, error-free) behaviour."""
+    with FakeOpenAIServer() as server:
+        yield server
+
+
+@pytest.mark.unit
+class TestCreateChatClient:
+    """Building the pooled OpenAI client."""
+
+    def test_pool_limits_are_applied(self):
+        """Test that the connection limits reach the HTTP transport."""
+        client = create_chat_client(api_key="test-key", max_connections=4,
+                                    max_keepalive_connections=8, keepalive_expiry=5.0)
+
+        pool = client._client._transport._pool
+
+        assert pool._max_connections == 4
+        assert pool._max_keepalive_connections == 4
+        assert pool._keepalive_expiry == 5.0
+        client.close()
+
+    def test_api_key_defaults_to_environment(self, monkeypatch):
+        """Test that OPENAI_API_KEY is used when no key is passed."""
+        monkeypatch.setenv("OPENAI_API_KEY", "env-key")
+
+        assert create_chat_client().api_key == "env-key"
+
+    @pytest.mark.parametrize("limits", [{"max_connections": 0},
+                                        {"max_keepalive_connections": -1}])
+    def test_invalid_limits_are_rejected(self, limits):
+        """Test that non-positive pool sizes raise ValueError."""
+        with pytest.raises(ValueError, match="Connection limits"):
+            create_chat_client(api_key="test-key", **limits)
+
+    def test_requests_reuse_one_connection(self, fake_server):
+        """Test that consecutive requests share a kept-alive connection."""
+        client = create_chat_client(api_key="test-key", base_url=fake_server.base_url)
+        messages = [{"role": "user", "content": "hello"}]
+
+        for _ in range(3):
+            reply = client.chat.completions.create(model="gpt-4o-mini", messages=messages)
+            assert reply.choices[0].message.content
+
+        assert len(client._client._transport._pool.connections) == 1
+        client.close()
+
+
+@pytest.mark.unit
+class TestCreateUserManager:
+    """Building the shared UserManager."""
+
+    def test_manager_uses_data_dir(self, tmp_path):
+        """Test that profiles are stored under the given directory."""
+        manager = create_user_manager(str(tmp_path / "users"))
+
+        assert manager.create_user("alice", "secret1")
+        assert manager.get_user_profile("alice")["username"] == "alice"
+        assert (tmp_path / "users").is_dir()
+
+
+@pytest.mark.unit
+class TestChatResources:
+    """Building the chat's context windows, history views and session writer."""
+
+    def test_limits_come_from_environment(self, monkeypatch):
+        """Test that the CHAT_* variables configure the window."""
+        monkeypatch.setenv("CHAT_RECENT_MESSAGES", "6")
+        monkeypatch.setenv("CHAT_SUMMARY_BATCH", "2")
+        monkeypatch.setenv("CHAT_MAX_PROMPT_TOKENS", "1500")
+        counter = create_token_counter("gpt-4o-mini")
+
+        window = create_context_window(create_chat_client(api_key="test-key"), counter)
+
+        assert window.counter is counter
+        assert (window.recent_messages, window.summary_batch, window.max_prompt_tokens) == (6, 2, 1500)
+
+    def test_history_page_size_comes_from_environment(self, monkeypatch):
+        """Test that CHAT_HISTORY_PAGE_SIZE configures the history view."""
+        monkeypatch.setenv("CHAT_HISTORY_PAGE_SIZE", "7")
+
+        assert create_history_view().page_size == 7
+
+    def test_session_writer_comes_from_environment(self, monkeypatch, tmp_path):
+        """Test that the CHAT_SAVE_* variables configure the session writer."""
+        monkeypatch.setenv("CHAT_SAVE_DEBOUNCE", "0.5")
+        monkeypatch.setenv("CHAT_SAVE_MAX_DELAY", "3")
+        monkeypatch.setenv("CHAT_SAVE_MAX_PENDING", "16")
+        manager = create_user_manager(str(tmp_path))
+
+        writer = create_session_writer(manager)
+
+        assert writer.user_manager is manager
+        assert (writer.debounce, writer.max_delay, writer.max_pending) == (0.5, 3.0, 16)
+        writer.close()
@@ -0,0 +1,144 @@
+"""
+Unit tests for the benchmark harness.
+
+Tests measurement, baseline storage, regression detection and the CLI.
+"""
+
+import json
+
+import pytest
+
+from src.benchmarking import (
+    BenchmarkResult, BenchmarkSuite, Regression, compare, format_report,
+    load_baselines, main, measure, save_baselines
+)
+
+
+def _result(name="bench", seconds=0.01, memory=1000):
+    return BenchmarkResult(name=name, rounds=3, median_seconds=seconds, min_seconds=seconds,
+                           mean_seconds=seconds, peak_memory_bytes=memory)
+
+
+@pytest.fixture
+def suite():
+    """A suite with two cheap benchmarks."""
+    suite = BenchmarkSuite("demo")
+
+    @suite.benchmark("alloc.list", setup=lambda: 10_000, rounds=3)
+    def alloc(size):
+        return [0] * size
+
+    @suite.benchmark("noop")
+    def noop(_):
+        return None
+
+    return suite
+
+
+@pytest.mark.unit
+class TestMeasure:
+    """Tests for measure()."""
+
+    def test_measure_records_time_and_memory(self):
+        """Test that rounds, timings and peak memory are captured."""
+        calls = []
+
+        result = measure(lambda n: calls.append(bytearray(n)), setup=lambda: 100_000,
+                         rounds=4, warmup=2)
+
+        assert len(calls) == 4 + 2 + 1  # timed + warmup + memory run
+        assert result.rounds == 4
+        assert 0 < result.min_seconds <= result.median_seconds
+        assert result.peak_memory_bytes >= 100_000
+
+    def test_invalid_rounds_raise_error(self):
+        """Test that zero rounds is rejected."""
+        with pytest.raises(ValueError):
+            measure(lambda _: None, rounds=0)
+
+
+@pytest.mark.unit
+class TestBenchmarkSuite:
+    """Tests for BenchmarkSuite."""
+
+    def test_run_all_and_filter(self, suite):
+        """Test running every benchmark, a subset, and overriding rounds."""
+        assert suite.names == ["alloc.list", "noop"]
+        assert [r.name for r in suite.run()] == ["alloc.list", "noop"]
+        assert [r.name for r in suite.run(match="alloc")] == ["alloc.list"]
+        assert suite.run(rounds=2)[1].rounds == 2
+
+
+@pytest.mark.unit
+class TestBaselines:
+    """Tests for storing and comparing baselines."""
+
+    def test_round_trip_and_merge(self, tmp_path):
+        """Test that saving keeps unrelated existing baselines."""
+        path = tmp_path / "baselines.json"
+        assert load_baselines(path) == {}
+
+        save_baselines(path, [_result("a")])
+        save_baselines(path, [_result("b", 0.02)], load_baselines(path))
+
+        loaded = load_baselines(path)
+        assert sorted(loaded) == ["a", "b"]
+        assert loaded["b"] == _result("b", 0.02)
+        assert list(json.loads(path.read_text())) == ["a", "b"]
+
+    def test_compare_flags_time_and_memory(self):
+        """Test regression detection on both metrics."""
+        baselines = {"fast": _result("fast"), "lean": _result("lean")}
+        results = [
+            _result("fast", seconds=0.0124),            # within 25%
+            _result("lean", seconds=0.02, memory=2000),  # slower and bigger
+            _result("new", seconds=1.0),                 # no baseline
+        ]
+
+        regressions = compare(results, baselines)
+
+        assert [(r.name, r.metric) for r in regressions] == [
+            ("lean", "min_seconds"), ("lean", "peak_memory_bytes")
+        ]
+        assert regressions[0].ratio == pytest.approx(2.0)
+
+    def test_separate_memory_threshold(self):
+        """Test that memory can have its own allowance."""
+        regressions = compare([_result(memory=1400)], {"bench": _result()},
+                              threshold=0.25, memory_threshold=0.5)
+
+        assert regressions == []
+
+    def test_zero_baseline_ratio(self):
+        """Test the ratio of a regression from zero."""
+        assert Regression("x", "peak_memory_bytes", 0, 10).ratio == float("inf")
+
+    def test_format_report(self):
+        """Test the report table with and without a baseline."""
+        report = format_report([_result("a", 0.02), _result("b")], {"a": _result("a", 0.01)})
+
+        lines = report.splitlines()
+        assert lines[0].startswith("benchmark")
+        assert lines[1].startswith("a") and lines[1].endswith("2.00x")
+        assert lines[2].endswith("-")
+
+
+@pytest.mark.unit
+class TestMain:
+    """Tests for the shared benchmark CLI."""
+
+    def test_save_then_pass(self, suite, tmp_path, capsys):
+        """Test recording baselines and then comparing against them."""
+        path = tmp_path / "baselines.json"
+
+        assert main(suite, path, ["--save-baseline", "--rounds", "2"]) == 0
+        assert "Saved 2 baseline(s)" in capsys.readouterr().out
+        assert main(suite, path, ["-k", "alloc", "--threshold", "100"]) == 0
+
+    def test_regression_fails(self, suite, tmp_path, capsys):
+        """Test that a regression produces a non-zero exit code."""
+        path = tmp_path / "baselines.json"
+        save_baselines(path, [_result("noop", seconds=1e-12, memory=0)])
+
+        assert main(suite, path, ["-k", "noop"]) == 1
+        assert "REGRESSION noop: min_seconds" in capsys.readouterr().out
@@ -0,0 +1,222 @@
+"""
+Unit tests for the search result caches.
+
+Tests key normalization, TTL expiry, LRU eviction and the on-disk backend.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.cache import make_cache_key, CacheStats, MemoryCache, DiskCache
+from src.models import SearchOptions, SearchResult, Citation, Source
+from src.search_service import SearchService
+
+
+@pytest.fixture
+def make_result(mock_datetime):
+    """Factory for small SearchResult objects."""
+    def _make(query: str = "query", text: str = "text") -> SearchResult:
+        return SearchResult(
+            query=query,
+            text=text,
+            citations=[Citation("https://a.com", "A", 0, 4)],
+            sources=[Source("https://a.com", "web")],
+            search_id="ws_1",
+            timestamp=mock_datetime
+        )
+    return _make
+
+
+@pytest.fixture(params=["memory", "disk"])
+def cache_factory(request, tmp_path, clock):
+    """Build either backend with the same settings."""
+    def _build(**kwargs):
+        kwargs.setdefault("clock", clock)
+        if request.param == "memory":
+            return MemoryCache(**kwargs)
+        return DiskCache(tmp_path / "cache.db", **kwargs)
+    return _build
+
+
+@pytest.mark.unit
+class TestCacheKey:
+    """Tests for make_cache_key."""
+
+    def test_key_normalizes_whitespace_and_case(self):
+        """Test that trivially different spellings share a key."""
+        options = SearchOptions()
+
+        assert make_cache_key("  Latest  AI news ", options) == make_cache_key("latest ai news", options)
+
+    def test_key_ignores_domain_order(self):
+        """Test that allowed_domains order doesn't split the cache."""
+        first = SearchOptions(allowed_domains=["b.com", "A.com"])
+        second = SearchOptions(allowed_domains=["a.com", "b.com"])
+
+        assert make_cache_key("q", first) == make_cache_key("q", second)
+
+    @pytest.mark.parametrize("options", [
+        SearchOptions(model="gpt-5"),
+        SearchOptions(allowed_domains=["a.com"]),
+        SearchOptions(user_location={"city": "London"}),
+        SearchOptions(reasoning_effort="high"),
+    ])
+    def test_key_includes_every_option(self, options):
+        """Test that changing any option changes the key."""
+        assert make_cache_key("q", options) != make_cache_key("q", SearchOptions())
+
+
+@pytest.mark.unit
+class TestSearchCacheBackends:
+    """Behaviour shared by MemoryCache and DiskCache."""
+
+    def test_miss_then_hit(self, cache_factory, make_result):
+        """Test a basic round trip and the hit/miss counters."""
+        cache = cache_factory()
+
+        assert cache.get("k") is None
+        cache.set("k", make_result())
+        cached = cache.get("k")
+
+        assert cached == make_result()
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+        assert stats.bytes > 0
+        assert stats.hit_rate == 0.5
+
+    def test_hits_return_independent_copies(self, cache_factory, make_result):
+        """Test that mutating a returned result doesn't corrupt the cache."""
+        cache = cache_factory()
+        cache.set("k", make_result())
+
+        cache.get("k").citations.clear()
+
+        assert len(cache.get("k").citations) == 1
+
+    def test_entry_expires_after_ttl(self, cache_factory, make_result, clock):
+        """Test per-entry TTL expiry."""
+        cache = cache_factory(default_ttl=60)
+        cache.set("short", make_result(), ttl=5)
+        cache.set("long", make_result())
+
+        clock.now += 10
+
+        assert cache.get("short") is None
+        assert cache.get("long") is not None
+        assert cache.stats.expirations == 1
+
+    def test_lru_eviction_by_entries(self, cache_factory, make_result):
+        """Test that the least recently used entry is evicted first."""
+        cache = cache_factory(max_entries=2)
+        cache.set("a", make_result("a"))
+        cache.set("b", make_result("b"))
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", make_result("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats.evictions == 1
+
+    def test_lru_eviction_by_bytes(self, cache_factory, make_result):
+        """Test that max_bytes bounds the total payload size."""
+        entry_size = len(MemoryCache()._encode(make_result("a")))
+        cache = cache_factory(max_bytes=entry_size * 2 + 10)
+        for key in "abc":
+            cache.set(key, make_result(key))
+
+        stats = cache.stats
+        assert stats.entries == 2
+        assert stats.bytes <= entry_size * 2 + 10
+        assert cache.get("a") is None
+
+    def test_oversized_entry_is_not_cached(self, cache_factory, make_result):
+        """Test that a result larger than max_bytes is skipped."""
+        cache = cache_factory(max_bytes=10)
+        cache.set("k", make_result())
+
+        assert cache.stats.entries == 0
+
+    def test_overwrite_replaces_entry(self, cache_factory, make_result):
+        """Test that setting an existing key replaces it."""
+        cache = cache_factory()
+        cache.set("k", make_result(text="old"))
+        cache.set("k", make_result(text="new"))
+
+        assert cache.get("k").text == "new"
+        assert cache.stats.entries == 1
+
+    def test_clear(self, cache_factory, make_result):
+        """Test that clear() empties the cache."""
+        cache = cache_factory()
+        cache.set("k", make_result())
+
+        cache.clear()
+
+        assert cache.stats.entries == 0
+        assert cache.stats.bytes == 0
+
+    def test_invalid_limits_raise_error(self, cache_factory):
+        """Test that non-positive limits are rejected."""
+        with pytest.raises(ValueError):
+            cache_factory(max_entries=0)
+
+
+@pytest.mark.unit
+class TestDiskCache:
+    """Tests specific to the on-disk backend."""
+
+    def test_entries_survive_restart(self, tmp_path, make_result, clock):
+        """Test that a new DiskCache sees entries written by an old one."""
+        path = tmp_path / "nested" / "cache.db"
+        first = DiskCache(path, clock=clock)
+        first.set("a", make_result("a"))
+        first.set("b", make_result("b"))
+        first.close()
+
+        second = DiskCache(path, clock=clock, max_entries=2)
+        second.get("a")
+        second.set("c", make_result("c"))  # evicts "b", the least recently used
+
+        assert second.get("a").query == "a"
+        assert second.get("b") is None
+
+
+@pytest.mark.unit
+class TestSearchServiceCaching:
+    """Tests for SearchService with a cache attached."""
+
+    @patch('src.search_service.WebSearchClient')
+    def test_repeated_search_served_from_cache(self, mock_client_class, test_api_key,
+                                               valid_api_response):
+        """Test that a repeated query doesn't call the API again."""
+        mock_client = MagicMock()
+        mock_client.search.return_value = valid_api_response
+        mock_client_class.return_value = mock_client
+
+        service = SearchService(api_key=test_api_key, cache=MemoryCache())
+        first = service.search("latest news")
+        second = service.search("Latest   News")
+
+        assert mock_client.search.call_count == 1
+        assert second == first
+        assert service.cache.stats.hits == 1
+
+    @patch('src.search_service.WebSearchClient')
+    def test_different_options_miss_cache(self, mock_client_class, test_api_key,
+                                          valid_api_response):
+        """Test that options are part of the cache key."""
+        mock_client = MagicMock()
+        mock_client.search.return_value = valid_api_response
+        mock_client_class.return_value = mock_client
+
+        service = SearchService(api_key=test_api_key, cache=MemoryCache())
+        service.search("latest news")
+        service.search("latest news", SearchOptions(model="gpt-5"))
+
+        assert mock_client.search.call_count == 2
+
+
+def test_cache_stats_hit_rate_without_lookups():
+    """Test that an unused cache reports a zero hit rate."""
+    assert CacheStats().hit_rate == 0.0
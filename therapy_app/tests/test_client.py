@@ -4,14 +4,43 @@ Unit tests for the OpenAI API client module.
 Tests the OpenAI API client interactions with mocking.
 """
 
+import asyncio
+from types import SimpleNamespace
+
+import httpx
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from openai import OpenAI, AuthenticationError, RateLimitError
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from openai import OpenAI, AuthenticationError, RateLimitError, APIError
 
-from src.client import WebSearchClient
+from src.client import WebSearchClient, AsyncWebSearchClient, _to_search_error
 from src.models import SearchOptions, SearchError
 
 
+class FakeStream:
+    """Stand-in for the SDK's Stream: iterates events and records close()."""
+    
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+    
+    def __iter__(self):
+        return iter(self.events)
+    
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncStream(FakeStream):
+    """Stand-in for the SDK's AsyncStream."""
+    
+    async def __aiter__(self):
+        for event in self.events:
+            yield event
+    
+    async def close(self):
+        self.closed = True
+
+
 @pytest.mark.unit
 class TestWebSearchClient:
     """Test the WebSearchClient class."""
@@ -192,3 +221,290 @@ class TestWebSearchClient:
         
         with pytest.raises(ValueError, match="Query too long"):
             client.search(very_long_query)
+
+
+@pytest.mark.unit
+class TestErrorTranslation:
+    """Test the shared OpenAI -> SearchError mapping."""
+    
+    def test_search_error_passes_through(self):
+        """Test that an existing SearchError is returned unchanged."""
+        error = SearchError(code="VALIDATION_ERROR", message="bad")
+        
+        assert _to_search_error(error) is error
+    
+    def test_generic_api_error(self):
+        """Test that other API errors map to API_ERROR."""
+        request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+        error = APIError("Server exploded", request=request, body=None)
+        
+        assert _to_search_error(error).code == "API_ERROR"
+    
+    def test_unexpected_error(self):
+        """Test that anything else maps to UNKNOWN_ERROR."""
+        result = _to_search_error(RuntimeError("boom"))
+        
+        assert result.code == "UNKNOWN_ERROR"
+        assert "boom" in result.message
+
+
+@pytest.mark.unit
+class TestAsyncWebSearchClient:
+    """Test the AsyncWebSearchClient class."""
+    
+    def test_initialization_configures_pool_limits(self, test_api_key):
+        """Test that connection limits reach the shared transport."""
+        client = AsyncWebSearchClient(
+            api_key=test_api_key, max_connections=10, max_keepalive_connections=50
+        )
+        
+        assert client.limits.max_connections == 10
+        # Keep-alive pool can never exceed the total pool
+        assert client.limits.max_keepalive_connections == 10
+        assert client.client._client is client.http_client
+        asyncio.run(client.aclose())
+    
+    def test_initialization_without_api_key_raises_error(self, temp_env_vars):
+        """Test that creating async client without API key raises error."""
+        temp_env_vars(OPENAI_API_KEY="")
+        
+        with pytest.raises(ValueError, match="API key"):
+            AsyncWebSearchClient()
+    
+    def test_invalid_connection_limits_raise_error(self, test_api_key):
+        """Test that a pool without connections is rejected."""
+        with pytest.raises(ValueError, match="Connection limits"):
+            AsyncWebSearchClient(api_key=test_api_key, max_connections=0)
+    
+    @patch('src.client.AsyncOpenAI')
+    def test_search_returns_dict(self, mock_openai_class, test_api_key,
+                                 sample_query, mock_response_object):
+        """Test performing an async web search."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.create = AsyncMock(return_value=mock_response_object)
+        mock_openai_class.return_value = mock_client_instance
+        
+        client = AsyncWebSearchClient(api_key=test_api_key)
+        response = asyncio.run(client.search(sample_query, SearchOptions(model="gpt-5")))
+        
+        assert response["id"] == mock_response_object.id
+        assert mock_client_instance.responses.create.call_args[1]["model"] == "gpt-5"
+    
+    @patch('src.client.AsyncOpenAI')
+    def test_concurrent_searches_share_one_client(self, mock_openai_class, test_api_key,
+                                                  mock_response_object):
+        """Test that many in-flight searches reuse the same transport."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.create = AsyncMock(return_value=mock_response_object)
+        mock_client_instance.close = AsyncMock()
+        mock_openai_class.return_value = mock_client_instance
+        
+        async def run():
+            async with AsyncWebSearchClient(api_key=test_api_key) as client:
+                return await asyncio.gather(*(client.search(f"query {i}") for i in range(20)))
+        
+        results = asyncio.run(run())
+        
+        assert len(results) == 20
+        assert mock_openai_class.call_count == 1
+        assert mock_client_instance.responses.create.await_count == 20
+        mock_client_instance.close.assert_awaited_once()
+    
+    @patch('src.client.AsyncOpenAI')
+    def test_search_handles_rate_limit_error(self, mock_openai_class, test_api_key, sample_query):
+        """Test that async errors map exactly like the sync client."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.create = AsyncMock(side_effect=RateLimitError(
+            "Rate limit exceeded",
+            response=Mock(status_code=429),
+            body=None
+        ))
+        mock_openai_class.return_value = mock_client_instance
+        
+        client = AsyncWebSearchClient(api_key=test_api_key)
+        
+        with pytest.raises(SearchError) as exc_info:
+            asyncio.run(client.search(sample_query))
+        
+        assert exc_info.value.code == "RATE_LIMIT_ERROR"
+    
+    @patch('src.client.AsyncOpenAI')
+    def test_search_handles_authentication_error(self, mock_openai_class, test_api_key,
+                                                 sample_query):
+        """Test that non-429 errors are translated without retrying."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.create = AsyncMock(side_effect=AuthenticationError(
+            "Invalid API key",
+            response=Mock(status_code=401),
+            body=None
+        ))
+        mock_openai_class.return_value = mock_client_instance
+        
+        client = AsyncWebSearchClient(api_key=test_api_key)
+        
+        with pytest.raises(SearchError) as exc_info:
+            asyncio.run(client.search(sample_query))
+        
+        assert exc_info.value.code == "AUTHENTICATION_ERROR"
+    
+    def test_empty_query_raises_error(self, test_api_key):
+        """Test that validation runs before any network call."""
+        client = AsyncWebSearchClient(api_key=test_api_key)
+        
+        with pytest.raises(ValueError, match="Query cannot be empty"):
+            asyncio.run(client.search("   "))
+    
+    def test_async_client_is_not_a_sync_client(self):
+        """Test that the async client inherits no blocking search methods."""
+        assert not issubclass(AsyncWebSearchClient, WebSearchClient)
+    
+    @patch('src.client.AsyncOpenAI')
+    def test_search_stream_is_async(self, mock_openai_class, test_api_key, sample_query):
+        """Test that search_stream awaits the request and iterates the stream asynchronously."""
+        stream = FakeAsyncStream([
+            SimpleNamespace(type="response.output_text.delta", delta="Hello"),
+            SimpleNamespace(type="response.completed", response=SimpleNamespace(id="resp_1")),
+        ])
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.create = AsyncMock(return_value=stream)
+        mock_openai_class.return_value = mock_client_instance
+        client = AsyncWebSearchClient(api_key=test_api_key)
+        
+        async def collect():
+            return [event async for event in client.search_stream(sample_query)]
+        
+        converted = asyncio.run(collect())
+        
+        assert mock_client_instance.responses.create.call_args[1]["stream"] is True
+        assert [e["type"] for e in converted] == ["response.output_text.delta",
+                                                  "response.completed"]
+        assert converted[0]["delta"] == "Hello"
+        assert stream.closed
+    
+    @patch('src.client.AsyncOpenAI')
+    def test_search_stream_closes_abandoned_stream(self, mock_openai_class, test_api_key,
+                                                   sample_query):
+        """Test that a consumer stopping early still closes the SDK stream."""
+        stream = FakeAsyncStream([SimpleNamespace(type="response.created")] * 3)
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.create = AsyncMock(return_value=stream)
+        mock_openai_class.return_value = mock_client_instance
+        client = AsyncWebSearchClient(api_key=test_api_key)
+        
+        async def first_event():
+            events = client.search_stream(sample_query)
+            event = await events.__anext__()
+            await events.aclose()
+            return event
+        
+        assert asyncio.run(first_event())["type"] == "response.created"
+        assert stream.closed
+    
+    @patch('src.client.AsyncOpenAI')
+    def test_search_stream_maps_sdk_errors(self, mock_openai_class, test_api_key, sample_query):
+        """Test that streamed SDK errors map exactly like the sync client."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.create = AsyncMock(side_effect=AuthenticationError(
+            "Invalid API key", response=Mock(status_code=401), body=None
+        ))
+        mock_openai_class.return_value = mock_client_instance
+        client = AsyncWebSearchClient(api_key=test_api_key)
+        
+        async def collect():
+            return [event async for event in client.search_stream(sample_query, SearchOptions())]
+        
+        with pytest.raises(SearchError) as exc_info:
+            asyncio.run(collect())
+        
+        assert exc_info.value.code == "AUTHENTICATION_ERROR"
+
+
+@pytest.mark.unit
+class TestWebSearchClientStreaming:
+    """Test the streaming search API."""
+    
+    @patch('src.client.OpenAI')
+    def test_search_stream_yields_event_dicts(self, mock_openai_class, test_api_key,
+                                              sample_query, mock_response_object):
+        """Test that SDK events are converted to dictionaries as they arrive."""
+        message = mock_response_object.output[1]
+        events = [
+            SimpleNamespace(type="response.created"),
+            SimpleNamespace(type="response.output_text.delta", delta="Hello"),
+            SimpleNamespace(type="response.output_text.annotation.added",
+                            annotation={"type": "url_citation", "url": "https://a.com"}),
+            SimpleNamespace(type="response.output_text.annotation.added",
+                            annotation=SimpleNamespace(type="url_citation", url="https://b.com",
+                                                       title="B", start_index=0, end_index=1)),
+            SimpleNamespace(type="response.output_item.done", item=message),
+            SimpleNamespace(type="response.completed", response=SimpleNamespace(id="resp_1")),
+        ]
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.create.return_value = FakeStream(events)
+        mock_openai_class.return_value = mock_client_instance
+        
+        client = WebSearchClient(api_key=test_api_key)
+        converted = list(client.search_stream(sample_query))
+        
+        assert mock_client_instance.responses.create.call_args[1]["stream"] is True
+        assert [e["type"] for e in converted] == [e.type for e in events]
+        assert converted[1]["delta"] == "Hello"
+        assert converted[2]["annotation"]["url"] == "https://a.com"
+        assert converted[3]["annotation"]["title"] == "B"
+        assert converted[4]["item"]["type"] == "message"
+        assert converted[5]["id"] == "resp_1"
+    
+    @patch('src.client.OpenAI')
+    def test_search_stream_failed_event_raises(self, mock_openai_class, test_api_key,
+                                               sample_query):
+        """Test that a response.failed event surfaces as a SearchError."""
+        failed = SimpleNamespace(
+            type="response.failed",
+            response=SimpleNamespace(error=SimpleNamespace(message="model overloaded"))
+        )
+        mock_client_instance = MagicMock()
+        stream = FakeStream([failed])
+        mock_client_instance.responses.create.return_value = stream
+        mock_openai_class.return_value = mock_client_instance
+        
+        client = WebSearchClient(api_key=test_api_key)
+        
+        with pytest.raises(SearchError) as exc_info:
+            list(client.search_stream(sample_query))
+        
+        assert exc_info.value.code == "API_ERROR"
+        assert "model overloaded" in exc_info.value.message
+        assert stream.closed
+    
+    @patch('src.client.OpenAI')
+    def test_search_stream_closes_abandoned_stream(self, mock_openai_class, test_api_key,
+                                                   sample_query):
+        """Test that a consumer stopping early still closes the SDK stream."""
+        stream = FakeStream([SimpleNamespace(type="response.created")] * 3)
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.create.return_value = stream
+        mock_openai_class.return_value = mock_client_instance
+        
+        client = WebSearchClient(api_key=test_api_key)
+        events = client.search_stream(sample_query)
+        next(events)
+        events.close()
+        
+        assert stream.closed
+    
+    @patch('src.client.OpenAI')
+    def test_search_stream_maps_sdk_errors(self, mock_openai_class, test_api_key,
+                                           sample_query):
+        """Test that SDK errors map exactly like search()."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.create.side_effect = AuthenticationError(
+            "Invalid API key", response=Mock(status_code=401), body=None
+        )
+        mock_openai_class.return_value = mock_client_instance
+        
+        client = WebSearchClient(api_key=test_api_key)
+        
+        with pytest.raises(SearchError) as exc_info:
+            list(client.search_stream(sample_query, SearchOptions()))
+        
+        assert exc_info.value.code == "AUTHENTICATION_ERROR"
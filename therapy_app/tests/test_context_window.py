@@ -0,0 +1,305 @@
+"""
+Unit tests for token-budgeted conversation context.
+"""
+
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from src import context_window
+from src.app_resources import create_chat_client
+from src.context_window import (
+    CHARS_PER_TOKEN, SUMMARY_PREFIX, TOKENS_PER_MESSAGE, TOKENS_PER_REPLY,
+    ContextStats, ContextWindow, TokenCounter, make_summarizer
+)
+from src.fake_server import FakeOpenAIServer
+
+
+class WordEncoding:
+    """Stands in for a tokenizer: one token per whitespace-separated word."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, text, disallowed_special=None):
+        self.encoded.append(text)
+        return text.split()
+
+
+class RecordingSummarizer:
+    """Summarizes to the list of message contents it has seen."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, previous, messages):
+        self.calls.append((previous, list(messages)))
+        return " ".join(filter(None, [previous] + [m["content"] for m in messages]))
+
+
+def conversation(count):
+    """count alternating user/assistant messages."""
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+            for i in range(count)]
+
+
+@pytest.fixture
+def counter():
+    return TokenCounter(encoding=WordEncoding())
+
+
+@pytest.fixture
+def summarizer():
+    return RecordingSummarizer()
+
+
+@pytest.mark.unit
+class TestTokenCounter:
+    """Counting and caching token counts."""
+
+    def test_encoding_counts_tokens(self, counter):
+        """Test that the tokenizer's output length is the count."""
+        assert counter.count("one two three") == 3
+        assert counter.exact
+
+    def test_estimate_without_encoding(self, monkeypatch):
+        """Test the characters-per-token estimate when no encoding loads."""
+        monkeypatch.setattr(context_window, "_load_encoding", lambda model: None)
+        counter = TokenCounter()
+
+        assert not counter.exact
+        assert counter.count("x" * (CHARS_PER_TOKEN * 2 + 1)) == 3
+
+    def test_counts_are_cached(self, counter):
+        """Test that a repeated text is encoded once."""
+        for _ in range(3):
+            counter.count("same text")
+
+        assert counter.encoding.encoded == ["same text"]
+        assert counter.stats.hits == 2
+        assert counter.stats.misses == 1
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test that the cache stays within cache_size."""
+        counter = TokenCounter(encoding=WordEncoding(), cache_size=2)
+        counter.count("a")
+        counter.count("b")
+        counter.count("a")
+        counter.count("c")
+
+        assert counter.stats.evictions == 1
+        assert counter.stats.entries == 2
+        counter.count("a")
+        assert counter.stats.hits == 2
+
+    def test_message_overhead(self, counter):
+        """Test that per-message and reply-priming tokens are added."""
+        messages = [{"role": "user", "content": "hi there"}, {"role": "assistant", "content": "hello"}]
+
+        assert counter.count_messages(messages) == TOKENS_PER_REPLY + 2 * TOKENS_PER_MESSAGE + 3
+
+
+@pytest.mark.unit
+class TestLoadEncoding:
+    """Choosing the tiktoken encoding."""
+
+    def fake_tiktoken(self, known=True, available=True):
+        def encoding_for_model(model):
+            if not known:
+                raise KeyError(model)
+            return f"encoding for {model}"
+
+        def get_encoding(name):
+            if not available:
+                raise ConnectionError("offline")
+            return f"encoding {name}"
+
+        return SimpleNamespace(encoding_for_model=encoding_for_model, get_encoding=get_encoding)
+
+    def test_model_encoding(self, monkeypatch):
+        """Test that a known model gets its own encoding."""
+        monkeypatch.setattr(context_window, "tiktoken", self.fake_tiktoken())
+
+        assert TokenCounter("gpt-4").encoding == "encoding for gpt-4"
+
+    def test_unknown_model_uses_default(self, monkeypatch):
+        """Test that unknown models fall back to DEFAULT_ENCODING."""
+        monkeypatch.setattr(context_window, "tiktoken", self.fake_tiktoken(known=False))
+
+        assert TokenCounter("my-model").encoding == f"encoding {context_window.DEFAULT_ENCODING}"
+
+    def test_unloadable_encoding_estimates(self, monkeypatch, caplog):
+        """Test that a failed encoding download falls back to the estimate."""
+        monkeypatch.setattr(context_window, "tiktoken",
+                            self.fake_tiktoken(known=False, available=False))
+
+        with caplog.at_level(logging.WARNING):
+            counter = TokenCounter("my-model")
+
+        assert not counter.exact
+        assert "estimating tokens" in caplog.text
+
+
+@pytest.mark.unit
+class TestContextStats:
+    """Savings arithmetic."""
+
+    def test_savings(self):
+        """Test saved_tokens and saved_ratio."""
+        stats = ContextStats(full_tokens=1000, prompt_tokens=250)
+
+        assert stats.saved_tokens == 750
+        assert stats.saved_ratio == 0.75
+
+    def test_empty(self):
+        """Test that an unused stats object reports no savings."""
+        assert ContextStats().saved_ratio == 0.0
+
+
+@pytest.mark.unit
+class TestContextWindow:
+    """Building prompts from history."""
+
+    def test_short_history_is_sent_whole(self, counter, summarizer):
+        """Test that nothing is summarized while the history fits the window."""
+        window = ContextWindow(counter, summarizer, recent_messages=4, summary_batch=2)
+        history = conversation(6)
+
+        messages = window.build("be kind", history)
+
+        assert messages == [{"role": "system", "content": "be kind"}] + history
+        assert summarizer.calls == []
+        assert window.last_stats.saved_tokens == 0
+
+    def test_older_messages_are_summarized(self, counter, summarizer):
+        """Test that messages beyond the window are replaced by the summary."""
+        window = ContextWindow(counter, summarizer, recent_messages=4, summary_batch=2)
+        history = conversation(7)
+
+        messages = window.build("be kind", history)
+
+        assert messages[0] == {"role": "system", "content": "be kind"}
+        assert messages[1] == {"role": "system", "content": SUMMARY_PREFIX + window.summary}
+        assert messages[2:] == history[3:]
+        assert summarizer.calls == [("", history[:3])]
+        stats = window.last_stats
+        assert stats.summarized_messages == 3
+        assert stats.recent_messages == 4
+        assert stats.prompt_tokens == counter.count_messages(messages)
+        assert stats.full_tokens == counter.count_messages(messages[:1] + history)
+
+    def test_summary_is_extended_in_batches(self, counter, summarizer):
+        """Test that the cached summary is reused until a batch has built up."""
+        window = ContextWindow(counter, summarizer, recent_messages=4, summary_batch=2)
+        history = conversation(7)
+        window.build("be kind", history)
+
+        for count in (8, 9):
+            window.build("be kind", conversation(count))
+        assert len(summarizer.calls) == 1
+
+        window.build("be kind", conversation(10))
+        assert summarizer.calls[1] == ("message 0 message 1 message 2", conversation(10)[3:6])
+        assert window.last_stats.summarized_messages == 6
+
+    def test_system_prompt_prefix_is_stable(self, counter, summarizer):
+        """Test that consecutive prompts share the system message and summary."""
+        window = ContextWindow(counter, summarizer, recent_messages=4, summary_batch=4)
+        first = window.build("be kind", conversation(9))
+        second = window.build("be kind", conversation(11))
+
+        assert second[:2] == first[:2]
+
+    def test_changed_history_resets_summary(self, counter, summarizer):
+        """Test that a different conversation does not reuse the summary."""
+        window = ContextWindow(counter, summarizer, recent_messages=2, summary_batch=1)
+        window.build("be kind", conversation(5))
+
+        shorter = window.build("be kind", conversation(2))
+        assert shorter[1:] == conversation(2)
+
+        window.build("be kind", conversation(5))
+        other = conversation(5)
+        other[2] = {"role": "user", "content": "something else"}
+        window.build("be kind", other)
+        assert summarizer.calls[-1] == ("", other[:3])
+
+    def test_summarizer_failure_keeps_messages(self, counter, caplog):
+        """Test that a failed summary leaves the history verbatim and retries."""
+        def failing(previous, messages):
+            raise RuntimeError("rate limited")
+
+        window = ContextWindow(counter, failing, recent_messages=2, summary_batch=1)
+        history = conversation(4)
+
+        with caplog.at_level(logging.WARNING):
+            messages = window.build("be kind", history)
+
+        assert messages[1:] == history
+        assert window.summary == ""
+        assert "Could not summarize 2 messages" in caplog.text
+
+    def test_budget_drops_oldest_verbatim_messages(self, counter, summarizer):
+        """Test that the prompt is trimmed to max_prompt_tokens."""
+        window = ContextWindow(counter, summarizer, recent_messages=10,
+                               max_prompt_tokens=TOKENS_PER_REPLY + 3 * (TOKENS_PER_MESSAGE + 2))
+        history = conversation(5)
+
+        messages = window.build("be kind", history)
+
+        assert messages[1:] == history[3:]
+        assert window.last_stats.dropped_messages == 3
+        assert window.last_stats.prompt_tokens <= window.max_prompt_tokens
+
+    def test_newest_message_is_never_dropped(self, counter, summarizer):
+        """Test that an oversized final message is still sent."""
+        window = ContextWindow(counter, summarizer, max_prompt_tokens=1)
+
+        assert window.build("be kind", conversation(3))[1:] == conversation(3)[2:]
+
+    def test_summary_time_is_recorded(self, counter, summarizer):
+        """Test that the summary call is timed with the injected clock."""
+        ticks = iter([1.0, 3.5])
+        window = ContextWindow(counter, summarizer, recent_messages=1, summary_batch=1,
+                               clock=lambda: next(ticks))
+
+        window.build("be kind", conversation(3))
+
+        assert window.last_stats.summary_seconds == 2.5
+
+    @pytest.mark.parametrize("limits", [{"recent_messages": 0}, {"summary_batch": 0}])
+    def test_invalid_limits(self, counter, summarizer, limits):
+        """Test that empty windows are rejected."""
+        with pytest.raises(ValueError):
+            ContextWindow(counter, summarizer, **limits)
+
+
+@pytest.mark.unit
+class TestMakeSummarizer:
+    """Asking the chat model for summaries."""
+
+    def test_summary_from_chat_model(self):
+        """Test that the model's reply becomes the summary."""
+        with FakeOpenAIServer() as server:
+            client = create_chat_client(api_key="test-key", base_url=server.base_url)
+            summary = make_summarizer(client)("", conversation(2))
+            client.close()
+
+        assert summary
+
+    def test_empty_reply_keeps_previous_summary(self):
+        """Test that an empty completion does not erase the summary."""
+        reply = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=None))])
+        requests = []
+
+        def create(**kwargs):
+            requests.append(kwargs)
+            return reply
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        assert make_summarizer(client, model="m", max_words=50)("old", conversation(2)) == "old"
+        assert requests[0]["model"] == "m"
+        assert "50 words" in requests[0]["messages"][0]["content"]
+        assert "user: message 0\nassistant: message 1" in requests[0]["messages"][1]["content"]
@@ -0,0 +1,296 @@
+"""
+Tests for the local fake OpenAI server.
+
+Real OpenAI SDK clients are pointed at the server on a free port, so these
+tests exercise the actual wire format end to end.
+"""
+
+import asyncio
+import logging
+import statistics
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from openai import OpenAI
+
+from src.client import WebSearchClient, AsyncWebSearchClient
+from src.fake_server import (
+    FakeOpenAI, FakeOpenAIServer, FakeServerConfig, main, split_tokens
+)
+from src.models import SearchError
+from src.rate_limit import RateLimiter
+from src.search_service import SearchService
+
+
+@pytest.fixture
+def fake_server():
+    """A fake server with default (instant, error-free) behaviour."""
+    with FakeOpenAIServer() as server:
+        yield server
+
+
+def _no_retries():
+    """Limiter that never retries, so injected errors surface immediately."""
+    return RateLimiter(max_retries=0)
+
+
+@pytest.mark.unit
+class TestFakeOpenAI:
+    """Tests for sampling and payload building (no sockets)."""
+
+    @pytest.mark.parametrize("distribution", ["fixed", "uniform", "exponential", "lognormal"])
+    def test_latency_distributions_have_configured_mean(self, distribution):
+        """Test that every distribution is centred on latency_ms."""
+        fake = FakeOpenAI(FakeServerConfig(latency_ms=100, latency_distribution=distribution,
+                                           seed=7))
+
+        samples = [fake.sample_latency() for _ in range(4000)]
+
+        assert min(samples) >= 0
+        assert statistics.mean(samples) == pytest.approx(0.1, rel=0.1)
+
+    def test_zero_latency(self):
+        """Test that the default config never sleeps."""
+        assert FakeOpenAI().sample_latency() == 0.0
+
+    def test_error_injection_rates(self):
+        """Test that injected errors follow the configured probabilities."""
+        fake = FakeOpenAI(FakeServerConfig(error_rate_429=0.2, error_rate_500=0.1, seed=1))
+
+        outcomes = [fake.sample_error() for _ in range(5000)]
+
+        assert outcomes.count(429) / 5000 == pytest.approx(0.2, abs=0.03)
+        assert outcomes.count(500) / 5000 == pytest.approx(0.1, abs=0.03)
+        assert (fake.stats.rate_limited, fake.stats.server_errors) == (
+            outcomes.count(429), outcomes.count(500)
+        )
+
+    def test_payload_scale_repeats_text(self, valid_api_response):
+        """Test that payload_scale grows the answer without touching the fixture."""
+        original = valid_api_response["output"][1]["content"][0]["text"]
+
+        fake = FakeOpenAI(FakeServerConfig(payload_scale=3))
+
+        assert fake.answer_text() == "\n\n".join([original] * 3)
+        assert fake.fixtures["valid_search_response"]["output"][1]["content"][0]["text"] == original
+
+    def test_response_events_rebuild_text(self):
+        """Test that streamed deltas join back to the full answer."""
+        fake = FakeOpenAI()
+
+        events = list(fake.response_events())
+        text = "".join(e["delta"] for e in events if e["type"] == "response.output_text.delta")
+
+        assert events[0]["type"] == "response.created"
+        assert events[-1]["type"] == "response.completed"
+        assert text == fake.answer_text()
+        assert [e["sequence_number"] for e in events] == list(range(1, len(events) + 1))
+
+    def test_token_delay(self):
+        """Test the per-token delay derived from tokens_per_second."""
+        assert FakeOpenAI().token_delay() == 0.0
+        assert FakeOpenAI(FakeServerConfig(tokens_per_second=50)).token_delay() == 0.02
+
+    def test_split_tokens_round_trips(self):
+        """Test that tokens join back to the original text."""
+        text = "  Hello  world, this is\na test "
+
+        assert "".join(split_tokens(text)) == text
+        assert split_tokens("") == []
+
+    @pytest.mark.parametrize("kwargs", [
+        {"latency_distribution": "gamma"},
+        {"latency_ms": -1},
+        {"tokens_per_second": 0},
+        {"error_rate_429": 0.8, "error_rate_500": 0.3},
+        {"payload_scale": 0},
+    ])
+    def test_invalid_config_raises_error(self, kwargs):
+        """Test that nonsensical settings are rejected."""
+        with pytest.raises(ValueError):
+            FakeServerConfig(**kwargs)
+
+    def test_unknown_fixture_raises_error(self):
+        """Test that a missing fixture name fails fast."""
+        with pytest.raises(ValueError, match="Unknown fixture"):
+            FakeOpenAI(FakeServerConfig(fixture="nope"))
+
+
+@pytest.mark.integration
+class TestFakeServerWithClients:
+    """End-to-end tests through the real OpenAI SDK."""
+
+    def test_search_service_against_fake_server(self, fake_server, test_api_key,
+                                                valid_api_response):
+        """Test a full search round trip."""
+        from src.parser import ResponseParser
+        service = SearchService(api_key=test_api_key, base_url=fake_server.base_url)
+
+        result = service.search("latest technology news")
+
+        expected = ResponseParser().parse(valid_api_response, "latest technology news")
+        assert result.text == expected.text
+        assert result.citations == expected.citations
+        assert result.sources == expected.sources
+        assert fake_server.stats.requests == 1
+
+    def test_streaming_search_against_fake_server(self, fake_server, test_api_key):
+        """Test that a streamed search produces the same result."""
+        service = SearchService(api_key=test_api_key, base_url=fake_server.base_url)
+
+        updates = list(service.search_stream("latest technology news"))
+        expected = service.search("latest technology news")
+
+        result = updates[-1].result
+        assert updates[-1].kind == "done"
+        assert sum(u.kind == "text" for u in updates) > 10
+        assert (result.text, result.citations, result.sources, result.search_id) == (
+            expected.text, expected.citations, expected.sources, expected.search_id
+        )
+        assert fake_server.stats.streamed == 1
+
+    def test_async_client_against_fake_server(self, fake_server, test_api_key):
+        """Test the pooled async client."""
+        async def run():
+            async with AsyncWebSearchClient(api_key=test_api_key,
+                                            base_url=fake_server.base_url) as client:
+                return await asyncio.gather(*(client.search(f"q{i}") for i in range(5)))
+
+        responses = asyncio.run(run())
+
+        assert [r["id"] for r in responses] == ["resp_test123"] * 5
+
+    def test_async_stream_against_fake_server(self, fake_server, test_api_key):
+        """Test that the async client streams through the real AsyncOpenAI SDK."""
+        async def run():
+            async with AsyncWebSearchClient(api_key=test_api_key,
+                                            base_url=fake_server.base_url) as client:
+                return [event["type"] async for event in client.search_stream("bread")]
+
+        types = asyncio.run(run())
+
+        assert types[-1] == "response.completed"
+        assert types.count("response.output_text.delta") > 10
+        assert fake_server.stats.streamed == 1
+
+    def test_chat_completions_stream(self, fake_server, test_api_key):
+        """Test the chat.completions streaming format the Streamlit app uses."""
+        client = OpenAI(api_key=test_api_key, base_url=fake_server.base_url)
+
+        stream = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "hi"}],
+            stream=True,
+        )
+        text = "".join(chunk.choices[0].delta.content or "" for chunk in stream)
+
+        assert text == fake_server.fake.answer_text()
+
+    def test_chat_completions_json(self, fake_server, test_api_key):
+        """Test a non-streamed chat completion."""
+        client = OpenAI(api_key=test_api_key, base_url=fake_server.base_url)
+
+        completion = client.chat.completions.create(
+            model="gpt-4o", messages=[{"role": "user", "content": "hi"}]
+        )
+
+        assert completion.model == "gpt-4o"
+        assert completion.choices[0].message.content == fake_server.fake.answer_text()
+
+    def test_rate_limited_client_against_fake_server(self, fake_server, test_api_key):
+        """Test that reading headers from raw responses still parses both shapes."""
+        client = WebSearchClient(api_key=test_api_key, rate_limiter=RateLimiter(),
+                                 base_url=fake_server.base_url)
+
+        response = client.search("query")
+        events = list(client.search_stream("query"))
+
+        assert response["id"] == "resp_test123"
+        assert events[-1]["type"] == "response.completed"
+
+    def test_injected_429(self, test_api_key):
+        """Test that injected rate limits carry retry-after and map correctly."""
+        config = FakeServerConfig(error_rate_429=1.0, retry_after_ms=250)
+        with FakeOpenAIServer(config) as server:
+            client = WebSearchClient(api_key=test_api_key, rate_limiter=_no_retries(),
+                                     base_url=server.base_url)
+
+            with pytest.raises(SearchError) as exc_info:
+                client.search("query")
+
+        assert exc_info.value.code == "RATE_LIMIT_ERROR"
+        assert server.stats.rate_limited == 1
+
+    def test_injected_500(self, test_api_key):
+        """Test that injected server errors map to API_ERROR."""
+        with FakeOpenAIServer(FakeServerConfig(error_rate_500=1.0)) as server:
+            client = WebSearchClient(api_key=test_api_key, rate_limiter=_no_retries(),
+                                     base_url=server.base_url)
+
+            with pytest.raises(SearchError) as exc_info:
+                client.search("query")
+
+        assert exc_info.value.code == "API_ERROR"
+
+    def test_latency_and_token_rate_are_applied(self, test_api_key):
+        """Test that the configured delays actually slow responses down."""
+        config = FakeServerConfig(fixture="no_citations_response", latency_ms=50,
+                                  tokens_per_second=200)
+        tokens = None
+        with FakeOpenAIServer(config) as server:
+            tokens = len(split_tokens(server.fake.answer_text()))
+            client = WebSearchClient(api_key=test_api_key, base_url=server.base_url)
+
+            started = time.perf_counter()
+            client.search("query")
+            json_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            list(client.search_stream("query"))
+            stream_elapsed = time.perf_counter() - started
+
+        minimum = 0.05 + tokens / 200
+        assert json_elapsed >= minimum
+        assert stream_elapsed >= minimum
+
+    def test_unknown_path_and_bad_body(self, fake_server):
+        """Test 404 and 400 answers."""
+        base = fake_server.base_url
+        assert httpx.post(f"{base}/embeddings", json={}).status_code == 404
+        assert httpx.post(f"{base}/responses", content=b"not json").status_code == 400
+        assert fake_server.stats.requests == 0
+
+    def test_concurrent_requests(self, fake_server, test_api_key):
+        """Test that the server handles requests in parallel."""
+        fake_server.fake.config.latency_ms = 100
+        client = WebSearchClient(api_key=test_api_key, base_url=fake_server.base_url)
+
+        threads = [threading.Thread(target=client.search, args=("q",)) for _ in range(8)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert time.perf_counter() - started < 0.8
+        assert fake_server.stats.requests == 8
+
+
+@pytest.mark.unit
+def test_main_runs_until_interrupted(caplog):
+    """Test the standalone entry point."""
+    with patch("src.fake_server._Server.serve_forever", side_effect=KeyboardInterrupt), \
+            caplog.at_level(logging.INFO):
+        exit_code = main(["--port", "0", "--latency-ms", "10", "--seed", "3"])
+
+    assert exit_code == 0
+    assert "listening on http://127.0.0.1:" in caplog.text
+
+
+@pytest.mark.unit
+def test_stop_without_start():
+    """Test that an unstarted server can still be closed."""
+    FakeOpenAIServer().stop()
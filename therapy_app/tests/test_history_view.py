@@ -0,0 +1,57 @@
+"""
+Unit tests for windowed chat history rendering.
+"""
+
+import pytest
+
+from src.history_view import HistoryView
+
+
+def conversation(count):
+    """count alternating user/assistant messages."""
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+            for i in range(count)]
+
+
+@pytest.mark.unit
+class TestHistoryView:
+    """Paging the visible messages."""
+
+    def test_short_history_is_shown_whole(self):
+        """Test that nothing is hidden while the history fits a page."""
+        hidden, visible = HistoryView(page_size=5).visible(conversation(3))
+
+        assert hidden == 0
+        assert visible == [(m["role"], m["content"]) for m in conversation(3)]
+
+    def test_only_newest_page_is_shown(self):
+        """Test that a long history shows its last page_size messages."""
+        hidden, visible = HistoryView(page_size=5).visible(conversation(12))
+
+        assert hidden == 7
+        assert [content for _, content in visible] == [f"message {i}" for i in range(7, 12)]
+
+    def test_load_earlier_adds_a_page(self):
+        """Test that each load_earlier shows page_size more messages."""
+        view = HistoryView(page_size=5)
+        view.load_earlier()
+
+        assert view.visible(conversation(12))[0] == 2
+        view.load_earlier()
+        assert view.visible(conversation(12))[0] == 0
+
+    def test_cleared_history_resets_the_view(self):
+        """Test that a shorter history goes back to the newest page."""
+        view = HistoryView(page_size=5)
+        view.load_earlier()
+        view.visible(conversation(12))
+
+        view.visible(conversation(2))
+
+        assert view.pages == 1
+        assert view.visible(conversation(12))[0] == 7
+
+    def test_invalid_page_size(self):
+        """Test that an empty page is rejected."""
+        with pytest.raises(ValueError):
+            HistoryView(page_size=0)
@@ -10,7 +10,7 @@ from io import StringIO
 import sys
 
 from src.main import main, parse_arguments, display_results
-from src.models import SearchResult, Citation, Source
+from src.models import SearchResult, Citation, Source, StreamUpdate
 from datetime import datetime
 
 
@@ -206,6 +206,63 @@ class TestMainApplication:
         assert exit_code == 0
 
 
+@pytest.mark.integration
+class TestStreamingOutput:
+    """Test the --stream CLI mode."""
+    
+    def test_parse_arguments_stream_flag(self):
+        """Test parsing the stream flag."""
+        with patch.object(sys, 'argv', ["prog", "test", "--stream"]):
+            args = parse_arguments()
+        
+        assert args.stream is True
+    
+    @patch('src.main.SearchService')
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    def test_main_stream_prints_incrementally(self, mock_service_class, mock_datetime):
+        """Test that streamed text is printed as it arrives."""
+        result = SearchResult(
+            query="AI news",
+            text="Latest AI developments",
+            citations=[Citation("https://example.com", "Example", 0, 6)],
+            sources=[],
+            search_id="id",
+            timestamp=mock_datetime
+        )
+        mock_service = MagicMock()
+        mock_service.search_stream.return_value = iter([
+            StreamUpdate(kind="text", text="Latest AI "),
+            StreamUpdate(kind="citation", citation=result.citations[0]),
+            StreamUpdate(kind="text", text="developments"),
+            StreamUpdate(kind="done", result=result),
+        ])
+        mock_service_class.return_value = mock_service
+        
+        captured_output = StringIO()
+        with patch.object(sys, 'argv', ["prog", "AI news", "--stream"]):
+            with patch('sys.stdout', captured_output):
+                exit_code = main()
+        
+        output = captured_output.getvalue()
+        assert exit_code == 0
+        mock_service.search.assert_not_called()
+        assert "Latest AI developments" in output
+        assert output.count("Latest AI developments") == 1
+        assert "https://example.com" in output
+    
+    def test_display_stream_without_text_updates(self, mock_datetime):
+        """Test that the final text is printed if no deltas were streamed."""
+        from src.main import display_stream
+        result = SearchResult("q", "Cached answer", [], [], "id", mock_datetime)
+        
+        captured_output = StringIO()
+        with patch('sys.stdout', captured_output):
+            returned = display_stream("q", [StreamUpdate(kind="done", result=result)])
+        
+        assert returned is result
+        assert "Cached answer" in captured_output.getvalue()
+
+
 @pytest.mark.unit
 class TestHelperFunctions:
     """Test helper functions in main module."""
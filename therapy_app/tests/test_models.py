@@ -204,6 +204,22 @@ class TestSearchResult:
         assert result_with_citations.has_citations
         assert not result_without_citations.has_citations
 
+    def test_search_result_dict_round_trip(self, mock_datetime):
+        """Test that to_dict/from_dict preserve every field."""
+        result = SearchResult(
+            query="test",
+            text="text",
+            citations=[Citation("https://a.com", "A", 0, 10)],
+            sources=[Source("https://a.com", "web"), Source("", "oai-weather")],
+            search_id="id",
+            timestamp=mock_datetime
+        )
+
+        data = result.to_dict()
+
+        assert data["timestamp"] == mock_datetime.isoformat()
+        assert SearchResult.from_dict(data) == result
+
 
 @pytest.mark.unit
 class TestSearchError:
@@ -156,3 +156,62 @@ class TestResponseParser:
         assert len(sources) == 2
         assert sources[0].type == "web"
         assert sources[1].type == "oai-weather"
+
+
+@pytest.mark.unit
+class TestStreamingResponseParser:
+    """Test incremental parsing of streamed responses."""
+    
+    def test_stream_builds_same_result_as_parse(self, stream_event_dicts,
+                                                valid_api_response, sample_query):
+        """Test that feeding every event reproduces the non-streaming result."""
+        from src.parser import StreamingResponseParser
+        parser = StreamingResponseParser(sample_query)
+        
+        updates = [parser.feed(event) for event in stream_event_dicts]
+        expected = ResponseParser().parse(valid_api_response, sample_query)
+        
+        kinds = [u.kind for u in updates if u is not None]
+        assert kinds[0] == "sources"
+        assert kinds[-1] == "done"
+        assert kinds.count("citation") == 2
+        final = updates[-1].result
+        assert final.text == expected.text
+        assert final.citations == expected.citations
+        assert final.sources == expected.sources
+        assert final.search_id == expected.search_id
+    
+    def test_text_available_before_completion(self, stream_event_dicts, sample_query):
+        """Test that partial text is visible mid-stream."""
+        from src.parser import StreamingResponseParser
+        parser = StreamingResponseParser(sample_query)
+        
+        for event in stream_event_dicts[:3]:
+            parser.feed(event)
+        
+        assert parser.text.startswith("Recent technology news")
+        assert parser.result().citations == []
+    
+    def test_message_item_fills_missing_deltas(self, valid_api_response, sample_query):
+        """Test that a finished message supplies text/citations if no deltas came."""
+        from src.parser import StreamingResponseParser
+        parser = StreamingResponseParser(sample_query)
+        message = valid_api_response["output"][1]
+        message = {**message, "content": [{"type": "refusal"}] + message["content"]}
+        
+        assert parser.feed({"type": "response.output_item.done", "item": message}) is None
+        
+        assert parser.text.startswith("Recent technology news")
+        assert len(parser.citations) == 2
+    
+    @pytest.mark.parametrize("event", [
+        {"type": "response.created"},
+        {"type": "response.output_text.delta", "delta": ""},
+        {"type": "response.output_text.annotation.added", "annotation": {"type": "file_citation"}},
+        {"type": "response.output_item.done", "item": {"type": "reasoning"}},
+    ])
+    def test_uninteresting_events_yield_nothing(self, event, sample_query):
+        """Test that events without new content return None."""
+        from src.parser import StreamingResponseParser
+        
+        assert StreamingResponseParser(sample_query).feed(event) is None
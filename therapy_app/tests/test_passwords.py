@@ -0,0 +1,103 @@
+"""
+Unit tests for the password hasher.
+"""
+
+import threading
+import time
+import weakref
+
+import pytest
+
+from src.passwords import SCHEMES, PasswordHasher, _close_hasher
+
+
+@pytest.fixture
+def pbkdf2():
+    """A PBKDF2 hasher cheap enough for tests."""
+    hasher = PasswordHasher("pbkdf2_sha256", iterations=1000)
+    yield hasher
+    hasher.close()
+
+
+@pytest.mark.unit
+class TestPasswordHasher:
+    """Hashing and verification on the pool."""
+
+    def test_default_scheme_is_legacy_sha256(self):
+        """Test that existing profiles' hashes keep their format."""
+        hasher = PasswordHasher()
+
+        stored = hasher.hash("pw")
+
+        assert len(stored) == 64 and int(stored, 16) >= 0
+        assert hasher.verify("pw", stored)
+        assert not hasher.verify("nope", stored)
+        assert not hasher.needs_rehash(stored)
+
+    def test_pbkdf2_hashes_are_salted(self, pbkdf2):
+        """Test the PBKDF2 format and that equal passwords hash differently."""
+        first, second = pbkdf2.hash("pw"), pbkdf2.hash("pw")
+
+        assert first.startswith("pbkdf2_sha256$1000$") and first != second
+        assert pbkdf2.verify("pw", first) and pbkdf2.verify("pw", second)
+        assert not pbkdf2.verify("nope", first)
+
+    def test_needs_rehash(self, pbkdf2):
+        """Test that legacy and weaker hashes are flagged for an upgrade."""
+        assert pbkdf2.needs_rehash(PasswordHasher().hash("pw"))
+        assert pbkdf2.needs_rehash(PasswordHasher("pbkdf2_sha256", iterations=10).hash("pw"))
+        assert not pbkdf2.needs_rehash(pbkdf2.hash("pw"))
+
+    def test_pbkdf2_hasher_still_verifies_legacy_hashes(self, pbkdf2):
+        """Test that switching schemes doesn't lock anyone out."""
+        assert pbkdf2.verify("pw", PasswordHasher().hash("pw"))
+
+    def test_every_verification_runs_the_kdf(self, pbkdf2, monkeypatch):
+        """Test that a password that verified once is checked again in full."""
+        stored = pbkdf2.hash("pw")
+        calls = []
+        original = pbkdf2._verify
+        monkeypatch.setattr(pbkdf2, "_verify", lambda *args: calls.append(args) or original(*args))
+
+        assert pbkdf2.verify("pw", stored) and pbkdf2.verify("pw", stored)
+        assert pbkdf2.verify_async("pw", stored).result()
+
+        assert len(calls) == 3
+
+    def test_concurrency_is_capped(self, monkeypatch):
+        """Test that no more than max_workers hashes run at once."""
+        hasher = PasswordHasher(max_workers=2)
+        running, peak, lock = [0], [0], threading.Lock()
+        original = hasher._verify
+
+        def slow_verify(*args):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return original(*args)
+
+        monkeypatch.setattr(hasher, "_verify", slow_verify)
+        stored = hasher.hash("pw")
+        futures = [hasher.verify_async("pw", stored) for _ in range(10)]
+
+        assert all(future.result() for future in futures)
+        assert peak[0] == 2
+        hasher.close()
+
+    def test_pool_is_shut_down_at_exit(self):
+        """Test the exit hook, for a live hasher and a collected one."""
+        hasher = PasswordHasher()
+
+        _close_hasher(weakref.ref(hasher))
+        with pytest.raises(RuntimeError):
+            hasher.hash_async("pw")
+        _close_hasher(lambda: None)
+
+    def test_unknown_scheme_raises_error(self):
+        """Test that a typo in the scheme is rejected."""
+        with pytest.raises(ValueError, match="Unknown password scheme"):
+            PasswordHasher("md5")
+        assert "sha256" in SCHEMES
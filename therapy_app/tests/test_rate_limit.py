@@ -0,0 +1,390 @@
+"""
+Unit tests for the client-side rate limiter.
+
+Tests token buckets, header parsing, adaptive limits and 429 retries.
+"""
+
+import asyncio
+import threading
+from email.utils import formatdate
+
+import httpx
+import pytest
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from src.client import WebSearchClient, AsyncWebSearchClient
+from src.models import SearchError
+from src.search_service import SearchService
+from src.rate_limit import (
+    TokenBucket, RateLimiter, parse_duration, parse_retry_after
+)
+
+
+@pytest.fixture
+def limiter(clock):
+    """A limiter of 60 requests/min and 6000 tokens/min on fake time."""
+    return RateLimiter(
+        requests_per_minute=60,
+        tokens_per_minute=6000,
+        expected_output_tokens=0,
+        clock=clock,
+        sleep=clock.sleep,
+        rng=lambda: 1.0,
+    )
+
+
+def _raw(response, headers=None):
+    """What responses.with_raw_response.create returns: headers plus parse()."""
+    return Mock(headers=httpx.Headers(headers or {}), parse=Mock(return_value=response))
+
+
+def _rate_limit_error(headers=None):
+    response = httpx.Response(
+        429,
+        headers=headers or {},
+        request=httpx.Request("POST", "https://api.openai.com/v1/responses"),
+    )
+    return RateLimitError("Rate limit exceeded", response=response, body=None)
+
+
+@pytest.mark.unit
+class TestHeaderParsing:
+    """Tests for duration and retry-after parsing."""
+
+    @pytest.mark.parametrize("value, expected", [
+        ("20ms", 0.02), ("1s", 1.0), ("6m0s", 360.0), ("1h2m3.5s", 3723.5),
+    ])
+    def test_parse_duration(self, value, expected):
+        """Test OpenAI reset duration strings."""
+        assert parse_duration(value) == pytest.approx(expected)
+
+    @pytest.mark.parametrize("value", ["", "soon", "5x", "1s later"])
+    def test_parse_duration_rejects_garbage(self, value):
+        """Test that non-durations are ignored."""
+        assert parse_duration(value) is None
+
+    def test_retry_after_ms_takes_precedence(self):
+        """Test that the millisecond header wins over seconds."""
+        assert parse_retry_after({"retry-after-ms": "250", "retry-after": "9"}) == 0.25
+
+    def test_retry_after_seconds(self):
+        """Test a plain seconds value (bad -ms value is skipped)."""
+        assert parse_retry_after({"retry-after-ms": "x", "retry-after": "3"}) == 3.0
+
+    def test_retry_after_http_date(self):
+        """Test an HTTP-date retry-after value."""
+        headers = {"retry-after": formatdate(1000.0 + 30, usegmt=True)}
+
+        assert parse_retry_after(headers, now=lambda: 1000.0) == pytest.approx(30.0)
+
+    def test_retry_after_missing_or_invalid(self):
+        """Test that absent or unparseable values return None."""
+        assert parse_retry_after({}) is None
+        assert parse_retry_after({"retry-after": "whenever"}) is None
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+
+    def test_burst_then_wait(self, clock):
+        """Test that a full bucket allows a burst, then enforces the rate."""
+        bucket = TokenBucket(60, clock=clock)  # 1 token per second
+
+        waits = [bucket.reserve(1) for _ in range(62)]
+
+        assert waits[:60] == [0.0] * 60
+        assert waits[60:] == [pytest.approx(1.0), pytest.approx(2.0)]
+
+    def test_refill_over_time(self, clock):
+        """Test that tokens come back at the configured rate."""
+        bucket = TokenBucket(60, clock=clock)
+        bucket.reserve(60)
+
+        clock.now += 10
+
+        assert bucket.reserve(10) == 0.0
+        assert bucket.reserve(1) == pytest.approx(1.0)
+
+    def test_clamp_and_set_rate(self, clock):
+        """Test server-driven adjustments."""
+        bucket = TokenBucket(60, clock=clock)
+
+        bucket.clamp(5)
+        assert bucket.available == 5
+        bucket.set_rate(3)
+        assert (bucket.capacity, bucket.available) == (3, 3)
+
+    def test_invalid_rate_raises_error(self):
+        """Test that a zero rate is rejected."""
+        with pytest.raises(ValueError):
+            TokenBucket(0)
+
+    def test_shared_across_threads(self):
+        """Test that concurrent reservations never double-spend tokens."""
+        bucket = TokenBucket(1000)
+
+        threads = [threading.Thread(target=lambda: [bucket.reserve(1) for _ in range(100)])
+                   for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert bucket.available < 1
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Tests for RateLimiter."""
+
+    def test_acquire_blocks_on_request_quota(self, limiter, clock):
+        """Test that the requests/min bucket throttles."""
+        for _ in range(60):
+            assert limiter.acquire() == 0.0
+
+        assert limiter.acquire() == pytest.approx(1.0)
+        assert clock.sleeps == [pytest.approx(1.0)]
+
+    def test_acquire_blocks_on_token_quota(self, limiter):
+        """Test that the tokens/min bucket throttles independently."""
+        limiter.acquire(6000)
+
+        assert limiter.acquire(200) == pytest.approx(2.0)
+
+    def test_acquire_async(self, limiter):
+        """Test the asyncio variant."""
+        limiter.tokens.set_rate(60_000)  # 1000 tokens/s
+        limiter.acquire(60_000)
+
+        waited = asyncio.run(limiter.acquire_async(10))
+
+        assert waited == pytest.approx(0.01)
+
+    def test_estimate_tokens(self, limiter):
+        """Test the prompt + output token estimate."""
+        limiter.expected_output_tokens = 100
+
+        assert limiter.estimate_tokens("a" * 10) == 103
+
+    def test_backoff_is_exponential_and_capped(self, limiter):
+        """Test the backoff schedule with jitter at its maximum."""
+        assert [limiter.backoff_delay(n) for n in range(8)] == [
+            0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 30.0
+        ]
+
+    def test_backoff_jitter(self, clock):
+        """Test that jitter scales the delay."""
+        limiter = RateLimiter(rng=lambda: 0.25)
+
+        assert limiter.backoff_delay(2) == 0.5
+
+    def test_should_retry(self, limiter):
+        """Test the retry budget."""
+        assert limiter.should_retry(4)
+        assert not limiter.should_retry(5)
+
+    def test_retry_after_blocks_every_caller(self, limiter, clock):
+        """Test that a server-requested pause applies to all acquires."""
+        assert limiter.update_from_headers(httpx.Headers({"retry-after": "5"})) == 5.0
+
+        assert limiter.acquire() == pytest.approx(5.0)
+
+    def test_headers_adapt_limits(self, limiter):
+        """Test that server-reported limits and remaining counts are adopted."""
+        limiter.update_from_headers({
+            "x-ratelimit-limit-requests": "30",
+            "x-ratelimit-remaining-requests": "2",
+            "x-ratelimit-limit-tokens": "6000",
+            "x-ratelimit-remaining-tokens": "bogus",
+        })
+
+        assert limiter.requests.capacity == pytest.approx(28.5)  # 95% headroom
+        assert limiter.requests.available == 2
+        assert limiter.tokens.capacity == pytest.approx(5700)
+
+    def test_headers_never_raise_configured_limits(self, limiter):
+        """Test that a server quota above the configured limits leaves them in place."""
+        limiter.update_from_headers({
+            "x-ratelimit-limit-requests": "10000",
+            "x-ratelimit-limit-tokens": "2000",
+        })
+
+        assert limiter.requests.capacity == 60
+        assert limiter.tokens.capacity == pytest.approx(1900)
+
+    def test_exhausted_quota_blocks_until_reset(self, limiter):
+        """Test that remaining=0 with a reset time pauses callers."""
+        limiter.update_from_headers({
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "3s",
+        })
+
+        assert limiter.acquire() >= 3.0
+
+    def test_non_mapping_headers_are_ignored(self, limiter):
+        """Test that a missing response doesn't break the limiter."""
+        assert limiter.update_from_headers(Mock()) is None
+
+    def test_invalid_settings_raise_error(self):
+        """Test that nonsensical retry settings are rejected."""
+        with pytest.raises(ValueError):
+            RateLimiter(max_retries=-1)
+        with pytest.raises(ValueError):
+            RateLimiter(headroom=0)
+
+
+@pytest.mark.unit
+class TestClientRetries:
+    """Tests for 429 handling in the clients."""
+
+    @patch('src.client.OpenAI')
+    def test_sync_client_retries_then_succeeds(self, mock_openai_class, test_api_key,
+                                               mock_response_object, limiter, clock):
+        """Test that a 429 is retried after backoff and the server's retry-after."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.with_raw_response.create.side_effect = [
+            _rate_limit_error({"retry-after": "2"}),
+            _raw(mock_response_object),
+        ]
+        mock_openai_class.return_value = mock_client_instance
+
+        client = WebSearchClient(api_key=test_api_key, rate_limiter=limiter)
+        response = client.search("query")
+
+        assert response["id"] == mock_response_object.id
+        assert mock_openai_class.call_args[1]["max_retries"] == 0
+        # 0.5s backoff, then the remaining 1.5s of the server's 2s pause
+        assert clock.sleeps == [0.5, pytest.approx(1.5)]
+
+    @patch('src.client.OpenAI')
+    def test_sync_client_retries_server_errors(self, mock_openai_class, test_api_key,
+                                               mock_response_object, limiter, clock):
+        """Test that a 500 is retried with the limiter's backoff, as the SDK would."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.with_raw_response.create.side_effect = [
+            InternalServerError("Server error", response=httpx.Response(
+                500, request=httpx.Request("POST", "https://api.openai.com/v1/responses")
+            ), body=None),
+            _raw(mock_response_object),
+        ]
+        mock_openai_class.return_value = mock_client_instance
+
+        client = WebSearchClient(api_key=test_api_key, rate_limiter=limiter)
+        response = client.search("query")
+
+        assert response["id"] == mock_response_object.id
+        assert clock.sleeps == [0.5]
+
+    @patch('src.client.AsyncOpenAI')
+    def test_async_client_retries_connection_errors(self, mock_openai_class, test_api_key,
+                                                    mock_response_object, clock):
+        """Test that a dropped connection is retried by the async client too."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.with_raw_response.create = AsyncMock(side_effect=[
+            APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/responses")),
+            _raw(mock_response_object),
+        ])
+        mock_openai_class.return_value = mock_client_instance
+        limiter = RateLimiter(base_delay=0.001, max_delay=0.002, clock=clock)
+
+        client = AsyncWebSearchClient(api_key=test_api_key, rate_limiter=limiter)
+        response = asyncio.run(client.search("query"))
+
+        assert response["id"] == mock_response_object.id
+        assert mock_client_instance.responses.with_raw_response.create.await_count == 2
+
+    @patch('src.client.OpenAI')
+    def test_sync_client_gives_up_after_max_retries(self, mock_openai_class, test_api_key,
+                                                    clock):
+        """Test that the original error code surfaces once retries run out."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.with_raw_response.create.side_effect = _rate_limit_error()
+        mock_openai_class.return_value = mock_client_instance
+        limiter = RateLimiter(max_retries=2, clock=clock, sleep=clock.sleep)
+
+        client = WebSearchClient(api_key=test_api_key, rate_limiter=limiter)
+
+        with pytest.raises(SearchError) as exc_info:
+            client.search("query")
+
+        assert exc_info.value.code == "RATE_LIMIT_ERROR"
+        assert mock_client_instance.responses.with_raw_response.create.call_count == 3
+
+    @patch('src.client.AsyncOpenAI')
+    def test_async_client_retries(self, mock_openai_class, test_api_key,
+                                  mock_response_object, clock):
+        """Test that the async client shares the same retry behaviour."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.with_raw_response.create = AsyncMock(side_effect=[
+            _rate_limit_error(),
+            _rate_limit_error(),
+            _raw(mock_response_object),
+        ])
+        mock_openai_class.return_value = mock_client_instance
+        limiter = RateLimiter(base_delay=0.001, max_delay=0.002, clock=clock)
+
+        client = AsyncWebSearchClient(api_key=test_api_key, rate_limiter=limiter)
+        response = asyncio.run(client.search("query"))
+
+        assert response["id"] == mock_response_object.id
+        assert mock_client_instance.responses.with_raw_response.create.await_count == 3
+
+    @patch('src.client.OpenAI')
+    def test_successful_response_headers_throttle(self, mock_openai_class, test_api_key,
+                                                  mock_response_object, limiter, clock):
+        """Test that a 200 reporting no remaining requests blocks the next acquire."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.with_raw_response.create.return_value = _raw(
+            mock_response_object,
+            {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "5s"},
+        )
+        mock_openai_class.return_value = mock_client_instance
+        client = WebSearchClient(api_key=test_api_key, rate_limiter=limiter)
+
+        client.search("query")
+        assert clock.sleeps == []
+        client.search("query")
+
+        assert clock.sleeps == [pytest.approx(5.0)]
+
+    @patch('src.client.AsyncOpenAI')
+    def test_async_successful_response_headers_throttle(self, mock_openai_class, test_api_key,
+                                                        mock_response_object, clock):
+        """Test that the async client reads the quota headers of a 200 too."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.with_raw_response.create = AsyncMock(return_value=_raw(
+            mock_response_object, {"x-ratelimit-remaining-requests": "0"}
+        ))
+        mock_openai_class.return_value = mock_client_instance
+        limiter = RateLimiter(requests_per_minute=60, clock=clock)
+        client = AsyncWebSearchClient(api_key=test_api_key, rate_limiter=limiter)
+
+        asyncio.run(client.search("query"))
+
+        assert limiter.requests.reserve(1) == pytest.approx(1.0)
+
+    @patch('src.client.AsyncOpenAI')
+    def test_async_client_gives_up(self, mock_openai_class, test_api_key):
+        """Test that the async client raises once retries are exhausted."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.responses.with_raw_response.create = AsyncMock(
+            side_effect=_rate_limit_error()
+        )
+        mock_openai_class.return_value = mock_client_instance
+
+        client = AsyncWebSearchClient(api_key=test_api_key,
+                                      rate_limiter=RateLimiter(max_retries=0))
+
+        with pytest.raises(SearchError) as exc_info:
+            asyncio.run(client.search("query"))
+
+        assert exc_info.value.code == "RATE_LIMIT_ERROR"
+
+
+def test_search_service_passes_rate_limiter_to_client(test_api_key, limiter):
+    """Test that SearchService wires its limiter into the client."""
+    service = SearchService(api_key=test_api_key, rate_limiter=limiter)
+
+    assert service.client.rate_limiter is limiter
@@ -4,12 +4,17 @@ Unit tests for the search service module.
 Tests the business logic and orchestration layer.
 """
 
+import threading
+import time
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
 
-from src.search_service import SearchService
-from src.models import SearchOptions, SearchResult, SearchError, Citation, Source
+from src.search_service import SearchService, _percentile
+from src.models import (
+    SearchOptions, SearchResult, SearchError, Citation, Source, BatchSearchResult
+)
 
 
 @pytest.mark.unit
@@ -231,3 +236,197 @@ class TestSearchServiceIntegration:
         assert search_result.citations[0].url == "https://example.com"
         mock_client.search.assert_called_once()
         mock_parser.parse.assert_called_once_with(valid_api_response, sample_query)
+
+
+@pytest.mark.unit
+class TestSearchMany:
+    """Test the concurrent batch search API."""
+    
+    @patch('src.search_service.WebSearchClient')
+    def test_search_many_preserves_input_order(self, mock_client_class, test_api_key,
+                                               valid_api_response):
+        """Test that results line up with queries even when they finish out of order."""
+        def slow_then_fast(query, options):
+            # Earlier queries take longer, so completion order is reversed
+            time.sleep(0.01 * (5 - int(query.split()[-1])))
+            return valid_api_response
+        
+        mock_client = MagicMock()
+        mock_client.search.side_effect = slow_then_fast
+        mock_client_class.return_value = mock_client
+        
+        service = SearchService(api_key=test_api_key)
+        queries = [f"query {i}" for i in range(5)]
+        batch = service.search_many(queries, max_concurrency=5)
+        
+        assert isinstance(batch, BatchSearchResult)
+        assert [r.query for r in batch.results] == queries
+        assert batch.stats.total == 5
+        assert batch.stats.succeeded == 5
+        assert batch.stats.queries_per_second > 0
+        assert batch.stats.p99_latency_ms >= batch.stats.p50_latency_ms > 0
+    
+    @patch('src.search_service.WebSearchClient')
+    def test_search_many_respects_max_concurrency(self, mock_client_class, test_api_key,
+                                                  valid_api_response):
+        """Test that no more than max_concurrency searches run at once."""
+        lock = threading.Lock()
+        in_flight = {"now": 0, "peak": 0}
+        
+        def tracked(query, options):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            time.sleep(0.01)
+            with lock:
+                in_flight["now"] -= 1
+            return valid_api_response
+        
+        mock_client = MagicMock()
+        mock_client.search.side_effect = tracked
+        mock_client_class.return_value = mock_client
+        
+        service = SearchService(api_key=test_api_key)
+        service.search_many([f"q{i}" for i in range(12)], max_concurrency=3)
+        
+        assert in_flight["peak"] <= 3
+    
+    @patch('src.search_service.WebSearchClient')
+    def test_search_many_collects_errors_without_aborting(self, mock_client_class,
+                                                          test_api_key, valid_api_response):
+        """Test that failures are returned in place instead of raised."""
+        def flaky(query, options):
+            if query == "bad":
+                raise SearchError(code="RATE_LIMIT_ERROR", message="slow down")
+            return valid_api_response
+        
+        mock_client = MagicMock()
+        mock_client.search.side_effect = flaky
+        mock_client_class.return_value = mock_client
+        
+        service = SearchService(api_key=test_api_key)
+        batch = service.search_many(["good", "bad", "", "also good"])
+        
+        assert isinstance(batch.results[0], SearchResult)
+        assert batch.results[1].code == "RATE_LIMIT_ERROR"
+        assert batch.results[2].code == "VALIDATION_ERROR"
+        assert isinstance(batch.results[3], SearchResult)
+        assert batch.stats.failed == 2
+        assert [e.code for e in batch.errors] == ["RATE_LIMIT_ERROR", "VALIDATION_ERROR"]
+    
+    def test_search_many_empty_batch(self, test_api_key):
+        """Test that an empty batch returns empty results and zeroed stats."""
+        service = SearchService(api_key=test_api_key)
+        
+        batch = service.search_many([])
+        
+        assert batch.results == []
+        assert batch.stats.total == 0
+        assert batch.stats.p50_latency_ms == 0.0
+    
+    def test_search_many_rejects_zero_concurrency(self, test_api_key):
+        """Test that a pool without workers is rejected."""
+        service = SearchService(api_key=test_api_key)
+        
+        with pytest.raises(ValueError, match="max_concurrency"):
+            service.search_many(["query"], max_concurrency=0)
+    
+    def test_percentile_nearest_rank(self):
+        """Test the nearest-rank percentile helper."""
+        samples = [float(i) for i in range(1, 101)]
+        
+        assert _percentile(samples, 50) == 50.0
+        assert _percentile(samples, 99) == 99.0
+        assert _percentile([3.0], 99) == 3.0
+
+
+@pytest.mark.unit
+class TestSearchStream:
+    """Test SearchService.search_stream."""
+    
+    @patch('src.search_service.WebSearchClient')
+    def test_search_stream_yields_text_then_done(self, mock_client_class, test_api_key,
+                                                 sample_query, stream_event_dicts):
+        """Test that text arrives incrementally and the last update is the result."""
+        mock_client = MagicMock()
+        mock_client.search_stream.return_value = iter(stream_event_dicts)
+        mock_client_class.return_value = mock_client
+        
+        service = SearchService(api_key=test_api_key)
+        updates = list(service.search_stream(sample_query))
+        
+        text_updates = [u for u in updates if u.kind == "text"]
+        assert len(text_updates) > 1
+        assert updates[-1].kind == "done"
+        assert updates[-1].result.text == "".join(u.text for u in text_updates)
+        assert len(updates[-1].result.citations) == 2
+    
+    @patch('src.search_service.WebSearchClient')
+    def test_search_stream_without_completed_event(self, mock_client_class, test_api_key,
+                                                   sample_query):
+        """Test that a truncated stream still ends with a done update."""
+        mock_client = MagicMock()
+        mock_client.search_stream.return_value = iter([
+            {"type": "response.output_text.delta", "delta": "partial"}
+        ])
+        mock_client_class.return_value = mock_client
+        
+        service = SearchService(api_key=test_api_key)
+        updates = list(service.search_stream(sample_query))
+        
+        assert updates[-1].kind == "done"
+        assert updates[-1].result.text == "partial"
+    
+    @patch('src.search_service.WebSearchClient')
+    def test_truncated_stream_is_not_cached(self, mock_client_class, test_api_key,
+                                            sample_query):
+        """Test that a stream without response.completed is fetched again next time."""
+        from src.cache import MemoryCache
+        mock_client = MagicMock()
+        mock_client.search_stream.side_effect = lambda *args: iter([
+            {"type": "response.output_text.delta", "delta": "partial"}
+        ])
+        mock_client_class.return_value = mock_client
+        
+        service = SearchService(api_key=test_api_key, cache=MemoryCache())
+        list(service.search_stream(sample_query))
+        list(service.search_stream(sample_query))
+        
+        assert mock_client.search_stream.call_count == 2
+    
+    @patch('src.search_service.WebSearchClient')
+    def test_search_stream_uses_cache(self, mock_client_class, test_api_key,
+                                      sample_query, stream_event_dicts):
+        """Test that a streamed result is cached and replayed."""
+        from src.cache import MemoryCache
+        mock_client = MagicMock()
+        mock_client.search_stream.return_value = iter(stream_event_dicts)
+        mock_client_class.return_value = mock_client
+        
+        service = SearchService(api_key=test_api_key, cache=MemoryCache())
+        first = list(service.search_stream(sample_query))
+        second = list(service.search_stream(sample_query))
+        
+        assert mock_client.search_stream.call_count == 1
+        assert [u.kind for u in second] == ["text", "done"]
+        assert second[-1].result.text == first[-1].result.text
+    
+    @patch('src.search_service.WebSearchClient')
+    def test_search_stream_errors(self, mock_client_class, test_api_key, sample_query):
+        """Test error handling matches search()."""
+        mock_client = MagicMock()
+        mock_client_class.return_value = mock_client
+        service = SearchService(api_key=test_api_key)
+        
+        with pytest.raises(ValueError, match="Invalid query"):
+            list(service.search_stream(""))
+        
+        mock_client.search_stream.side_effect = SearchError(code="API_ERROR", message="down")
+        with pytest.raises(SearchError) as exc_info:
+            list(service.search_stream(sample_query))
+        assert exc_info.value.code == "API_ERROR"
+        
+        mock_client.search_stream.side_effect = RuntimeError("socket closed")
+        with pytest.raises(SearchError) as exc_info:
+            list(service.search_stream(sample_query))
+        assert exc_info.value.code == "SEARCH_FAILED"
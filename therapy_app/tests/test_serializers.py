@@ -0,0 +1,65 @@
+"""
+Unit tests for the profile serializers.
+"""
+
+import pytest
+
+from src import serializers
+from src.serializers import (
+    FORMATS, SUFFIXES, JsonSerializer, available_formats, get_serializer, reader_for
+)
+
+
+PROFILE = {
+    "username": "zoë",
+    "intake_completed": True,
+    "total_sessions": 3,
+    "intake_responses": {"q1": [1, 2], "q2": None},
+    "progress_notes": [{"date": "2025-01-01T09:00:00", "note": "fine ✓", "therapist": None}],
+    "score": 2.5,
+}
+
+
+@pytest.mark.unit
+class TestSerializers:
+    """Round trips and format selection."""
+
+    @pytest.mark.parametrize("name", FORMATS)
+    def test_round_trip(self, name):
+        """Test that every format decodes what it encodes."""
+        serializer = get_serializer(name)
+
+        assert serializer.loads(serializer.dumps(PROFILE)) == PROFILE
+        assert serializer.name == name
+        assert serializer.suffix in SUFFIXES
+
+    def test_compact_formats_are_smaller(self):
+        """Test that the alternatives beat indented JSON on size."""
+        profile = dict(PROFILE, progress_notes=PROFILE["progress_notes"] * 200)
+        sizes = {name: len(get_serializer(name).dumps(profile)) for name in FORMATS}
+
+        assert sizes["orjson"] < sizes["json"]
+        assert sizes["msgpack"] < sizes["orjson"]
+        assert sizes["msgpack+zstd"] < sizes["msgpack"] / 5
+
+    def test_unknown_format_raises_error(self):
+        """Test that typos are rejected."""
+        for name in ("yaml", "json+gzip"):
+            with pytest.raises(ValueError, match="Unknown serialization format"):
+                get_serializer(name)
+
+    def test_missing_package(self, monkeypatch):
+        """Test that formats needing an absent package say which one."""
+        monkeypatch.setattr(serializers, "zstandard", None)
+
+        with pytest.raises(ImportError, match="pip install zstandard"):
+            get_serializer("json+zstd")
+        assert available_formats() == ["json", "orjson", "msgpack"]
+
+    def test_reader_for(self):
+        """Test picking the serializer for a stored file."""
+        preferred = get_serializer("orjson")
+
+        assert reader_for(".json", preferred) is preferred
+        assert reader_for(".msgpack.zst", preferred).name == "msgpack+zstd"
+        assert isinstance(reader_for(".json", get_serializer("msgpack")), JsonSerializer)
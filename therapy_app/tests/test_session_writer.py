@@ -0,0 +1,272 @@
+"""
+Unit tests for background session persistence.
+"""
+
+import logging
+import threading
+import time
+import weakref
+
+import pytest
+
+from src.session_writer import SessionWriter, WriterStats, _close_writer
+from src.user_manager import UserManager
+
+
+def conversation(count):
+    """count alternating user/assistant messages."""
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+            for i in range(count)]
+
+
+def wait_until(condition, timeout=5.0):
+    """Poll condition until it holds; fail the test after timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = UserManager(data_dir=str(tmp_path))
+    manager.create_user("alice", "secret1")
+    manager.create_user("bob", "secret2")
+    return manager
+
+
+@pytest.fixture
+def make_writer(manager):
+    writers = []
+
+    def make(**kwargs):
+        writers.append(SessionWriter(manager, **kwargs))
+        return writers[-1]
+
+    yield make
+    for writer in writers:
+        writer.close(timeout=5.0)
+
+
+def saved_messages(manager, username, session_id):
+    session = manager.load_session(username, session_id)
+    return None if session is None else session["messages"]
+
+
+@pytest.mark.unit
+class TestSessionWriter:
+    """Debouncing, coalescing and flushing saves."""
+
+    def test_save_returns_before_writing(self, manager, make_writer):
+        """Test that a new session gets its ID at once and is written later."""
+        writer = make_writer(debounce=0.05)
+
+        session_id = writer.save("alice", "Dr. Rye", conversation(2))
+
+        assert saved_messages(manager, "alice", session_id) is None
+        wait_until(lambda: writer.stats.writes == 1)
+        assert saved_messages(manager, "alice", session_id) == conversation(2)
+        assert manager.get_user_profile("alice")["total_sessions"] == 1
+
+    def test_bursts_are_coalesced(self, manager, make_writer):
+        """Test that saves of one session within the debounce write once."""
+        writer = make_writer(debounce=0.2)
+        session_id = writer.save("alice", "Dr. Rye", conversation(2))
+        for count in (4, 6, 8):
+            writer.save("alice", "Dr. Rye", conversation(count), session_id)
+
+        wait_until(lambda: writer.stats.writes == 1)
+        time.sleep(0.05)
+
+        stats = writer.stats
+        assert (stats.saves, stats.coalesced, stats.writes) == (4, 3, 1)
+        assert saved_messages(manager, "alice", session_id) == conversation(8)
+
+    def test_max_delay_caps_the_debounce(self, make_writer):
+        """Test that a busy session is written after max_delay anyway."""
+        writer = make_writer(debounce=60.0, max_delay=0.05)
+        writer.save("alice", "Dr. Rye", conversation(2))
+
+        wait_until(lambda: writer.stats.writes == 1)
+        assert writer.stats.last_latency >= 0.05
+
+    def test_caller_list_is_copied(self, manager, make_writer):
+        """Test that messages appended after save() are not written with it."""
+        writer = make_writer(debounce=60.0)
+        messages = conversation(2)
+        session_id = writer.save("alice", "Dr. Rye", messages)
+        messages.append({"role": "user", "content": "later"})
+
+        writer.flush()
+
+        assert saved_messages(manager, "alice", session_id) == conversation(2)
+
+    def test_flush_writes_one_users_sessions(self, manager, make_writer):
+        """Test that flush(username) writes that user's sessions only."""
+        writer = make_writer(debounce=60.0)
+        alice = writer.save("alice", "Dr. Rye", conversation(2))
+        writer.save("bob", "Dr. Naan", conversation(2))
+
+        assert writer.flush("alice")
+
+        assert saved_messages(manager, "alice", alice) == conversation(2)
+        assert writer.stats.depth == 1
+
+    def test_flush_with_nothing_pending(self, make_writer):
+        """Test that flushing an idle writer succeeds at once."""
+        assert make_writer().flush("alice")
+
+    def test_queue_is_bounded(self, make_writer):
+        """Test that save() waits while max_pending sessions are queued."""
+        writer = make_writer(debounce=60.0, max_pending=1)
+        writer.save("alice", "Dr. Rye", conversation(2))
+        blocked = threading.Thread(target=writer.save, args=("bob", "Dr. Naan", conversation(2)))
+        blocked.start()
+        time.sleep(0.05)
+        assert blocked.is_alive()
+        assert writer.stats.max_depth == 1
+
+        writer.flush("alice")
+
+        blocked.join(5.0)
+        assert not blocked.is_alive()
+        assert writer.stats.depth == 1
+
+    def test_failed_write_is_retried(self, manager, make_writer, monkeypatch, caplog):
+        """Test that a failing write is logged and retried after the debounce."""
+        log_session = manager.log_session
+        calls = []
+
+        def flaky(*args, **kwargs):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise OSError("disk full")
+            return log_session(*args, **kwargs)
+
+        monkeypatch.setattr(manager, "log_session", flaky)
+        writer = make_writer(debounce=0.05, max_delay=0.0)
+
+        with caplog.at_level(logging.ERROR):
+            session_id = writer.save("alice", "Dr. Rye", conversation(2))
+            wait_until(lambda: writer.stats.writes == 1)
+
+        assert writer.stats.failures == 1
+        assert calls[1] - calls[0] >= 0.05
+        assert "Could not save session" in caplog.text
+        assert saved_messages(manager, "alice", session_id) == conversation(2)
+
+    def test_flush_reports_failed_write(self, manager, make_writer, monkeypatch, caplog):
+        """Test that flush() returns False when a session could not be written."""
+        def failing(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(manager, "log_session", failing)
+        writer = make_writer(debounce=60.0)
+        writer.save("alice", "Dr. Rye", conversation(2))
+
+        with caplog.at_level(logging.WARNING):
+            assert not writer.flush("alice")
+
+        assert "1 session(s) for alice not saved by flush" in caplog.text
+        monkeypatch.undo()
+
+    def test_newer_save_during_failed_write_is_kept(self, manager, make_writer, monkeypatch):
+        """Test that a failed write does not replace a newer transcript."""
+        log_session = manager.log_session
+        started, release = threading.Event(), threading.Event()
+
+        def slow_failure(*args, **kwargs):
+            if not started.is_set():
+                started.set()
+                release.wait(5.0)
+                raise OSError("disk full")
+            return log_session(*args, **kwargs)
+
+        monkeypatch.setattr(manager, "log_session", slow_failure)
+        writer = make_writer(debounce=0.01)
+        session_id = writer.save("alice", "Dr. Rye", conversation(2))
+        started.wait(5.0)
+        writer.save("alice", "Dr. Rye", conversation(4), session_id)
+        release.set()
+
+        wait_until(lambda: writer.stats.writes == 1)
+        assert saved_messages(manager, "alice", session_id) == conversation(4)
+
+    def test_flush_waits_for_write_in_flight(self, manager, make_writer, monkeypatch):
+        """Test that flush() covers a session the worker is writing."""
+        log_session = manager.log_session
+        started, release = threading.Event(), threading.Event()
+
+        def slow(*args, **kwargs):
+            started.set()
+            release.wait(5.0)
+            return log_session(*args, **kwargs)
+
+        monkeypatch.setattr(manager, "log_session", slow)
+        writer = make_writer(debounce=0.0)
+        writer.save("alice", "Dr. Rye", conversation(2))
+        started.wait(5.0)
+
+        assert not writer.flush("alice", timeout=0.05)
+        release.set()
+        assert writer.flush("alice", timeout=5.0)
+
+    def test_close_writes_pending_and_stops(self, manager, make_writer):
+        """Test that close() saves everything and rejects later saves."""
+        writer = make_writer(debounce=60.0)
+        session_id = writer.save("alice", "Dr. Rye", conversation(2))
+
+        assert writer.close()
+        assert writer.close()
+
+        assert saved_messages(manager, "alice", session_id) == conversation(2)
+        with pytest.raises(RuntimeError):
+            writer.save("alice", "Dr. Rye", conversation(4), session_id)
+
+    def test_close_wakes_blocked_save(self, manager, make_writer, monkeypatch):
+        """Test that a save waiting for room fails once the writer closes."""
+        monkeypatch.setattr(manager, "log_session", lambda *args, **kwargs: time.sleep(60))
+        writer = make_writer(debounce=60.0, max_pending=1)
+        writer.save("alice", "Dr. Rye", conversation(2))
+        errors = []
+
+        def save():
+            try:
+                writer.save("bob", "Dr. Naan", conversation(2))
+            except RuntimeError as e:
+                errors.append(e)
+
+        blocked = threading.Thread(target=save)
+        blocked.start()
+        time.sleep(0.05)
+        with writer._cond:
+            writer._closed = True
+            writer._cond.notify_all()
+        blocked.join(5.0)
+
+        assert errors
+
+    def test_close_at_exit(self, manager):
+        """Test the atexit hook for live and collected writers."""
+        writer = SessionWriter(manager, debounce=60.0)
+        session_id = writer.save("alice", "Dr. Rye", conversation(2))
+
+        _close_writer(weakref.ref(writer))
+        _close_writer(lambda: None)
+
+        assert saved_messages(manager, "alice", session_id) == conversation(2)
+
+    def test_invalid_max_pending(self, manager):
+        """Test that an unbounded-to-nothing queue is rejected."""
+        with pytest.raises(ValueError):
+            SessionWriter(manager, max_pending=0)
+
+
+@pytest.mark.unit
+class TestWriterStats:
+    """Latency arithmetic."""
+
+    def test_mean_latency(self):
+        """Test the mean over completed writes."""
+        assert WriterStats(writes=4, total_latency=2.0).mean_latency == 0.5
+        assert WriterStats().mean_latency == 0.0
@@ -0,0 +1,134 @@
+"""
+Unit tests for in-flight request coalescing.
+
+Tests SingleFlight directly and its use inside SearchService.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.cache import MemoryCache
+from src.models import SearchError
+from src.search_service import SearchService
+from src.singleflight import SingleFlight
+
+
+def _run_concurrently(count, fn):
+    """Call fn from `count` threads released at the same moment."""
+    barrier = threading.Barrier(count)
+
+    def worker(_):
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(worker, range(count)))
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    """Tests for the SingleFlight primitive."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that overlapping callers run the function once."""
+        flight = SingleFlight()
+        executions = []
+
+        def work():
+            executions.append(1)
+            time.sleep(0.05)
+            return object()
+
+        outcomes = _run_concurrently(8, lambda: flight.do("key", work))
+
+        assert len(executions) == 1
+        assert len({id(result) for result, _ in outcomes}) == 1
+        assert sum(shared for _, shared in outcomes) == 7
+        stats = flight.stats
+        assert (stats.calls, stats.executions, stats.coalesced, stats.in_flight) == (8, 1, 7, 0)
+
+    def test_sequential_calls_are_not_coalesced(self):
+        """Test that a finished call is forgotten."""
+        flight = SingleFlight()
+
+        first, first_shared = flight.do("key", lambda: 1)
+        second, second_shared = flight.do("key", lambda: 2)
+
+        assert (first, second) == (1, 2)
+        assert not first_shared and not second_shared
+        assert flight.stats.executions == 2
+
+    def test_error_is_raised_in_every_waiter(self):
+        """Test that the leader's exception reaches all coalesced callers."""
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.05)
+            raise SearchError(code="API_ERROR", message="down")
+
+        def call():
+            try:
+                flight.do("key", fail)
+            except SearchError as e:
+                return e.code
+
+        assert _run_concurrently(4, call) == ["API_ERROR"] * 4
+        assert flight.stats.in_flight == 0
+
+
+@pytest.mark.unit
+class TestSearchServiceCoalescing:
+    """Tests for duplicate-search coalescing in SearchService."""
+
+    @patch('src.search_service.WebSearchClient')
+    def test_identical_concurrent_searches_share_request(self, mock_client_class,
+                                                         test_api_key, valid_api_response):
+        """Test that a burst of identical queries makes one upstream call."""
+        def slow_search(query, options):
+            time.sleep(0.05)
+            return valid_api_response
+
+        mock_client = MagicMock()
+        mock_client.search.side_effect = slow_search
+        mock_client_class.return_value = mock_client
+
+        service = SearchService(api_key=test_api_key)
+        results = _run_concurrently(10, lambda: service.search("breaking news"))
+
+        assert mock_client.search.call_count == 1
+        assert all(result is results[0] for result in results)
+        assert service.coalescing_stats.coalesced == 9
+
+    @patch('src.search_service.WebSearchClient')
+    def test_coalescing_can_be_disabled(self, mock_client_class, test_api_key,
+                                        valid_api_response):
+        """Test that every call hits the API when coalescing is off."""
+        mock_client = MagicMock()
+        mock_client.search.return_value = valid_api_response
+        mock_client_class.return_value = mock_client
+
+        service = SearchService(api_key=test_api_key, coalesce_requests=False)
+        service.search("news")
+        service.search("news")
+
+        assert mock_client.search.call_count == 2
+        assert service.coalescing_stats is None
+
+    @patch('src.search_service.WebSearchClient')
+    def test_cache_without_coalescing(self, mock_client_class, test_api_key,
+                                      valid_api_response):
+        """Test that the cache still works when coalescing is off."""
+        mock_client = MagicMock()
+        mock_client.search.return_value = valid_api_response
+        mock_client_class.return_value = mock_client
+
+        service = SearchService(api_key=test_api_key, cache=MemoryCache(),
+                                coalesce_requests=False)
+        service.search("news")
+        service.search("news")
+
+        assert mock_client.search.call_count == 1
@@ -0,0 +1,920 @@
+"""
+Unit tests for the UserManager storage backends.
+
+The same behavioural tests run against every backend; SQLite-specific
+layout and the JSON-to-SQLite migration are tested separately.
+"""
+
+import builtins
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.storage import (
+    LOCK_STRIPES, JsonUserStore, SQLiteUserStore, MigrationReport, ProfileCache, ShardingReport,
+    main, migrate_json_to_sqlite, migrate_to_sharded, open_store, shard_path
+)
+from src.user_manager import UserManager
+
+
+def _hammer_profile(data_dir, backend, worker, threads, writes):
+    """Add notes and per-thread fields to alice's profile from several threads."""
+    store = open_store(data_dir, backend)
+    manager = UserManager(data_dir=data_dir, storage=store)
+
+    def work(thread):
+        for i in range(writes):
+            manager.add_progress_note("alice", f"{worker}-{thread}-{i}")
+            manager.update_user_profile("alice", {f"w{worker}t{thread}": i})
+
+    pool = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    store.close()
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def manager(request, tmp_path):
+    """A UserManager on each storage backend."""
+    store = open_store(tmp_path, request.param)
+    yield UserManager(data_dir=tmp_path, storage=store)
+    store.close()
+
+
+@pytest.mark.unit
+class TestBackendContract:
+    """Behaviour every backend must share."""
+
+    def test_profile_round_trip(self, manager):
+        """Test that a created profile reads back with every default field."""
+        assert manager.create_user("alice", "pw", {"age_range": "25-34"})
+        assert not manager.create_user("alice", "other")
+
+        profile = manager.get_user_profile("alice")
+
+        assert list(profile)[:12] == [
+            "username", "password_hash", "created_at", "last_login", "assigned_therapist",
+            "recommended_therapist", "intake_completed", "intake_responses", "therapy_goals",
+            "progress_notes", "total_sessions", "session_history",
+        ]
+        assert profile["age_range"] == "25-34"
+        assert profile["intake_completed"] is False
+        assert manager.get_user_profile("nobody") is None
+
+    def test_authenticate_updates_last_login(self, manager):
+        """Test login and the last_login update."""
+        manager.create_user("alice", "pw")
+
+        assert manager.authenticate("alice", "pw")
+        assert not manager.authenticate("alice", "wrong")
+        assert not manager.authenticate("bob", "pw")
+        assert manager.get_user_profile("alice")["last_login"] is not None
+
+    def test_iter_intake_responses(self, manager):
+        """Test streaming intake answers for users who have given them."""
+        for username in ("carol", "alice", "bob"):
+            manager.create_user(username, "pw")
+        manager.save_intake_assessment("carol", {"primary_concern": 1, "goals": "rest"}, "Rye")
+        manager.save_intake_assessment("alice", {"timeline": 0}, "Rye")
+        if isinstance(manager.storage, JsonUserStore):
+            (manager.storage._get_profile_path("alice").parent / "README.txt").write_text("x")
+
+        assert sorted(manager.iter_intake_responses()) == [
+            ("alice", {"timeline": 0}),
+            ("carol", {"primary_concern": 1, "goals": "rest"}),
+        ]
+        if isinstance(manager.storage, SQLiteUserStore):
+            assert [name for name, _ in manager.storage.iter_intake_responses(page_size=1)] == [
+                "alice", "carol"
+            ]
+
+    def test_updates_of_every_field_kind(self, manager):
+        """Test column, child-table and free-form field updates."""
+        manager.create_user("alice", "pw")
+        manager.save_intake_assessment("alice", {"primary_concern": 0, "goals": "sleep"}, "Rye")
+        manager.set_therapy_goals("alice", ["walk daily", "journal"])
+        manager.add_progress_note("alice", "first", "Rye")
+        manager.add_progress_note("alice", "second")
+        manager.update_user_profile("alice", {"assigned_therapist": "Rye", "theme": "dark"})
+
+        profile = manager.get_user_profile("alice")
+
+        assert profile["intake_completed"] is True
+        assert profile["intake_responses"] == {"primary_concern": 0, "goals": "sleep"}
+        assert profile["recommended_therapist"] == "Rye"
+        assert "intake_date" in profile
+        assert profile["therapy_goals"] == ["walk daily", "journal"]
+        assert [n["note"] for n in profile["progress_notes"]] == ["first", "second"]
+        assert profile["progress_notes"][0]["therapist"] == "Rye"
+        assert (profile["assigned_therapist"], profile["theme"]) == ("Rye", "dark")
+
+        manager.update_user_profile("alice", {"therapy_goals": ["rest"]})
+        assert manager.get_user_profile("alice")["therapy_goals"] == ["rest"]
+
+    def test_missing_user_updates_fail(self, manager):
+        """Test that writes to an unknown user report failure."""
+        assert not manager.update_user_profile("bob", {"theme": "dark"})
+        assert not manager.add_progress_note("bob", "note")
+
+    def test_sessions(self, manager):
+        """Test logging sessions and reading them back."""
+        manager.create_user("alice", "pw")
+        messages = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+
+        session_id = manager.log_session("alice", "Rye", messages)
+        manager.log_session("bob", "Rye", [])  # no profile, transcript still saved
+
+        profile = manager.get_user_profile("alice")
+        assert profile["total_sessions"] == 1
+        assert profile["session_history"][0]["session_id"] == session_id
+        assert profile["session_history"][0]["message_count"] == 2
+
+        sessions = manager.get_session_history("alice")
+        assert len(sessions) == 1
+        assert "messages" not in sessions[0]
+        assert sessions[0]["username"] == "alice"
+        assert manager.load_session("alice", session_id)["messages"] == messages
+        assert manager.load_session("alice", "nope") is None
+        assert len(manager.get_session_history("bob")) == 1
+        assert [s["messages"] for s in manager.storage.get_sessions("alice")] == [messages]
+
+    def test_history_paging_and_filters(self, manager):
+        """Test limit, before and therapist on the session index."""
+        manager.create_user("alice", "pw")
+        for i, therapist in enumerate(["Rye", "Naan", "Rye", "Rye", "Naan"]):
+            manager.log_session("alice", therapist, [{"role": "user", "content": str(i)}] * i,
+                                session_id=f"2025010{i}_090000")
+
+        def ids(history):
+            return [s["session_id"][7] for s in history]
+
+        assert ids(manager.get_session_history("alice")) == ["0", "1", "2", "3", "4"]
+        assert ids(manager.get_session_history("alice", limit=2)) == ["3", "4"]
+        assert ids(manager.get_session_history("alice", limit=2, before="20250103_090000")) == [
+            "1", "2"
+        ]
+        assert ids(manager.get_session_history("alice", therapist="Rye")) == ["0", "2", "3"]
+        assert ids(manager.get_session_history("alice", limit=0)) == []
+        assert manager.get_session_history("alice", limit=1)[0]["message_count"] == 4
+
+    def test_checkpoints_extend_one_session(self, manager):
+        """Test that repeated checkpoints of a chat build a single transcript."""
+        manager.create_user("alice", "pw")
+        chat = [{"role": "user", "content": f"m{i}"} for i in range(10)]
+
+        session_id = manager.log_session("alice", "Rye", chat[:4])
+        assert manager.log_session("alice", "Rye", chat[:8], session_id=session_id) == session_id
+        assert manager.log_session("alice", "Rye", chat[:8], session_id=session_id) == session_id
+        manager.log_session("alice", "Rye", chat, session_id=session_id)
+
+        sessions = manager.get_session_history("alice")
+        profile = manager.get_user_profile("alice")
+        assert len(sessions) == 1
+        assert sessions[0]["message_count"] == 10
+        assert manager.load_session("alice", session_id)["messages"] == chat
+        assert profile["total_sessions"] == 1
+        assert profile["session_history"][0]["message_count"] == 10
+
+    def test_unknown_session_id_starts_that_session(self, manager):
+        """Test that checkpointing an unsaved id creates it."""
+        manager.create_user("alice", "pw")
+
+        session_id = manager.log_session("alice", "Rye", [{"role": "user", "content": "hi"}],
+                                         session_id="20250101_120000")
+
+        assert session_id == "20250101_120000"
+        assert manager.get_session_history("alice")[0]["session_id"] == session_id
+        assert manager.get_user_profile("alice")["total_sessions"] == 1
+
+
+@pytest.mark.unit
+class TestJsonSessionJournal:
+    """JSON Lines journal layout and recovery."""
+
+    def test_checkpoint_appends_only_new_messages(self, tmp_path):
+        """Test that each checkpoint adds lines instead of rewriting the file."""
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path))
+        manager.create_user("alice", "pw")
+        chat = [{"role": "user", "content": f"m{i}"} for i in range(8)]
+
+        session_id = manager.log_session("alice", "Rye", chat[:4])
+        journal = manager.storage._get_session_path("alice") / f"session_{session_id}.jsonl"
+        first = journal.read_text()
+        manager.log_session("alice", "Rye", chat, session_id=session_id)
+
+        contents = journal.read_text()
+        assert contents.startswith(first)
+        assert len(contents.splitlines()) == 1 + 8
+        index = json.loads((manager.storage._get_session_path("alice") / "index.json").read_text())
+        assert index[session_id]["message_count"] == 8
+
+    def test_duplicate_and_torn_records_are_skipped(self, tmp_path):
+        """Test recovery from a crash between journal and index writes."""
+        store = JsonUserStore(tmp_path)
+        manager = UserManager(data_dir=tmp_path, storage=store)
+        chat = [{"role": "user", "content": f"m{i}"} for i in range(3)]
+        session_id = manager.log_session("alice", "Rye", chat)
+
+        journal = manager.storage._get_session_path("alice") / f"session_{session_id}.jsonl"
+        with open(journal, "a") as f:
+            f.write(json.dumps({"seq": 1, "message": chat[1]}) + "\n")
+            f.write(json.dumps({"seq": 3, "message": {"role": "user", "content": "unindexed"}}) + "\n")
+            f.write('{"seq": 4, "mess')
+
+        assert manager.load_session("alice", session_id)["messages"] == chat
+
+        # The next checkpoint truncates the unindexed tail before appending
+        chat.append({"role": "assistant", "content": "m3"})
+        manager.log_session("alice", "Rye", chat, session_id=session_id)
+        assert manager.load_session("alice", session_id)["messages"] == chat
+        assert len(journal.read_text().splitlines()) == 1 + 4
+
+    def test_journals_without_offsets_are_read(self, tmp_path):
+        """Test index entries written before byte offsets were recorded."""
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path))
+        chat = [{"role": "user", "content": f"m{i}"} for i in range(3)]
+        session_id = manager.log_session("alice", "Rye", chat[:2])
+        index_path = manager.storage._get_session_path("alice") / "index.json"
+        index = json.loads(index_path.read_text())
+        del index[session_id]["offset"]
+        index_path.write_text(json.dumps(index))
+        journal = manager.storage._get_session_path("alice") / f"session_{session_id}.jsonl"
+        with open(journal, "a") as f:
+            f.write(json.dumps({"seq": 1, "message": chat[1]}) + "\n")
+            f.write('{"seq": 2, "mess')
+
+        assert manager.load_session("alice", session_id)["messages"] == chat[:2]
+        manager.log_session("alice", "Rye", chat, session_id=session_id)
+        assert manager.load_session("alice", session_id)["messages"] == chat
+
+    def test_listing_sessions_does_not_create_directories(self, tmp_path):
+        """Test that listing a user without sessions leaves the tree untouched."""
+        store = JsonUserStore(tmp_path)
+
+        assert store.list_sessions("nobody") == []
+        assert store.list_sessions("nobody") == []
+
+        assert not store._session_dir("nobody").exists()
+
+    def test_legacy_session_documents_are_read(self, tmp_path, monkeypatch):
+        """Test that session_<id>.json files from older versions still load."""
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path))
+        legacy_dir = manager.storage._get_session_path("alice")
+        (legacy_dir / "session_20240101_090000.json").write_text(json.dumps({
+            "session_id": "20240101_090000", "username": "alice", "therapist": "Rye",
+            "start_time": "2024-01-01T09:00:00", "messages": [], "message_count": 0,
+        }))
+        manager.log_session("alice", "Naan", [])
+
+        sessions = manager.get_session_history("alice")
+
+        assert [s["therapist"] for s in sessions] == ["Rye", "Naan"]
+        assert manager.load_session("alice", "20240101_090000")["therapist"] == "Rye"
+
+        # Once indexed, listing no longer opens the legacy document
+        opened = []
+        monkeypatch.setattr("src.storage.open", lambda file, *args, **kwargs: (
+            opened.append(Path(file).name) or builtins.open(file, *args, **kwargs)
+        ), raising=False)
+        assert len(manager.get_session_history("alice")) == 2
+        assert opened == ["index.json"]
+        monkeypatch.undo()
+
+        # The directory is scanned once per process; a new store indexes
+        # documents copied in since
+        (legacy_dir / "session_20240102_090000.json").write_text(json.dumps({
+            "session_id": "20240102_090000", "username": "alice", "therapist": "Rye",
+            "start_time": "2024-01-02T09:00:00", "messages": [], "message_count": 0,
+        }))
+        assert len(manager.get_session_history("alice")) == 2
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path))
+        assert len(manager.get_session_history("alice")) == 3
+
+        # Checkpointing a legacy id replaces it with a journal
+        chat = [{"role": "user", "content": "again"}]
+        manager.log_session("alice", "Rye", chat, session_id="20240101_090000")
+        assert manager.load_session("alice", "20240101_090000")["messages"] == chat
+
+    def test_checkpointing_a_legacy_session_counts_it_once(self, tmp_path):
+        """Test that repeated checkpoints of a legacy document neither recount nor re-list it."""
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path))
+        manager.create_user("alice", "pw")
+        manager.update_user_profile("alice", {"total_sessions": 1, "session_history": [
+            {"session_id": "20240101_090000", "therapist": "Rye", "message_count": 1}]})
+        legacy_dir = manager.storage._get_session_path("alice")
+        hello = {"role": "user", "content": "hello"}
+        (legacy_dir / "session_20240101_090000.json").write_text(json.dumps({
+            "session_id": "20240101_090000", "username": "alice", "therapist": "Rye",
+            "start_time": "2024-01-01T09:00:00", "messages": [hello], "message_count": 1,
+        }))
+        chat = [hello] + [{"role": "user", "content": f"m{i}"} for i in range(4)]
+
+        for count in (1, 2, 3, 5):
+            manager.log_session("alice", "Rye", chat[:count], session_id="20240101_090000")
+
+        profile = manager.get_user_profile("alice")
+        assert profile["total_sessions"] == 1
+        assert profile["session_history"] == [
+            {"session_id": "20240101_090000", "therapist": "Rye", "message_count": 5}]
+        assert manager.load_session("alice", "20240101_090000")["messages"] == chat
+        assert not (legacy_dir / "session_20240101_090000.json").exists()
+        assert [s["message_count"] for s in manager.get_session_history("alice")] == [5]
+
+    def test_checkpoint_does_not_rewrite_the_profile(self, tmp_path):
+        """Test that a checkpoint writes only the journal and index, yet counts stay current."""
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path))
+        manager.create_user("alice", "pw")
+        chat = [{"role": "user", "content": f"m{i}"} for i in range(6)]
+        session_id = manager.log_session("alice", "Rye", chat[:2])
+        profile_path = manager.storage._get_profile_path("alice")
+        before = profile_path.stat().st_mtime_ns, profile_path.read_bytes()
+
+        manager.log_session("alice", "Rye", chat, session_id=session_id)
+
+        assert (profile_path.stat().st_mtime_ns, profile_path.read_bytes()) == before
+        summary, = manager.get_user_profile("alice")["session_history"]
+        assert summary["message_count"] == 6
+        fresh = JsonUserStore(tmp_path).get_profile("alice")
+        assert fresh["session_history"][0]["message_count"] == 6
+
+
+@pytest.mark.unit
+class TestSQLiteUserStore:
+    """SQLite-specific behaviour."""
+
+    def test_wal_mode_and_indexed_tables(self, tmp_path):
+        """Test that the database uses WAL and has one table per collection."""
+        store = SQLiteUserStore(tmp_path / "users.db")
+        store.close()
+
+        conn = sqlite3.connect(tmp_path / "users.db")
+        tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+
+        assert tables == {"users", "intake_responses", "goals", "progress_notes", "sessions",
+                          "session_messages"}
+        assert mode == "wal"
+
+    def test_progress_note_is_a_single_insert(self, tmp_path):
+        """Test that adding a note doesn't rewrite the rest of the profile."""
+        store = SQLiteUserStore(tmp_path / "users.db")
+        manager = UserManager(data_dir=tmp_path, storage=store)
+        manager.create_user("alice", "pw")
+        manager.set_therapy_goals("alice", ["a", "b"])
+
+        statements = []
+        store._conn.set_trace_callback(statements.append)
+        manager.add_progress_note("alice", "note")
+        store._conn.set_trace_callback(None)
+
+        writes = [s for s in statements if s.split()[0] in ("INSERT", "UPDATE", "DELETE")]
+        assert len(writes) == 1 and writes[0].startswith("INSERT INTO progress_notes")
+        store.close()
+
+    def test_profile_write_only_inserts_new_notes(self, tmp_path):
+        """Test that a stale profile write adds its note without touching the others."""
+        store = SQLiteUserStore(tmp_path / "users.db", window=3)
+        manager = UserManager(data_dir=tmp_path, storage=store)
+        manager.create_user("alice", "pw")
+        for i in range(5):
+            manager.add_progress_note("alice", f"note {i}")
+        stale = manager.get_user_profile("alice")
+        manager.add_progress_note("alice", "concurrent")
+
+        stale["progress_notes"].append({"date": "2099-01-01T00:00:00", "note": "mine",
+                                        "therapist": None})
+        statements = []
+        store._conn.set_trace_callback(statements.append)
+        store.update_profile("alice", {"progress_notes": stale["progress_notes"]})
+        store._conn.set_trace_callback(None)
+
+        writes = [s for s in statements if s.split()[0] in ("INSERT", "UPDATE", "DELETE")]
+        assert len(writes) == 1 and writes[0].startswith("INSERT INTO progress_notes")
+        notes = store.load_archive("alice", "progress_notes") + store.get_profile("alice")["progress_notes"]
+        assert [n["note"] for n in notes] == [f"note {i}" for i in range(5)] + ["concurrent", "mine"]
+        store.close()
+
+    def test_data_survives_reopen(self, tmp_path):
+        """Test persistence across store instances."""
+        store = SQLiteUserStore(tmp_path / "users.db")
+        UserManager(data_dir=tmp_path, storage=store).create_user("alice", "pw")
+        store.close()
+
+        reopened = SQLiteUserStore(tmp_path / "users.db")
+        assert reopened.get_profile("alice")["username"] == "alice"
+        reopened.close()
+
+
+@pytest.mark.unit
+class TestProfileCache:
+    """Write-through profile caching in the stores."""
+
+    def test_lru_eviction_and_stats(self):
+        """Test that the least recently used profile is evicted first."""
+        cache = ProfileCache(max_entries=2)
+        cache.put("a", 1, {"username": "a"})
+        cache.put("b", 1, {"username": "b"})
+        cache.get("a", 1)
+        cache.put("c", 1, {"username": "c"})
+
+        assert cache.get("b", 1) is None
+        assert cache.get("a", 1) == {"username": "a"}
+        assert cache.get("a", 2) is None
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.evictions, stats.expirations, stats.entries) == (
+            2, 2, 1, 1, 1
+        )
+
+    def test_entries_are_copied(self):
+        """Test that callers can't mutate what the cache holds."""
+        cache = ProfileCache()
+        profile = {"goals": ["a"]}
+        cache.put("a", 1, profile)
+        profile["goals"].append("b")
+        cache.get("a", 1)["goals"].append("c")
+
+        assert cache.get("a", 1) == {"goals": ["a"]}
+
+    def test_size_zero_disables_and_negative_is_rejected(self):
+        """Test the cache size bounds."""
+        cache = ProfileCache(max_entries=0)
+        cache.put("a", 1, {})
+        assert cache.get("a", 1) is None
+
+        with pytest.raises(ValueError):
+            ProfileCache(max_entries=-1)
+
+    def test_hot_json_profile_is_not_reread(self, tmp_path, monkeypatch):
+        """Test that reads and writes of a cached profile skip reading the file."""
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path))
+        manager.create_user("alice", "pw")
+        reads = []
+
+        def counting_open(file, mode="r", *args, **kwargs):
+            if "r" in mode and Path(file).suffix == ".json":
+                reads.append(file)
+            return builtins.open(file, mode, *args, **kwargs)
+
+        monkeypatch.setattr("src.storage.open", counting_open, raising=False)
+        manager.get_user_profile("alice")
+        manager.add_progress_note("alice", "note")
+        manager.log_session("alice", "Rye", [{"role": "user", "content": "hi"}])
+        profile = manager.get_user_profile("alice")
+
+        assert [r for r in reads if "profiles" in str(r)] == []
+        assert profile["total_sessions"] == 1
+        assert profile["progress_notes"][0]["note"] == "note"
+
+    def test_external_json_change_is_seen(self, tmp_path):
+        """Test that a profile rewritten by another process is reloaded."""
+        store = JsonUserStore(tmp_path)
+        manager = UserManager(data_dir=tmp_path, storage=store)
+        manager.create_user("alice", "pw")
+        manager.get_user_profile("alice")
+
+        other = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path, cache_size=0))
+        other.set_therapy_goals("alice", ["sleep more", "and longer"])
+
+        assert manager.get_user_profile("alice")["therapy_goals"] == ["sleep more", "and longer"]
+        manager.storage._get_profile_path("alice").unlink()
+        assert manager.get_user_profile("alice") is None
+        assert store.profile_cache.stats.entries == 0
+
+    def test_sqlite_cache_follows_every_writer(self, tmp_path):
+        """Test hits between writes and invalidation on own and foreign commits."""
+        store = SQLiteUserStore(tmp_path / "users.db")
+        manager = UserManager(data_dir=tmp_path, storage=store)
+        manager.create_user("alice", "pw")
+        manager.get_user_profile("alice")
+        manager.get_user_profile("alice")
+        assert store.profile_cache.stats.hits == 1
+
+        manager.add_progress_note("alice", "note")
+        session_id = manager.log_session("alice", "Rye", [{"role": "user", "content": "hi"}])
+        manager.log_session("alice", "Rye", [{"role": "user", "content": "hi"}] * 2,
+                            session_id=session_id)
+        profile = manager.get_user_profile("alice")
+        assert profile["progress_notes"][0]["note"] == "note"
+        assert profile["session_history"][0]["message_count"] == 2
+
+        other = SQLiteUserStore(tmp_path / "users.db")
+        other.update_profile("alice", {"assigned_therapist": "Naan"})
+        other.import_session({"session_id": "x", "username": "alice", "messages": []})
+        other.close()
+
+        profile = manager.get_user_profile("alice")
+        assert profile["assigned_therapist"] == "Naan"
+        assert len(profile["session_history"]) == 2
+        assert manager.get_user_profile("nobody") is None
+        store.close()
+
+    def test_environment_sets_cache_size(self, tmp_path, monkeypatch):
+        """Test that UserManager honours USER_PROFILE_CACHE_SIZE."""
+        monkeypatch.setenv("USER_PROFILE_CACHE_SIZE", "7")
+
+        assert UserManager(data_dir=tmp_path).storage.profile_cache.max_entries == 7
+
+
+@pytest.mark.integration
+class TestConcurrentWrites:
+    """Several processes, each with several threads, sharing one data directory."""
+
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_no_lost_updates_across_processes(self, tmp_path, backend):
+        """Test that concurrent read-modify-writes of one profile all survive."""
+        processes, threads, writes = 4, 4, 10
+        store = open_store(tmp_path, backend)
+        UserManager(data_dir=tmp_path, storage=store).create_user("alice", "pw")
+        store.close()
+
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_hammer_profile,
+                                   args=(tmp_path, backend, w, threads, writes))
+                   for w in range(processes)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert [worker.exitcode for worker in workers] == [0] * processes
+
+        store = open_store(tmp_path, backend)
+        profile = store.get_profile("alice")
+        all_notes = store.load_archive("alice", "progress_notes") + profile["progress_notes"]
+        store.close()
+        notes = {note["note"] for note in all_notes}
+        assert len(all_notes) == processes * threads * writes
+        assert notes == {f"{w}-{t}-{i}" for w in range(processes) for t in range(threads)
+                         for i in range(writes)}
+        assert all(profile[f"w{w}t{t}"] == writes - 1
+                   for w in range(processes) for t in range(threads))
+        assert list(tmp_path.rglob("*.tmp")) == []
+
+    def test_thread_locks_do_not_grow_with_users(self, tmp_path):
+        """Test that writing many users' profiles reuses a fixed set of locks."""
+        store = JsonUserStore(tmp_path)
+
+        for i in range(3 * LOCK_STRIPES):
+            assert store.create_profile({"username": f"user{i}", "session_history": [],
+                                         "progress_notes": []})
+
+        assert len(store._thread_locks) == LOCK_STRIPES
+        assert not any(lock.locked() for lock in store._thread_locks)
+
+    def test_failed_write_keeps_previous_profile(self, tmp_path, monkeypatch):
+        """Test that a write interrupted before the rename leaves the old file intact."""
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path, cache_size=0))
+        manager.create_user("alice", "pw")
+        profile_path = manager.storage._get_profile_path("alice")
+        before = profile_path.read_text()
+
+        def crash(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("src.storage.os.replace", crash)
+        with pytest.raises(OSError, match="disk full"):
+            manager.set_therapy_goals("alice", ["sleep"])
+
+        assert profile_path.read_text() == before
+        assert list(tmp_path.rglob("*.tmp")) == []
+        monkeypatch.undo()
+        assert manager.set_therapy_goals("alice", ["sleep"])
+        assert manager.get_user_profile("alice")["therapy_goals"] == ["sleep"]
+
+
+@pytest.mark.unit
+class TestShardedLayout:
+    """Hash-prefix sharding of the JSON tree and migration from the flat layout."""
+
+    @pytest.fixture
+    def flat_tree(self, tmp_path):
+        """A pre-sharding data directory with three users."""
+        store = JsonUserStore(tmp_path, layout="flat")
+        manager = UserManager(data_dir=tmp_path, storage=store)
+        for name in ("alice", "bob", "carol"):
+            manager.create_user(name, "pw")
+            manager.log_session(name, "Rye", [{"role": "user", "content": name}],
+                                session_id="20250101_090000")
+        (tmp_path / "profiles" / ".alice.json.x.tmp").write_text("{")
+        (tmp_path / "profiles" / "README.txt").write_text("not a profile")
+        return tmp_path
+
+    def test_new_directories_are_sharded(self, tmp_path):
+        """Test where a fresh store puts a user's files."""
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path))
+        manager.create_user("alice", "pw")
+        manager.log_session("alice", "Rye", [])
+
+        shard = shard_path("alice")
+        assert len(shard.parts) == 2 and all(len(part) == 2 for part in shard.parts)
+        assert (tmp_path / "profiles" / shard / "alice.json").exists()
+        assert (tmp_path / "sessions" / shard / "alice" / "index.json").exists()
+        assert json.loads((tmp_path / "layout.json").read_text()) == {"layout": "sharded"}
+        assert JsonUserStore(tmp_path).layout == "sharded"
+
+    def test_flat_tree_keeps_working_until_migrated(self, flat_tree):
+        """Test that unrecorded existing data is read in place."""
+        store = JsonUserStore(flat_tree)
+
+        assert store.layout == "flat"
+        assert store.get_profile("bob")["username"] == "bob"
+        assert sorted(store.iter_usernames()) == ["alice", "bob", "carol"]
+        assert not (flat_tree / "layout.json").exists()
+
+    def test_migration_moves_everything(self, flat_tree, capsys):
+        """Test the shard command and that the API sees the same data afterwards."""
+        assert main(["shard", str(flat_tree)]) == 0
+        assert "Moved 3 profile(s) and 3 session directory(ies)" in capsys.readouterr().out
+
+        store = JsonUserStore(flat_tree)
+        assert store.layout == "sharded"
+        assert sorted(store.iter_usernames()) == ["alice", "bob", "carol"]
+        assert sorted(store.iter_session_owners()) == ["alice", "bob", "carol"]
+        assert store.load_session("carol", "20250101_090000")["messages"] == [
+            {"role": "user", "content": "carol"}
+        ]
+        assert not list(flat_tree.rglob("*.tmp"))
+        assert not list((flat_tree / "locks").glob("*.lock"))
+        assert migrate_to_sharded(flat_tree) == ShardingReport()
+
+    def test_interrupted_migration_can_be_rerun(self, flat_tree, monkeypatch):
+        """Test resuming after a crash part way through."""
+        real_rename = os.rename
+        moves = []
+
+        def crash_after_two(src, dst):
+            if len(moves) == 2:
+                raise OSError("power cut")
+            moves.append(src)
+            real_rename(src, dst)
+
+        monkeypatch.setattr("src.storage.os.rename", crash_after_two)
+        with pytest.raises(OSError, match="power cut"):
+            migrate_to_sharded(flat_tree)
+        monkeypatch.undo()
+
+        report = migrate_to_sharded(flat_tree)
+
+        assert report.profiles <= 2 and report.session_dirs == 3
+        assert sorted(JsonUserStore(flat_tree).iter_usernames()) == ["alice", "bob", "carol"]
+
+    def test_migration_to_sqlite_reads_flat_trees(self, flat_tree):
+        """Test that the SQLite import walks a flat tree too."""
+        report = migrate_json_to_sqlite(flat_tree)
+
+        assert report == MigrationReport(users=3, sessions=3)
+
+    def test_unknown_layout_raises_error(self, tmp_path):
+        """Test that a typo in the layout is rejected."""
+        with pytest.raises(ValueError, match="Unknown layout"):
+            JsonUserStore(tmp_path, layout="nested")
+
+
+@pytest.mark.unit
+class TestProfileFormats:
+    """Configurable profile serialization in the JSON store."""
+
+    def test_compressed_binary_profiles(self, tmp_path):
+        """Test that a store writes and reads its configured format."""
+        store = JsonUserStore(tmp_path, cache_size=0, profile_format="msgpack+zstd")
+        manager = UserManager(data_dir=tmp_path, storage=store)
+        manager.create_user("alice", "pw")
+        for i in range(50):
+            manager.add_progress_note("alice", f"note {i}")
+
+        path = store._get_profile_path("alice")
+        assert path.name == "alice.msgpack.zst"
+        assert len(manager.get_user_profile("alice")["progress_notes"]) == 50
+        assert list(store.iter_usernames()) == ["alice"]
+
+        json_size = len(json.dumps(manager.get_user_profile("alice"), indent=2))
+        assert path.stat().st_size < json_size / 5
+
+    def test_existing_json_profiles_are_read_and_converted(self, tmp_path):
+        """Test backward-compatible reads and conversion on the next save."""
+        UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path)).create_user("alice", "pw")
+        store = JsonUserStore(tmp_path, profile_format="msgpack")
+        manager = UserManager(data_dir=tmp_path, storage=store)
+
+        assert manager.get_user_profile("alice")["username"] == "alice"
+        assert not manager.create_user("alice", "pw")
+        assert manager.set_therapy_goals("alice", ["rest"])
+
+        assert not store._get_profile_path("alice", ".json").exists()
+        assert store._get_profile_path("alice").exists()
+        assert list(store.iter_usernames()) == ["alice"]
+        # ...and a JSON-configured process can still read it
+        assert JsonUserStore(tmp_path).get_profile("alice")["therapy_goals"] == ["rest"]
+
+    def test_environment_selects_format(self, tmp_path, monkeypatch):
+        """Test that UserManager honours USER_PROFILE_FORMAT."""
+        monkeypatch.setenv("USER_PROFILE_FORMAT", "orjson")
+
+        assert UserManager(data_dir=tmp_path).storage.serializer.name == "orjson"
+
+
+@pytest.mark.unit
+class TestBoundedProfiles:
+    """Rolling old session_history and progress_notes out of profiles."""
+
+    @pytest.fixture(params=["json", "sqlite"])
+    def small_window(self, request, tmp_path):
+        """A UserManager whose profiles keep three entries per list."""
+        store = open_store(tmp_path, request.param, window=3)
+        manager = UserManager(data_dir=tmp_path, storage=store)
+        manager.create_user("alice", "pw")
+        for i in range(20):
+            manager.add_progress_note("alice", f"note {i}")
+            manager.log_session("alice", "Rye", [{"role": "user", "content": "hi"}],
+                                session_id=f"20250101_{i:06d}")
+        yield manager
+        store.close()
+
+    def test_profile_keeps_recent_window(self, small_window):
+        """Test that lists stay bounded and the archive holds the rest, in order."""
+        profile = small_window.get_user_profile("alice")
+
+        for field, key, expected in (
+            ("progress_notes", "note", [f"note {i}" for i in range(20)]),
+            ("session_history", "session_id", [f"20250101_{i:06d}" for i in range(20)]),
+        ):
+            assert 3 <= len(profile[field]) < 6
+            assert profile["archived"][field] + len(profile[field]) == 20
+            archive = small_window.load_archive("alice", field)
+            assert [entry[key] for entry in archive + profile[field]] == expected
+        assert profile["total_sessions"] == 20
+
+    def test_writing_profile_back_keeps_archive(self, small_window):
+        """Test that a read-modify-write of a windowed profile loses no notes."""
+        before = small_window.get_user_profile("alice")
+        archive = small_window.load_archive("alice", "progress_notes")
+
+        small_window.update_user_profile("alice", before)
+
+        after = small_window.get_user_profile("alice")
+        assert after["archived"] == before["archived"]
+        assert after["progress_notes"] == before["progress_notes"]
+        assert small_window.load_archive("alice", "progress_notes") == archive
+
+    def test_unarchived_field_raises_error(self, small_window):
+        """Test that only the rolled-over lists can be loaded from the archive."""
+        with pytest.raises(ValueError, match="not archived"):
+            small_window.load_archive("alice", "therapy_goals")
+
+    def test_short_profiles_have_no_archive(self, manager):
+        """Test that nothing is archived below the window."""
+        manager.create_user("alice", "pw")
+        manager.add_progress_note("alice", "note")
+
+        assert "archived" not in manager.get_user_profile("alice")
+        assert manager.load_archive("alice", "progress_notes") == []
+        assert manager.load_archive("nobody", "progress_notes") == []
+
+    def test_orphaned_segments_are_ignored(self, tmp_path):
+        """Test that segments the profile doesn't count are skipped."""
+        store = JsonUserStore(tmp_path, window=2)
+        manager = UserManager(data_dir=tmp_path, storage=store)
+        manager.create_user("alice", "pw")
+        for i in range(4):
+            manager.add_progress_note("alice", f"note {i}")
+        archive_dir = store._get_session_path("alice") / "archive"
+        # A roll-over that crashed before saving the profile, and a stray gap
+        (archive_dir / "progress_notes-000000002.json").write_text('[{"note": "lost"}]')
+        (archive_dir / "progress_notes-000000007.json").write_text('[{"note": "gap"}]')
+
+        archive = manager.load_archive("alice", "progress_notes")
+        assert [note["note"] for note in archive] == ["note 0", "note 1"]
+
+        shutil.rmtree(archive_dir)
+        assert manager.load_archive("alice", "progress_notes") == []
+
+    def test_migration_to_sqlite_restores_archived_entries(self, tmp_path):
+        """Test that the SQLite import gets the full lists back."""
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path, window=2))
+        manager.create_user("alice", "pw")
+        for i in range(9):
+            manager.add_progress_note("alice", f"note {i}")
+
+        migrate_json_to_sqlite(tmp_path)
+
+        store = SQLiteUserStore(tmp_path / "users.db", window=2)
+        notes = store.load_archive("alice", "progress_notes") + store.get_profile("alice")["progress_notes"]
+        assert [note["note"] for note in notes] == [f"note {i}" for i in range(9)]
+        store.close()
+
+    def test_environment_sets_window(self, tmp_path, monkeypatch):
+        """Test that UserManager honours USER_PROFILE_WINDOW."""
+        monkeypatch.setenv("USER_PROFILE_WINDOW", "7")
+
+        assert UserManager(data_dir=tmp_path).storage.window == 7
+
+
+@pytest.mark.unit
+class TestOpenStore:
+    """Tests for backend selection."""
+
+    def test_backends(self, tmp_path):
+        """Test each backend name and an unknown one."""
+        assert isinstance(open_store(tmp_path, "json"), JsonUserStore)
+        sqlite_store = open_store(tmp_path, "sqlite")
+        assert isinstance(sqlite_store, SQLiteUserStore)
+        assert sqlite_store.path == tmp_path / "users.db"
+        sqlite_store.close()
+
+        with pytest.raises(ValueError, match="Unknown storage backend"):
+            open_store(tmp_path, "mongo")
+
+    def test_environment_selects_backend(self, tmp_path, monkeypatch):
+        """Test that UserManager honours USER_STORAGE_BACKEND."""
+        monkeypatch.setenv("USER_STORAGE_BACKEND", "sqlite")
+
+        manager = UserManager(data_dir=tmp_path)
+
+        assert isinstance(manager.storage, SQLiteUserStore)
+        manager.storage.close()
+
+
+@pytest.mark.unit
+class TestMigration:
+    """Tests for importing JSON user data into SQLite."""
+
+    @pytest.fixture
+    def json_tree(self, tmp_path):
+        """A JSON data directory with two users and three sessions."""
+        manager = UserManager(data_dir=tmp_path, storage=JsonUserStore(tmp_path))
+        manager.create_user("alice", "pw", {"theme": "dark"})
+        manager.save_intake_assessment("alice", {"q1": 2}, "Rye")
+        manager.add_progress_note("alice", "note", "Rye")
+        manager.create_user("bob", "pw")
+        for user, session_id in (("alice", "20250101_100000"), ("alice", "20250102_100000"),
+                                 ("bob", "20250103_100000")):
+            session_dir = manager.storage._get_session_path(user)
+            (session_dir / f"session_{session_id}.json").write_text(json.dumps({
+                "session_id": session_id, "username": user, "therapist": "Rye",
+                "start_time": "2025-01-01T10:00:00", "messages": [{"role": "user", "content": "x"}],
+                "message_count": 1,
+            }))
+        manager.update_user_profile("alice", {"total_sessions": 2})
+        return tmp_path
+
+    def test_migration_imports_everything(self, json_tree):
+        """Test that profiles and sessions arrive intact."""
+        json_store = JsonUserStore(json_tree)
+
+        report = migrate_json_to_sqlite(json_tree)
+
+        assert report == MigrationReport(users=2, sessions=3)
+        store = SQLiteUserStore(json_tree / "users.db")
+        alice = store.get_profile("alice")
+        expected = json_store.get_profile("alice")
+        for field in ("password_hash", "intake_responses", "progress_notes", "theme",
+                      "recommended_therapist", "intake_date", "total_sessions"):
+            assert alice[field] == expected[field]
+        assert [h["session_id"] for h in alice["session_history"]] == [
+            "20250101_100000", "20250102_100000"
+        ]
+        assert store.get_sessions("bob") == json_store.get_sessions("bob")
+        store.close()
+
+    def test_migration_is_idempotent(self, json_tree):
+        """Test that running twice doesn't duplicate rows or counts."""
+        migrate_json_to_sqlite(json_tree)
+        migrate_json_to_sqlite(json_tree)
+
+        store = SQLiteUserStore(json_tree / "users.db")
+        alice = store.get_profile("alice")
+        assert len(alice["progress_notes"]) == 1
+        assert alice["total_sessions"] == 2
+        assert len(store.get_sessions("alice")) == 2
+        store.close()
+
+    def test_interrupted_import_keeps_previous_profile(self, json_tree):
+        """Test that a profile import is all-or-nothing."""
+        migrate_json_to_sqlite(json_tree)
+        store = SQLiteUserStore(json_tree / "users.db")
+        before = store.get_profile("alice")
+
+        with pytest.raises(KeyError):
+            store.import_profile({"username": "alice", "theme": "light"})
+
+        store.profile_cache.discard("alice")
+        assert store.get_profile("alice") == before
+        assert len(store.get_sessions("alice")) == 2
+        store.close()
+
+    def test_migrate_command(self, json_tree, tmp_path, capsys):
+        """Test the command-line entry point with a custom database path."""
+        db = tmp_path / "elsewhere" / "migrated.db"
+
+        assert main(["migrate", str(json_tree), "--db", str(db)]) == 0
+
+        assert "Imported 2 user(s) and 3 session(s)" in capsys.readouterr().out
+        assert db.exists()
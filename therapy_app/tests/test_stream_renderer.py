@@ -0,0 +1,79 @@
+"""
+Unit tests for the throttled stream renderer.
+"""
+
+import logging
+
+import pytest
+
+from src.stream_renderer import CURSOR, RenderStats, StreamRenderer
+
+
+@pytest.fixture
+def frames():
+    return []
+
+
+@pytest.mark.unit
+class TestStreamRenderer:
+    """Coalescing deltas into frames."""
+
+    def test_deltas_are_coalesced_until_the_size_budget(self, clock, frames):
+        """Test that a frame is drawn once max_chars are pending."""
+        renderer = StreamRenderer(frames.append, max_chars=10, clock=clock)
+
+        for delta in ("abc", "def", "ghi"):
+            renderer.feed(delta)
+        assert frames == []
+        assert renderer.text == "abcdefghi"  # reading doesn't reset the budget
+
+        renderer.feed("j")
+        assert frames == ["abcdefghij" + CURSOR]
+        assert renderer.text == "abcdefghij"
+
+    def test_pending_text_is_drawn_after_the_interval(self, clock, frames):
+        """Test the time budget."""
+        renderer = StreamRenderer(frames.append, interval=0.05, clock=clock)
+
+        renderer.feed("Hello")
+        clock.now += 0.05
+        renderer.feed(", world")
+
+        assert frames == ["Hello, world" + CURSOR]
+
+    def test_finish_draws_the_full_reply_without_cursor(self, clock, frames, caplog):
+        """Test the final frame, the returned text and the stats."""
+        renderer = StreamRenderer(frames.append, max_chars=4, cursor="|", clock=clock)
+
+        for delta in ("héllo", "", " wörld"):
+            renderer.feed(delta)
+        renderer.feed("!")
+        with caplog.at_level(logging.DEBUG, logger="websearch"):
+            reply = renderer.finish()
+
+        assert reply == "héllo wörld!"
+        assert frames == ["héllo|", "héllo wörld|", "héllo wörld!"]
+        assert renderer.stats == RenderStats(
+            deltas=3, chars=12, frames=3,
+            bytes_pushed=sum(len(frame.encode()) for frame in frames),
+        )
+        assert "3 frames" in caplog.text
+
+    def test_empty_reply(self, clock, frames):
+        """Test that a reply with no content still clears the placeholder once."""
+        renderer = StreamRenderer(frames.append, clock=clock)
+
+        assert renderer.finish() == ""
+        assert frames == [""]
+        assert renderer.stats.frames == 1
+
+    def test_frames_are_bounded_for_long_replies(self, clock, frames):
+        """Test that a 10k-token reply arriving instantly takes ~chars/max_chars frames."""
+        renderer = StreamRenderer(frames.append, max_chars=200, clock=clock)
+
+        for _ in range(10000):
+            renderer.feed("word ")
+        renderer.finish()
+
+        assert renderer.stats.frames == 50000 // 200 + 1
+        assert frames[-1] == "word " * 10000
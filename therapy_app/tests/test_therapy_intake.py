@@ -4,9 +4,33 @@ Unit tests for TherapyIntake class.
 Tests intake assessment questions, response analysis, and therapist recommendations.
 """
 
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pytest
 
-from src.therapy_intake import TherapyIntake
+from src import therapy_intake
+from src.storage import open_store
+from src.therapy_intake import (
+    BANK_PATH, QuestionBank, QuestionBankFile, TherapyIntake, WeightMatrix, load_question_bank
+)
+from src.user_manager import UserManager
+
+
+def nested_scores(questions, responses):
+    """Score by walking the question dicts, as analyze_responses used to."""
+    scores = {}
+    for question in questions:
+        if question["type"] == "multiple_choice" and question["id"] in responses:
+            selected_index = responses[question["id"]]
+            if 0 <= selected_index < len(question["options"]):
+                for therapist, weight in question["options"][selected_index]["weights"].items():
+                    scores[therapist] = scores.get(therapist, 0) + weight
+    return scores
 
 
 class TestTherapyIntakeInitialization:
@@ -353,3 +377,276 @@ class TestIntegration:
         
         assert rec1 == rec2
         assert scores1 == scores2
+
+
+class TestWeightMatrix:
+    """Tests for the compiled scoring matrix."""
+
+    def test_matches_nested_scoring_for_every_answer_set(self):
+        """Test every combination of answers (and unanswered questions) against the dict walk."""
+        questions = [q for q in TherapyIntake.QUESTIONS if q["type"] == "multiple_choice"]
+        choices = [[None, -1] + list(range(len(q["options"]) + 1)) for q in questions]
+
+        for combination in itertools.product(*choices):
+            responses = {q["id"]: i for q, i in zip(questions, combination) if i is not None}
+            expected = nested_scores(TherapyIntake.QUESTIONS, responses)
+
+            recommended, scores = TherapyIntake.analyze_responses(responses)
+            scores["mutated"] = 0  # callers get their own copy of cached results
+
+            scores.pop("mutated")
+            assert list(scores.items()) == list(expected.items())
+            if expected:
+                assert recommended == max(expected, key=expected.get)
+
+    def test_ties_go_to_the_first_therapist_named(self):
+        """Test insertion-order tie-breaking."""
+        questions = [{"id": "q", "type": "multiple_choice", "options": [
+            {"text": "a", "weights": {"B": 2, "A": 2}},
+            {"text": "b", "weights": {"A": 1, "Z": 0}},
+        ]}]
+        matrix = WeightMatrix.compile(questions)
+
+        assert matrix.therapists == ("B", "A", "Z")
+        assert matrix.rows["q"] == ((2, 2, 0), (0, 1, 0))
+        assert matrix.selection({"q": 0}) == (0,)
+        assert matrix.selection({"q": 2}) == (None,)
+        assert matrix.score((0,)) == ([2, 2, 0], [0, 1])
+        assert matrix.score((None,)) == ([0, 0, 0], [])
+        assert matrix.rank({"q": 0}) == ("B", {"B": 2, "A": 2})
+        assert matrix.rank({"q": 1}) == ("A", {"A": 1, "Z": 0})
+        assert matrix.rank({}) == (None, {})
+
+    def test_matrix_is_compiled_once_per_bank(self):
+        """Test that scoring reuses the bank's compiled matrix."""
+        assert TherapyIntake.weight_matrix() is TherapyIntake.weight_matrix()
+        assert TherapyIntake.weight_matrix() is TherapyIntake.bank().matrix
+
+
+class TestBatchAnalysis:
+    """Tests for NumPy cohort scoring."""
+
+    def test_batch_matches_single_analysis(self):
+        """Test every answer combination against analyze_responses, in one batch."""
+        questions = [q for q in TherapyIntake.QUESTIONS if q["type"] == "multiple_choice"]
+        choices = [[None, -1] + list(range(len(q["options"]) + 1)) for q in questions]
+        cohort = [{q["id"]: i for q, i in zip(questions, combination) if i is not None}
+                  for combination in itertools.product(*choices)]
+        matrix = TherapyIntake.weight_matrix()
+
+        recommended, scores = TherapyIntake.analyze_batch(matrix.responses_array(cohort))
+
+        assert scores.shape == (len(cohort), len(matrix.therapists))
+        for responses, therapist_id, row in zip(cohort, recommended, scores):
+            expected, expected_scores = TherapyIntake.analyze_responses(responses)
+            assert matrix.therapists[therapist_id] == expected
+            assert {matrix.therapists[t]: row[t] for t in range(len(row)) if row[t]} == {
+                name: score for name, score in expected_scores.items() if score
+            }
+
+    def test_unnamed_respondents_without_default(self):
+        """Test that -1 is kept when the bank has no default therapist."""
+        matrix = WeightMatrix.compile([{"id": "q", "type": "multiple_choice", "options": [
+            {"text": "a", "weights": {"A": 1, "B": 1}}, {"text": "b", "weights": {"B": 0}},
+        ]}])
+
+        recommended, scores = matrix.score_batch([[0], [1], [-1], [5]])
+
+        assert recommended.tolist() == [0, 1, -1, -1]
+        assert scores.tolist() == [[1, 1], [0, 0], [0, 0], [0, 0]]
+        assert matrix.score_batch(np.empty((0, 1)))[0].shape == (0,)
+
+    def test_wrong_shape_raises_error(self):
+        """Test that the column count must match the questions."""
+        with pytest.raises(ValueError, match="respondents x 4"):
+            TherapyIntake.analyze_batch([[0, 0]])
+
+    def test_numpy_is_required(self, monkeypatch):
+        """Test the error when numpy isn't installed."""
+        monkeypatch.setattr(therapy_intake, "np", None)
+        matrix = WeightMatrix.compile(TherapyIntake.QUESTIONS)
+
+        with pytest.raises(ImportError, match="numpy"):
+            matrix.score_batch([[0, 0, 0, 0]])
+        with pytest.raises(ImportError, match="numpy"):
+            matrix.responses_array([{}])
+
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_analyze_stored_streams_users(self, tmp_path, backend):
+        """Test chunked re-scoring straight out of storage."""
+        store = open_store(tmp_path, backend)
+        manager = UserManager(data_dir=tmp_path, storage=store)
+        answers = {"alice": {"primary_concern": 0, "goals": "sleep"},
+                   "bob": {"primary_concern": 5, "timeline": 2},
+                   "carol": {"therapy_preference": 3}}
+        for username, responses in answers.items():
+            manager.create_user(username, "pw")
+            manager.save_intake_assessment(username, responses, "")
+        manager.create_user("dave", "pw")
+
+        chunks = list(TherapyIntake.analyze_stored(manager, chunk_size=2))
+        store.close()
+
+        assert [len(usernames) for usernames, _, _ in chunks] == [2, 1]
+        therapists = TherapyIntake.weight_matrix().therapists
+        results = {username: therapists[therapist_id]
+                   for usernames, recommended, _ in chunks
+                   for username, therapist_id in zip(usernames, recommended)}
+        assert results == {username: TherapyIntake.analyze_responses(responses)[0]
+                           for username, responses in answers.items()}
+
+
+def bank_data():
+    """The shipped question bank, decoded."""
+    return json.loads(BANK_PATH.read_text())
+
+
+@pytest.fixture
+def bank_file(tmp_path, monkeypatch, clock):
+    """TherapyIntake reading a copy of the shipped bank, checked every second of a fake clock."""
+    path = tmp_path / "bank.json"
+    path.write_text(BANK_PATH.read_text())
+    source = QuestionBankFile(path, check_interval=1.0, clock=clock)
+    monkeypatch.setattr(TherapyIntake, "bank_file", source)
+    return source, clock
+
+
+def write_bank(path, data):
+    """Replace a bank file the way an editor should: write a temp file and rename it."""
+    temp = path.with_suffix(".tmp")
+    temp.write_text(json.dumps(data))
+    os.replace(temp, path)
+
+
+class TestQuestionBank:
+    """Tests for the data-driven question bank."""
+
+    def test_shipped_bank_is_valid_and_read_only(self):
+        """Test the bundled file and that its compiled form can't be edited."""
+        bank = load_question_bank(BANK_PATH)
+
+        assert bank.version >= 1
+        assert TherapyIntake.QUESTIONS == bank.questions
+        assert set(bank.matrix.therapists) <= set(bank.explanations)
+        with pytest.raises(TypeError):
+            bank.questions[0]["id"] = "changed"
+        with pytest.raises(AttributeError):
+            bank.questions[0]["options"].append({})
+
+    @pytest.mark.parametrize("change, problem", [
+        (lambda d: d.clear(), "version must be"),
+        (lambda d: d.update(version=True), "version must be"),
+        (lambda d: d.update(explanations=["x"]), "explanations must"),
+        (lambda d: d.update(default_therapist="Nobody"), "has no explanation"),
+        (lambda d: d.update(questions=[]), "non-empty list"),
+        (lambda d: d["questions"][0].pop("question"), "question text"),
+        (lambda d: d["questions"][1].update(id="primary_concern"), "unique string id"),
+        (lambda d: d["questions"][0].update(type="slider"), "unknown type"),
+        (lambda d: d["questions"][0].update(options=[]), "options"),
+        (lambda d: d["questions"][0]["options"].append("x"), "without text and weights"),
+        (lambda d: d["questions"][0]["options"][0]["weights"].update(A=1.5), "non-integer"),
+        (lambda d: d["questions"][0]["options"][0]["weights"].update(A=1), "'A', who has no"),
+    ])
+    def test_invalid_banks_are_rejected(self, change, problem):
+        """Test each validation rule."""
+        data = bank_data()
+        change(data)
+
+        with pytest.raises(ValueError, match=problem):
+            QuestionBank.from_dict(data, source="test bank")
+        with pytest.raises(ValueError, match="test bank"):
+            QuestionBank.from_dict([], source="test bank")
+
+    def test_bank_reloads_when_file_changes(self, bank_file):
+        """Test hot reload, throttled by the check interval."""
+        source, clock = bank_file
+        old = TherapyIntake.bank()
+        data = bank_data()
+        data["version"] = 2
+        data["questions"][0]["options"][0]["weights"] = {"Rye (Existential Therapy)": 9}
+        write_bank(source.path, data)
+
+        assert TherapyIntake.bank() is old  # not checked again yet
+        clock.now += 1.0
+
+        bank = TherapyIntake.bank()
+        assert bank.version == 2
+        assert TherapyIntake.analyze_responses({"primary_concern": 0}) == (
+            "Rye (Existential Therapy)", {"Rye (Existential Therapy)": 9}
+        )
+        clock.now += 1.0
+        assert TherapyIntake.bank() is bank  # unchanged file, same version
+
+    def test_invalid_edit_keeps_previous_version(self, bank_file, caplog):
+        """Test that a broken or missing file never replaces a working bank."""
+        source, clock = bank_file
+        old = TherapyIntake.bank()
+
+        source.path.write_text('{"version": 2, "questions": [')
+        clock.now += 1.0
+        with caplog.at_level(logging.WARNING):
+            assert TherapyIntake.bank() is old
+        assert "Keeping question bank version 1" in caplog.text
+
+        source.path.unlink()
+        clock.now += 1.0
+        assert TherapyIntake.bank() is old
+
+        write_bank(source.path, dict(bank_data(), version=3))
+        clock.now += 1.0
+        assert TherapyIntake.bank().version == 3
+
+    def test_concurrent_check_serves_current_version(self, bank_file):
+        """Test that only one thread reloads; the others don't wait for it."""
+        source, clock = bank_file
+        old = TherapyIntake.bank()
+        write_bank(source.path, dict(bank_data(), version=2))
+        clock.now += 1.0
+
+        with source._lock:
+            assert TherapyIntake.bank() is old
+        assert TherapyIntake.bank().version == 2
+
+    def test_bank_file_opens_on_first_use(self, tmp_path, monkeypatch):
+        """Test that the bank named by THERAPY_INTAKE_BANK is read when first needed."""
+        path = tmp_path / "bank.json"
+        path.write_text(json.dumps(dict(bank_data(), version=7)))
+        monkeypatch.setenv("THERAPY_INTAKE_BANK", str(path))
+        monkeypatch.setattr(TherapyIntake, "bank_file", None)
+
+        assert TherapyIntake.bank().version == 7
+        assert TherapyIntake.bank_file.path == path
+
+    def test_explanations_are_cached_per_version(self, bank_file, monkeypatch):
+        """Test that rendering again returns the cached string, and the cache is bounded."""
+        source, clock = bank_file
+        monkeypatch.setattr(therapy_intake, "EXPLANATION_CACHE_SIZE", 2)
+        therapist, scores = TherapyIntake.analyze_responses({"primary_concern": 0})
+
+        first = TherapyIntake.get_recommendation_explanation(therapist, scores)
+        assert TherapyIntake.get_recommendation_explanation(therapist, dict(scores)) is first
+
+        TherapyIntake.get_recommendation_explanation(therapist, {})
+        assert TherapyIntake.get_recommendation_explanation(therapist, scores) is first
+        TherapyIntake.get_recommendation_explanation("Rye (Existential Therapy)", {})
+        assert len(TherapyIntake.bank()._rendered) == 2
+        assert TherapyIntake.get_recommendation_explanation(therapist, scores) is first
+        assert (therapist, ()) not in TherapyIntake.bank()._rendered  # least recently used
+
+        write_bank(source.path, dict(bank_data(), version=2))
+        clock.now += 1.0
+        assert TherapyIntake.bank()._rendered == {}
+
+    def test_explanation_cache_is_thread_safe(self, bank_file, monkeypatch):
+        """Test that threads filling a full cache never evict an entry twice."""
+        monkeypatch.setattr(therapy_intake, "EXPLANATION_CACHE_SIZE", 4)
+        bank = TherapyIntake.bank()
+
+        def render(worker):
+            for i in range(200):
+                bank.explain("Rye (Existential Therapy)", {"Rye": worker * 1000 + i})
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(render, range(8)))
+
+        assert len(bank._rendered) == 4
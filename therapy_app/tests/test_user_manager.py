@@ -6,6 +6,7 @@ Tests user authentication, profile management, session logging, and progress tra
 
 import json
 import os
+import re
 import tempfile
 import shutil
 from pathlib import Path
@@ -14,6 +15,7 @@ from unittest.mock import patch, Mock
 
 import pytest
 
+from src.storage import shard_path
 from src.user_manager import UserManager
 
 
@@ -142,6 +144,72 @@ class TestUserAuthentication:
         assert profile_after["last_login"] != profile_before["last_login"]
 
 
+class TestLoginRecording:
+    """Tests for deferred last_login writes and hash upgrades."""
+
+    def test_last_login_is_held_until_flushed(self, temp_user_data_dir):
+        """Test that logins are coalesced in memory but visible to reads."""
+        manager = UserManager(data_dir=temp_user_data_dir, login_flush_interval=30)
+        manager.create_user("alice", "pw")
+
+        assert manager.authenticate("alice", "pw")
+        assert manager.authenticate("alice", "pw")
+
+        assert manager.storage.get_profile("alice")["last_login"] is None
+        held = manager.get_user_profile("alice")["last_login"]
+        assert held is not None
+        assert manager.flush_logins() == 1
+        assert manager.storage.get_profile("alice")["last_login"] == held
+        assert manager.flush_logins() == 0
+
+    def test_logins_are_flushed_after_the_interval(self, temp_user_data_dir):
+        """Test that a login past the interval writes every held login."""
+        manager = UserManager(data_dir=temp_user_data_dir, login_flush_interval=0)
+        manager.create_user("alice", "pw")
+
+        manager.authenticate("alice", "pw")
+
+        assert manager.storage.get_profile("alice")["last_login"] is not None
+
+    def test_logins_are_written_at_once_by_default(self, temp_user_data_dir):
+        """Test that without an interval no login is only held in memory."""
+        manager = UserManager(data_dir=temp_user_data_dir)
+        manager.create_user("alice", "pw")
+
+        manager.authenticate("alice", "pw")
+
+        assert manager.storage.get_profile("alice")["last_login"] is not None
+        assert manager.flush_logins() == 0
+
+    def test_held_logins_are_flushed_at_exit(self, temp_user_data_dir):
+        """Test the exit hook, for a live manager and a collected one."""
+        from src.user_manager import _flush_pending_logins
+        import weakref
+
+        manager = UserManager(data_dir=temp_user_data_dir, login_flush_interval=30)
+        manager.create_user("alice", "pw")
+        manager.authenticate("alice", "pw")
+
+        _flush_pending_logins(weakref.ref(manager))
+        assert manager.storage.get_profile("alice")["last_login"] is not None
+        _flush_pending_logins(lambda: None)
+
+    def test_legacy_hashes_are_upgraded_on_login(self, temp_user_data_dir, monkeypatch):
+        """Test that USER_PASSWORD_SCHEME rehashes old passwords on a successful login."""
+        UserManager(data_dir=temp_user_data_dir).create_user("alice", "pw")
+        monkeypatch.setenv("USER_PASSWORD_SCHEME", "pbkdf2_sha256")
+        manager = UserManager(data_dir=temp_user_data_dir)
+        manager.hasher.iterations = 1000
+
+        assert not manager.authenticate("alice", "wrong")
+        assert len(manager.get_user_profile("alice")["password_hash"]) == 64
+        assert manager.authenticate("alice", "pw")
+        upgraded = manager.get_user_profile("alice")["password_hash"]
+        assert upgraded.startswith("pbkdf2_sha256$1000$")
+        assert manager.authenticate("alice", "pw")
+        assert manager.get_user_profile("alice")["password_hash"] == upgraded
+
+
 class TestProfileManagement:
     """Tests for user profile management."""
 
@@ -224,15 +292,27 @@ class TestSessionLogging:
         session_id = user_manager.log_session("testuser", "sourdough", messages)
         
         assert session_id is not None
-        # Session ID is timestamp format YYYYMMDD_HHMMSS
-        assert len(session_id) == 15  # 8 digits + underscore + 6 digits
+        # Session ID is YYYYMMDD_HHMMSS_microseconds_random-suffix
+        assert re.fullmatch(r"\d{8}_\d{6}_\d{6}_[0-9a-f]{8}", session_id)
+
+    def test_sessions_started_together_stay_apart(self, user_manager):
+        """Test that sessions started within one second get distinct, ordered IDs."""
+        user_manager.create_user("testuser", "password123")
+        
+        ids = [user_manager.log_session("testuser", "sourdough", [{"role": "user", "content": str(i)}])
+               for i in range(5)]
+        
+        history = user_manager.get_session_history("testuser")
+        assert len(set(ids)) == 5
+        assert [session["session_id"] for session in history] == sorted(ids)
+        assert user_manager.get_user_profile("testuser")["total_sessions"] == 5
 
     def test_log_session_creates_user_directory(self, user_manager, temp_user_data_dir):
         """Test that logging a session creates user-specific session directory."""
         user_manager.create_user("testuser", "password123")
         user_manager.log_session("testuser", "sourdough", [])
         
-        user_session_dir = Path(temp_user_data_dir, "sessions", "testuser")
+        user_session_dir = Path(temp_user_data_dir, "sessions", shard_path("testuser"), "testuser")
         assert user_session_dir.exists()
 
     def test_log_session_for_nonexistent_user(self, user_manager):